@@ -0,0 +1,53 @@
+# bench/fake_client.py
+"""
+In-memory stand-in for the Supabase client with injected network latency.
+
+`LatencyClient` is the memory backend (the same `table().select/insert/update/eq/
+in_/order/limit` builder and `rpc` functions the DAOs use in production), with a
+sleep before each round trip. The sleep happens outside the backend's lock, so
+concurrent workers overlap their waits the way they would on a real connection
+pool. Queries issued inside an RPC or an embedded select run "on the server" and
+add no latency of their own.
+"""
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+from src.backends.base import LocalQuery, Response
+from src.backends.memory import MemoryClient
+
+
+class LatencyClient(MemoryClient):
+    """MemoryClient whose round trips each take `latency_ms` ± `jitter_ms`."""
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, seed: Optional[int] = None):
+        super().__init__()
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self._random = random.Random(seed)
+        self._local = threading.local()
+        self._count_lock = threading.Lock()
+        self.round_trips = 0
+
+    @contextmanager
+    def _round_trip(self):
+        depth = getattr(self._local, "depth", 0)
+        if depth == 0:
+            with self._count_lock:
+                self.round_trips += 1
+                delay = self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms)
+            if delay > 0:
+                time.sleep(delay / 1000)
+        self._local.depth = depth + 1
+        try:
+            yield
+        finally:
+            self._local.depth = depth
+
+    def _execute(self, query: LocalQuery) -> Response:
+        with self._round_trip():
+            return super()._execute(query)
+
+    def _call(self, name: str, params: Dict) -> Response:
+        with self._round_trip():
+            return super()._call(name, params)
@@ -0,0 +1,248 @@
+# bench/load.py
+"""
+Synthetic load test for the order and payment services.
+
+Seeds a catalog and a customer base into `LatencyClient` (the memory backend with
+injected round-trip latency), then drives the real services with a generated
+workload: every iteration creates an order with a random basket, then cancels it or
+pays it according to the configured ratios. The JSON report has, per operation,
+the count, errors, ops/sec, database round trips per op (from the DAO tracer) and
+p50/p99 latency, plus the git revision, so runs can be compared over time.
+
+    python -m bench.load                                  # 2000 iterations, 2 ms latency
+    python -m bench.load --latency-ms 20 --workers 16 --ops 5000
+    python -m bench.load --basket 1:60,2:25,4:15 --cancel-ratio 0.2 --output run.json
+    python -m bench.load --compare run.json               # adds changes against an earlier run
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from bench.fake_client import LatencyClient
+from src.dao.customer_dao import CustomerDAO
+from src.dao.order_dao import OrderDAO
+from src.dao.payment_dao import PaymentDAO
+from src.dao.product_dao import ProductDAO
+from src.services.order_service import OrderError, OrderService
+from src.services.payment_service import PAYMENT_METHODS, PaymentError, PaymentService
+from src.tracing import Tracer, instrument, percentile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+OPERATIONS = ("order_create", "order_cancel", "payment_process")
+
+
+def parse_basket(spec: str) -> List[Tuple[int, float]]:
+    """'1:50,2:30,5:20' -> [(1, 50.0), (2, 30.0), (5, 20.0)]: basket size and relative weight."""
+    sizes = []
+    for part in spec.split(","):
+        size, _, weight = part.partition(":")
+        sizes.append((int(size), float(weight or 1)))
+    if not sizes or any(size < 1 or weight < 0 for size, weight in sizes):
+        raise ValueError(f"Invalid basket distribution '{spec}'. Use size:weight pairs, e.g. 1:50,2:30,5:20.")
+    return sizes
+
+
+class Workload:
+    """Seeded data set plus the services under test, all sharing one traced fake client."""
+    def __init__(self, customers: int = 1000, products: int = 5000, stock: int = 1_000_000,
+                 latency_ms: float = 2.0, jitter_ms: float = 0.0, seed: int = 1):
+        self.client = LatencyClient(seed=seed)
+        # Seeding is not part of the measurement, so it runs before latency is switched on
+        self.client.table("customers").insert([
+            {"name": f"Customer {i}", "email": f"customer{i}@bench.test", "phone": f"9{i:09d}", "city": f"City {i % 50}"}
+            for i in range(customers)]).execute()
+        self.client.table("products").insert([
+            {"name": f"Product {i}", "sku": f"BENCH-{i:06d}", "price": round(1 + (i % 500) * 0.5, 2),
+             "stock": stock, "category": f"Category {i % 20}"}
+            for i in range(products)]).execute()
+        self.customers, self.products = customers, products
+        self.client.latency_ms, self.client.jitter_ms = latency_ms, jitter_ms
+        self.client.round_trips = 0
+
+        self.tracer = Tracer()
+        daos = [OrderDAO(self.client), ProductDAO(self.client), CustomerDAO(self.client), PaymentDAO(self.client)]
+        instrument(daos, self.tracer)
+        order_dao, product_dao, customer_dao, payment_dao = daos
+        self.order_service = OrderService(order_dao, product_dao, customer_dao, payment_dao)
+        self.payment_service = PaymentService(payment_dao, order_dao)
+
+
+class LoadRunner:
+    """Runs `ops` iterations of the order lifecycle over `workers` threads."""
+    def __init__(self, workload: Workload, basket: List[Tuple[int, float]], cancel_ratio: float = 0.1,
+                 payment_ratio: float = 0.8, seed: int = 1):
+        self.workload = workload
+        self.basket_sizes = [size for size, _ in basket]
+        self.basket_weights = [weight for _, weight in basket]
+        self.cancel_ratio = cancel_ratio
+        self.payment_ratio = payment_ratio
+        self.seed = seed
+        self._lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = {op: [] for op in OPERATIONS}
+        self.errors: Dict[str, int] = {op: 0 for op in OPERATIONS}
+
+    def _timed(self, op: str, fn):
+        start = time.perf_counter()
+        try:
+            with self.workload.tracer.command(op):
+                return fn()
+        except (OrderError, PaymentError):
+            with self._lock:
+                self.errors[op] += 1
+            return None
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            with self._lock:
+                self.latencies[op].append(elapsed)
+
+    def _iteration(self, rng: random.Random) -> None:
+        size = rng.choices(self.basket_sizes, self.basket_weights)[0]
+        prod_ids = rng.sample(range(1, self.workload.products + 1), min(size, self.workload.products))
+        items = [{"prod_id": prod_id, "quantity": rng.randint(1, 3)} for prod_id in prod_ids]
+        cust_id = rng.randint(1, self.workload.customers)
+        order = self._timed("order_create", lambda: self.workload.order_service.create_order(cust_id, items))
+        if order is None:
+            return
+        roll = rng.random()
+        if roll < self.cancel_ratio:
+            self._timed("order_cancel", lambda: self.workload.order_service.cancel_order(order["order_id"]))
+        elif roll < self.cancel_ratio + self.payment_ratio:
+            method = rng.choice(PAYMENT_METHODS)
+            self._timed("payment_process",
+                        lambda: self.workload.payment_service.process_payment(order["order_id"], method))
+
+    def run(self, ops: int, workers: int = 1, warmup: int = 0) -> float:
+        """Runs the warm-up iterations unmeasured, then `ops` measured ones; returns elapsed seconds."""
+        if warmup:
+            rng = random.Random(self.seed - 1)
+            for _ in range(warmup):
+                self._iteration(rng)
+            self.latencies = {op: [] for op in OPERATIONS}
+            self.errors = {op: 0 for op in OPERATIONS}
+            self.workload.tracer.commands.clear()
+            self.workload.client.round_trips = 0
+
+        def work(worker: int, count: int) -> None:
+            rng = random.Random(self.seed * 1000 + worker)
+            for _ in range(count):
+                self._iteration(rng)
+
+        shares = [ops // workers + (1 if i < ops % workers else 0) for i in range(workers)]
+        threads = [threading.Thread(target=work, args=(i, share), name=f"bench-{i}") for i, share in enumerate(shares)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - start
+
+    def report(self, elapsed: float) -> Dict:
+        commands = self.workload.tracer.commands
+        operations = {}
+        for op in OPERATIONS:
+            samples = self.latencies[op]
+            if not samples:
+                continue
+            trips = commands[op].round_trips if op in commands else 0
+            operations[op] = {
+                "count": len(samples),
+                "errors": self.errors[op],
+                "ops_per_second": round(len(samples) / elapsed, 1) if elapsed else 0.0,
+                "round_trips_per_op": round(trips / len(samples), 2),
+                "p50_ms": round(percentile(samples, 50), 3),
+                "p99_ms": round(percentile(samples, 99), 3),
+                "mean_ms": round(sum(samples) / len(samples), 3),
+            }
+        total = sum(len(samples) for samples in self.latencies.values())
+        return {
+            "elapsed_seconds": round(elapsed, 3),
+            "operations_total": total,
+            "ops_per_second": round(total / elapsed, 1) if elapsed else 0.0,
+            "round_trips_total": self.workload.client.round_trips,
+            "operations": operations,
+        }
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        proc = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return proc.stdout.strip() or None
+
+
+def compare(report: Dict, baseline: Dict) -> Dict:
+    """Relative change per operation against an earlier report (+0.10 means 10% higher)."""
+    changes = {}
+    for op, current in report["operations"].items():
+        before = baseline.get("operations", {}).get(op)
+        if not before:
+            continue
+        changes[op] = {
+            metric: round(current[metric] / before[metric] - 1, 3) if before.get(metric) else None
+            for metric in ("ops_per_second", "round_trips_per_op", "p50_ms", "p99_ms")
+        }
+    return changes
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="bench.load", description="Load-test the order and payment services")
+    parser.add_argument("--ops", type=int, default=2000, help="Measured order lifecycles (create, then cancel or pay)")
+    parser.add_argument("--warmup", type=int, default=100, help="Unmeasured iterations run first")
+    parser.add_argument("--workers", type=int, default=1, help="Threads driving the services")
+    parser.add_argument("--customers", type=int, default=1000)
+    parser.add_argument("--products", type=int, default=5000, help="Catalog size")
+    parser.add_argument("--stock", type=int, default=1_000_000, help="Initial stock per product")
+    parser.add_argument("--basket", default="1:50,2:25,3:15,5:10",
+                        help="Basket size distribution as size:weight pairs")
+    parser.add_argument("--cancel-ratio", type=float, default=0.1, help="Share of orders cancelled")
+    parser.add_argument("--payment-ratio", type=float, default=0.8, help="Share of orders paid")
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="Injected latency per round trip")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Uniform jitter added to the latency")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Also write the report to this file")
+    parser.add_argument("--compare", help="Earlier report to compare against")
+    args = parser.parse_args(argv)
+
+    try:
+        basket = parse_basket(args.basket)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.cancel_ratio + args.payment_ratio > 1:
+        parser.error("--cancel-ratio and --payment-ratio must add up to at most 1.")
+    if args.workers < 1 or args.ops < 1:
+        parser.error("--ops and --workers must be at least 1.")
+
+    workload = Workload(args.customers, args.products, args.stock, args.latency_ms, args.jitter_ms, args.seed)
+    runner = LoadRunner(workload, basket, args.cancel_ratio, args.payment_ratio, args.seed)
+    elapsed = runner.run(args.ops, args.workers, args.warmup)
+    report = {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "git_revision": _git_revision(),
+        "python": platform.python_version(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        **runner.report(elapsed),
+    }
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            report["compared_to"] = args.compare
+            report["changes"] = compare(report, json.load(f))
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
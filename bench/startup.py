@@ -0,0 +1,144 @@
+# bench/startup.py
+"""
+CLI startup benchmark.
+
+For each command it reports the `-X importtime` breakdown (slowest modules by
+cumulative import time) and the cold-start time from process launch to the first
+byte on stdout, median and max over several fresh interpreters.
+
+    python -m bench.startup                  # --help and 'product list'
+    python -m bench.startup --runs 20 --json
+    python -m bench.startup --max-ms 250     # exit 1 if any median is over budget
+
+Commands run against RETAIL_BACKEND=memory unless --backend says otherwise, so the
+numbers measure startup rather than the network. `--help` must not import any
+DAO, service, config or driver module; such imports are reported and fail the run.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+COMMANDS = {
+    "help": ["--help"],
+    "product list": ["product", "list"],
+}
+
+# Modules that `--help` has no business loading
+HELP_FORBIDDEN = ("src.dao", "src.services", "src.config", "src.backends", "supabase", "dotenv", "httpx")
+
+
+def _env(backend: str) -> Dict[str, str]:
+    env = dict(os.environ)
+    env["RETAIL_BACKEND"] = backend
+    env.pop("RETAIL_CLI_SOCKET", None)  # always measure a real startup, never the daemon
+    env.pop("RETAIL_PROFILE", None)
+    return env
+
+
+def import_breakdown(argv: List[str], env: Dict[str, str]) -> List[Dict]:
+    """Runs the CLI once under -X importtime and returns one record per imported module."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-m", "src.cli.main", *argv],
+                          cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    modules = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        try:
+            self_us, cumulative_us = int(fields[0]), int(fields[1])
+        except ValueError:
+            continue  # the header row
+        modules.append({"module": fields[2].strip(), "self_us": self_us, "cumulative_us": cumulative_us})
+    return modules
+
+
+def first_byte(argv: List[str], env: Dict[str, str]) -> Dict[str, float]:
+    """Launches a fresh interpreter and times the first stdout byte and the exit."""
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-m", "src.cli.main", *argv],
+                            cwd=ROOT, env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    proc.stdout.read(1)
+    first = time.perf_counter() - start
+    proc.stdout.read()
+    proc.wait()
+    total = time.perf_counter() - start
+    return {"first_byte_ms": first * 1000, "total_ms": total * 1000}
+
+
+def run(runs: int, top: int, backend: str) -> Dict:
+    env = _env(backend)
+    report = {"python": sys.version.split()[0], "backend": backend, "runs": runs, "commands": {}}
+    for name, argv in COMMANDS.items():
+        modules = import_breakdown(argv, env)
+        # Top-level entries (no leading indentation) add up to the whole import cost
+        total_us = sum(m["cumulative_us"] for m in modules if not m["module"].startswith(" "))
+        for m in modules:
+            m["module"] = m["module"].strip()
+        samples = [first_byte(argv, env) for _ in range(runs)]
+        first_ms = [s["first_byte_ms"] for s in samples]
+        total_ms = [s["total_ms"] for s in samples]
+        entry = {
+            "argv": argv,
+            "imports_ms": round(total_us / 1000, 2),
+            "modules_imported": len(modules),
+            "slowest_imports": [
+                {"module": m["module"], "cumulative_ms": round(m["cumulative_us"] / 1000, 2)}
+                for m in sorted(modules, key=lambda m: -m["cumulative_us"])[:top]
+            ],
+            "first_byte_ms": {"median": round(statistics.median(first_ms), 2), "max": round(max(first_ms), 2)},
+            "total_ms": {"median": round(statistics.median(total_ms), 2), "max": round(max(total_ms), 2)},
+        }
+        if name == "help":
+            entry["unexpected_imports"] = sorted(
+                m["module"] for m in modules
+                if any(m["module"] == p or m["module"].startswith(p + ".") for p in HELP_FORBIDDEN)
+            )
+        report["commands"][name] = entry
+    return report
+
+
+def format_report(report: Dict) -> str:
+    lines = [f"Python {report['python']}, backend={report['backend']}, {report['runs']} run(s) per command"]
+    for name, data in report["commands"].items():
+        lines.append(f"\n'{name}': first byte {data['first_byte_ms']['median']:.1f} ms median "
+                     f"({data['first_byte_ms']['max']:.1f} max), exit {data['total_ms']['median']:.1f} ms median, "
+                     f"imports {data['imports_ms']:.1f} ms across {data['modules_imported']} modules")
+        for m in data["slowest_imports"]:
+            lines.append(f"  {m['module']:<48} {m['cumulative_ms']:>9.2f} ms")
+        if data.get("unexpected_imports"):
+            lines.append(f"  ❌ unexpected imports: {', '.join(data['unexpected_imports'])}")
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="bench.startup", description="Measure CLI startup time")
+    parser.add_argument("--runs", type=int, default=10, help="Fresh interpreters per command")
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports listed per command")
+    parser.add_argument("--backend", default="memory", help="RETAIL_BACKEND for the measured commands")
+    parser.add_argument("--max-ms", type=float, help="Fail if any median time-to-first-byte exceeds this")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = run(args.runs, args.top, args.backend)
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+
+    failed = False
+    for name, data in report["commands"].items():
+        if data.get("unexpected_imports"):
+            failed = True
+        if args.max_ms is not None and data["first_byte_ms"]["median"] > args.max_ms:
+            print(f"❌ '{name}' took {data['first_byte_ms']['median']:.1f} ms to first byte "
+                  f"(budget {args.max_ms:.1f} ms)", file=sys.stderr)
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
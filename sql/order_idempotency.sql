@@ -0,0 +1,10 @@
+-- sql/order_idempotency.sql
+-- Stores the client's idempotency key on the order it created (OrderService.create_order).
+-- Run once in the Supabase SQL editor before using --idempotency-key.
+--
+-- The unique index makes the database, not the client, the final judge: a retry whose
+-- first attempt timed out after committing finds that order instead of inserting another.
+
+alter table orders add column if not exists idempotency_key text;
+
+create unique index if not exists orders_idempotency_key_key on orders (idempotency_key);
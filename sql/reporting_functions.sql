@@ -0,0 +1,24 @@
+-- sql/reporting_functions.sql
+-- Per-day sales aggregates used by OrderDAO.get_daily_sales and the local rollups
+-- in ReportingService. Run once in the Supabase SQL editor.
+
+-- Revenue and order count of COMPLETED orders for each UTC day in [start_date, end_date].
+-- Days without completed orders are omitted.
+create or replace function daily_sales(start_date date, end_date date)
+returns table (day date, total_revenue numeric, total_orders bigint)
+language sql
+stable
+as $$
+    select (o.order_date at time zone 'utc')::date as day,
+           sum(o.total_amount) as total_revenue,
+           count(*) as total_orders
+    from orders o
+    where o.status = 'COMPLETED'
+      and o.order_date >= start_date::timestamp at time zone 'utc'
+      and o.order_date < (end_date + 1)::timestamp at time zone 'utc'
+    group by 1
+    order by 1;
+$$;
+
+-- Range scans by date stay cheap as the table grows
+create index if not exists orders_order_date_idx on orders (order_date);
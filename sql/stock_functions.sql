@@ -0,0 +1,77 @@
+-- sql/stock_functions.sql
+-- Server-side stock reservation used by ProductDAO.reserve_stock / release_stock.
+-- Run once in the Supabase SQL editor.
+
+-- Decrements stock for every line, all-or-nothing.
+-- items: [{"prod_id": 1, "quantity": 2}, ...]
+-- Returns the lines that could not be reserved; no rows means the reservation succeeded.
+create or replace function reserve_stock(items jsonb)
+returns table (prod_id integer, requested integer, available integer)
+language plpgsql
+as $$
+#variable_conflict use_column
+begin
+    -- Lock the rows in a fixed order so concurrent reservations cannot deadlock
+    perform 1
+    from products p
+    where p.prod_id in (select (e->>'prod_id')::integer from jsonb_array_elements(items) e)
+    order by p.prod_id
+    for update;
+
+    return query
+    with req as (
+        select (e->>'prod_id')::integer as prod_id, sum((e->>'quantity')::integer)::integer as qty
+        from jsonb_array_elements(items) e
+        group by 1
+    )
+    select req.prod_id, req.qty, p.stock
+    from req
+    left join products p on p.prod_id = req.prod_id
+    where p.prod_id is null or p.stock < req.qty;
+
+    if found then
+        return;
+    end if;
+
+    update products p
+    set stock = p.stock - req.qty
+    from (
+        select (e->>'prod_id')::integer as prod_id, sum((e->>'quantity')::integer)::integer as qty
+        from jsonb_array_elements(items) e
+        group by 1
+    ) req
+    where p.prod_id = req.prod_id;
+end;
+$$;
+
+-- Adds stock back for every line (order cancellation, failed checkout, restocking).
+-- Returns the lines whose product does not exist.
+create or replace function release_stock(items jsonb)
+returns table (prod_id integer, requested integer, available integer)
+language plpgsql
+as $$
+#variable_conflict use_column
+begin
+    return query
+    with req as (
+        select (e->>'prod_id')::integer as prod_id, sum((e->>'quantity')::integer)::integer as qty
+        from jsonb_array_elements(items) e
+        group by 1
+    )
+    select req.prod_id, req.qty, null::integer
+    from req
+    where not exists (select 1 from products p where p.prod_id = req.prod_id);
+
+    update products p
+    set stock = p.stock + req.qty
+    from (
+        select (e->>'prod_id')::integer as prod_id, sum((e->>'quantity')::integer)::integer as qty
+        from jsonb_array_elements(items) e
+        group by 1
+    ) req
+    where p.prod_id = req.prod_id;
+end;
+$$;
+
+-- Keeps the low-stock query (stock <= threshold) an index range scan
+create index if not exists products_stock_idx on products (stock);
@@ -0,0 +1,161 @@
+-- sql/stock_ledger.sql
+-- Append-only stock ledger used by LedgerProductDAO (RETAIL_STOCK_LEDGER=1).
+-- Run once in the Supabase SQL editor, after stock_functions.sql.
+--
+-- products.stock becomes a snapshot. Every change is a row in stock_movements, and
+-- available stock is the snapshot plus the movements not yet compacted into it.
+-- compact_stock() folds pending movements into the snapshot and flags them; the rows
+-- themselves are kept as the product's history.
+
+create table if not exists stock_movements (
+    movement_id bigserial primary key,
+    prod_id integer not null references products (prod_id) on delete cascade,
+    quantity integer not null,
+    reason text not null check (reason in ('order', 'cancel', 'restock', 'adjustment')),
+    order_id integer,
+    reservation text,
+    compacted boolean not null default false,
+    created_at timestamptz not null default now()
+);
+
+-- Tables created before reservations were linked to their orders
+alter table stock_movements add column if not exists reservation text;
+
+-- History per product, newest first
+create index if not exists stock_movements_prod_idx on stock_movements (prod_id, movement_id);
+-- Availability only sums pending movements; this index stays as small as the backlog
+create index if not exists stock_movements_pending_idx on stock_movements (prod_id) where not compacted;
+-- Reservations waiting to be linked to the order they were taken for
+create index if not exists stock_movements_reservation_idx on stock_movements (reservation) where order_id is null;
+
+-- Snapshot plus pending movements, read in one statement so a concurrent compaction
+-- is seen either entirely or not at all.
+create or replace function available_stock(prod_ids integer[])
+returns table (prod_id integer, available integer)
+language sql
+stable
+as $$
+    select p.prod_id,
+           (p.stock + coalesce((select sum(m.quantity)
+                                from stock_movements m
+                                where m.prod_id = p.prod_id and not m.compacted), 0))::integer
+    from products p
+    where p.prod_id = any (prod_ids);
+$$;
+
+-- Reserves every line, all-or-nothing, by appending negative 'order' movements.
+-- items: [{"prod_id": 1, "quantity": 2, "reservation": "..."}, ...]
+-- Stock is reserved before the order row exists, so each line may carry a reservation
+-- reference; link_stock_reservations() later stores the order ID on its movements.
+-- Returns the lines that could not be reserved; no rows means the reservation succeeded.
+create or replace function ledger_reserve_stock(items jsonb)
+returns table (prod_id integer, requested integer, available integer)
+language plpgsql
+as $$
+#variable_conflict use_column
+declare
+    r record;
+begin
+    -- Only decrements of the same product wait for each other: the lock is a
+    -- transaction-scoped advisory lock, taken in prod_id order so reservations cannot
+    -- deadlock. The products row is never written, so reads, cancellations and
+    -- restocks of a hot product never queue behind checkouts.
+    for r in
+        select distinct (e->>'prod_id')::integer as pid from jsonb_array_elements(items) e order by 1
+    loop
+        perform pg_advisory_xact_lock(hashtext('stock_movements'), r.pid);
+    end loop;
+
+    return query
+    with req as (
+        select (e->>'prod_id')::integer as prod_id, sum((e->>'quantity')::integer)::integer as qty
+        from jsonb_array_elements(items) e
+        group by 1
+    )
+    select req.prod_id, req.qty, a.available
+    from req
+    left join available_stock(array(select req.prod_id from req)) a on a.prod_id = req.prod_id
+    where a.prod_id is null or a.available < req.qty;
+
+    if found then
+        return;
+    end if;
+
+    insert into stock_movements (prod_id, quantity, reason, reservation)
+    select (e->>'prod_id')::integer, -sum((e->>'quantity')::integer)::integer, 'order', e->>'reservation'
+    from jsonb_array_elements(items) e
+    group by 1, 4;
+end;
+$$;
+
+-- Stores the order ID on the 'order' movements of each reservation, once the order exists.
+-- links: [{"reservation": "...", "order_id": 42}, ...]
+create or replace function link_stock_reservations(links jsonb)
+returns void
+language sql
+as $$
+    update stock_movements m
+    set order_id = (l->>'order_id')::integer
+    from jsonb_array_elements(links) l
+    where m.reservation = l->>'reservation' and m.order_id is null;
+$$;
+
+-- Appends one movement per line (cancellations, restocks, adjustments). No locks:
+-- increments can never oversell. Lines may carry an order_id.
+-- Returns the lines whose product does not exist.
+create or replace function record_stock_movements(items jsonb, reason text)
+returns table (prod_id integer, requested integer, available integer)
+language plpgsql
+as $$
+#variable_conflict use_column
+begin
+    return query
+    with req as (
+        select (e->>'prod_id')::integer as prod_id, sum((e->>'quantity')::integer)::integer as qty
+        from jsonb_array_elements(items) e
+        group by 1
+    )
+    select req.prod_id, req.qty, null::integer
+    from req
+    where not exists (select 1 from products p where p.prod_id = req.prod_id);
+
+    insert into stock_movements (prod_id, quantity, reason, order_id)
+    select (e->>'prod_id')::integer, (e->>'quantity')::integer, record_stock_movements.reason,
+           (e->>'order_id')::integer
+    from jsonb_array_elements(items) e
+    where exists (select 1 from products p where p.prod_id = (e->>'prod_id')::integer);
+end;
+$$;
+
+-- Folds every pending movement into products.stock and flags it compacted, in one
+-- statement. Movements committed while this runs are simply left for the next run;
+-- available stock is the same before and after. Safe to run concurrently with itself.
+-- Returns one row per product touched.
+create or replace function compact_stock()
+returns table (prod_id integer, movements integer, delta integer)
+language plpgsql
+as $$
+#variable_conflict use_column
+begin
+    return query
+    with folded as (
+        update stock_movements m
+        set compacted = true
+        where not m.compacted
+        returning m.prod_id, m.quantity
+    ), sums as (
+        select f.prod_id, count(*)::integer as movements, sum(f.quantity)::integer as delta
+        from folded f
+        group by f.prod_id
+    ), applied as (
+        update products p
+        set stock = p.stock + s.delta
+        from sums s
+        where p.prod_id = s.prod_id
+        returning p.prod_id
+    )
+    select s.prod_id, s.movements, s.delta
+    from sums s
+    order by s.prod_id;
+end;
+$$;
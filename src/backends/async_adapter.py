@@ -0,0 +1,39 @@
+# src/backends/async_adapter.py
+import asyncio
+from typing import Any, Dict, Optional
+
+
+class AsyncQuery:
+    """Chains like a sync query builder, but `execute()` is awaited and runs in a worker thread."""
+    def __init__(self, query: Any):
+        self._query = query
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._query, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            self._query = attr(*args, **kwargs)
+            return self
+        return call
+
+    async def execute(self):
+        return await asyncio.to_thread(self._query.execute)
+
+
+class AsyncClientAdapter:
+    """
+    Gives a synchronous client (the local backends) the awaitable interface of the
+    async supabase client, so the async DAOs run on every backend.
+    """
+    def __init__(self, client: Any):
+        self._client = client
+
+    def table(self, name: str) -> AsyncQuery:
+        return AsyncQuery(self._client.table(name))
+
+    from_ = table
+
+    def rpc(self, name: str, params: Optional[Dict] = None) -> AsyncQuery:
+        return AsyncQuery(self._client.rpc(name, params or {}))
@@ -0,0 +1,282 @@
+# src/backends/base.py
+import datetime
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def utc_now() -> str:
+    return datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")
+
+
+# Table layout shared by the local backends. Mirrors the Supabase tables the DAOs use.
+SCHEMA: Dict[str, Dict] = {
+    "products": {
+        "pk": "prod_id",
+        "unique": ["sku"],
+        "required": ["name", "sku", "price"],
+        "defaults": {"stock": 0, "category": None, "created_at": utc_now},
+    },
+    "customers": {
+        "pk": "cust_id",
+        "unique": ["email"],
+        "required": ["name", "email", "phone"],
+        "defaults": {"city": None, "created_at": utc_now},
+    },
+    "orders": {
+        "pk": "order_id",
+        "unique": ["idempotency_key"],
+        "required": ["cust_id"],
+        "defaults": {"total_amount": 0, "status": "PLACED", "order_date": utc_now, "idempotency_key": None},
+    },
+    "order_items": {
+        "pk": "item_id",
+        "unique": [],
+        "required": ["order_id", "prod_id", "quantity", "price"],
+        "defaults": {},
+    },
+    "payments": {
+        "pk": "payment_id",
+        "unique": [],
+        "required": ["order_id", "amount"],
+        "defaults": {"method": None, "status": "PENDING", "paid_at": None},
+    },
+    "stock_movements": {
+        "pk": "movement_id",
+        "unique": [],
+        "required": ["prod_id", "quantity", "reason"],
+        "defaults": {"order_id": None, "reservation": None, "compacted": False, "created_at": utc_now},
+    },
+}
+
+# (table, embedded table) -> (local column, remote column, embeds a list)
+RELATIONS: Dict[Tuple[str, str], Tuple[str, str, bool]] = {
+    ("order_items", "products"): ("prod_id", "prod_id", False),
+    ("order_items", "orders"): ("order_id", "order_id", False),
+    ("orders", "customers"): ("cust_id", "cust_id", False),
+    ("orders", "order_items"): ("order_id", "order_id", True),
+    ("orders", "payments"): ("order_id", "order_id", True),
+    ("payments", "orders"): ("order_id", "order_id", False),
+    ("customers", "orders"): ("cust_id", "cust_id", True),
+    ("products", "order_items"): ("prod_id", "prod_id", True),
+    ("products", "stock_movements"): ("prod_id", "prod_id", True),
+    ("stock_movements", "products"): ("prod_id", "prod_id", False),
+}
+
+
+class BackendError(Exception):
+    """Raised by the local backends for constraint violations and unsupported queries."""
+    pass
+
+
+class Response:
+    """Same shape as the postgrest response objects: `.data` and `.count`."""
+    def __init__(self, data: Any, count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+
+def parse_select(columns: str) -> List[Tuple[str, str, Optional[str]]]:
+    """
+    Splits a PostgREST select string into (alias, name, embedded select) triples,
+    e.g. "*, products(name, sku)" -> [("*", "*", None), ("products", "products", "name, sku")].
+    """
+    fields, token, depth = [], "", 0
+    for ch in columns:
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        if ch == "," and depth == 0:
+            fields.append(token.strip())
+            token = ""
+        else:
+            token += ch
+    if token.strip():
+        fields.append(token.strip())
+
+    parsed = []
+    for field in fields:
+        sub = None
+        if "(" in field:
+            field, sub = field.split("(", 1)
+            sub = sub.rsplit(")", 1)[0].strip()
+        alias, _, name = field.strip().rpartition(":")
+        name = name.split("!")[0].split("::")[0].strip()
+        parsed.append((alias.strip() or name, name, sub))
+    return parsed
+
+
+class LocalQuery:
+    """
+    Records a chained query (`table().select().eq().order().limit()`) and hands it
+    to the owning client on `execute()`.
+    """
+    def __init__(self, client: "LocalClient", table: str):
+        self._client = client
+        self.table = table
+        self.action = "select"
+        self.columns = "*"
+        self.count: Optional[str] = None
+        self.payload: Any = None
+        self.on_conflict: Optional[str] = None
+        self.filters: List[Tuple[str, str, Any]] = []
+        self.order_by: List[Tuple[str, bool]] = []
+        self.limit_count: Optional[int] = None
+        self.offset = 0
+
+    # --- Actions ---
+    def select(self, columns: str = "*", count: Optional[str] = None) -> "LocalQuery":
+        self.action, self.columns, self.count = "select", columns, count
+        return self
+
+    def insert(self, payload: Any) -> "LocalQuery":
+        self.action = "insert"
+        self.payload = payload if isinstance(payload, list) else [payload]
+        return self
+
+    def upsert(self, payload: Any, on_conflict: Optional[str] = None) -> "LocalQuery":
+        self.action = "upsert"
+        self.payload = payload if isinstance(payload, list) else [payload]
+        self.on_conflict = on_conflict or SCHEMA[self.table]["pk"]
+        return self
+
+    def update(self, fields: Dict) -> "LocalQuery":
+        self.action, self.payload = "update", dict(fields)
+        return self
+
+    def delete(self) -> "LocalQuery":
+        self.action = "delete"
+        return self
+
+    # --- Filters ---
+    def _filter(self, column: str, op: str, value: Any) -> "LocalQuery":
+        self.filters.append((column, op, value))
+        return self
+
+    def eq(self, column: str, value: Any) -> "LocalQuery":
+        return self._filter(column, "eq", value)
+
+    def neq(self, column: str, value: Any) -> "LocalQuery":
+        return self._filter(column, "neq", value)
+
+    def gt(self, column: str, value: Any) -> "LocalQuery":
+        return self._filter(column, "gt", value)
+
+    def gte(self, column: str, value: Any) -> "LocalQuery":
+        return self._filter(column, "gte", value)
+
+    def lt(self, column: str, value: Any) -> "LocalQuery":
+        return self._filter(column, "lt", value)
+
+    def lte(self, column: str, value: Any) -> "LocalQuery":
+        return self._filter(column, "lte", value)
+
+    def in_(self, column: str, values: List[Any]) -> "LocalQuery":
+        return self._filter(column, "in", list(values))
+
+    def like(self, column: str, pattern: str) -> "LocalQuery":
+        return self._filter(column, "like", pattern)
+
+    def ilike(self, column: str, pattern: str) -> "LocalQuery":
+        return self._filter(column, "ilike", pattern)
+
+    def is_(self, column: str, value: Any) -> "LocalQuery":
+        return self._filter(column, "is", None if value in (None, "null") else value)
+
+    # --- Modifiers ---
+    def order(self, column: str, desc: bool = False) -> "LocalQuery":
+        self.order_by.append((column, desc))
+        return self
+
+    def limit(self, count: int) -> "LocalQuery":
+        self.limit_count = count
+        return self
+
+    def range(self, start: int, end: int) -> "LocalQuery":
+        self.offset, self.limit_count = start, end - start + 1
+        return self
+
+    def execute(self) -> Response:
+        return self._client._execute(self)
+
+
+class LocalRpc:
+    def __init__(self, client: "LocalClient", name: str, params: Optional[Dict]):
+        self._client = client
+        self.name = name
+        self.params = params or {}
+
+    def execute(self) -> Response:
+        return self._client._call(self.name, self.params)
+
+
+class LocalClient:
+    """
+    Base class for the in-process backends. Exposes the subset of the supabase
+    `Client` interface the DAOs use (`table`, `rpc`) so DAOs work unchanged.
+    Subclasses implement `_run(query)` returning (rows, count).
+    """
+    def __init__(self):
+        self._lock = threading.RLock()
+
+    def table(self, name: str) -> LocalQuery:
+        if name not in SCHEMA:
+            raise BackendError(f"Unknown table '{name}'.")
+        return LocalQuery(self, name)
+
+    from_ = table
+
+    def rpc(self, name: str, params: Optional[Dict] = None) -> LocalRpc:
+        return LocalRpc(self, name, params)
+
+    @contextmanager
+    def transaction(self):
+        """Serializes a group of queries; used by the emulated server functions."""
+        with self._lock:
+            yield
+
+    def _execute(self, query: LocalQuery) -> Response:
+        with self._lock:
+            rows, count = self._run(query)
+            if query.action == "select":
+                rows = self._project(query.table, rows, query.columns)
+        return Response(rows, count)
+
+    def _call(self, name: str, params: Dict) -> Response:
+        from src.backends.functions import FUNCTIONS
+        if name not in FUNCTIONS:
+            raise BackendError(f"Unknown function '{name}'.")
+        return Response(FUNCTIONS[name](self, **params))
+
+    def _run(self, query: LocalQuery) -> Tuple[List[Dict], Optional[int]]:
+        raise NotImplementedError
+
+    def _project(self, table: str, rows: List[Dict], columns: str) -> List[Dict]:
+        """Applies the select list to full rows, resolving embedded resources with one IN query each."""
+        fields = parse_select(columns)
+        if any(name == "*" for _, name, sub in fields if sub is None):
+            result = [dict(row) for row in rows]
+        else:
+            result = [{alias: row.get(name) for alias, name, sub in fields if sub is None} for row in rows]
+
+        for alias, name, sub in fields:
+            if sub is None:
+                continue
+            if (table, name) not in RELATIONS:
+                raise BackendError(f"No relationship between '{table}' and '{name}'.")
+            local, remote, many = RELATIONS[(table, name)]
+            keys = list({row[local] for row in rows if row.get(local) is not None})
+            sub_names = {n for _, n, s in parse_select(sub or "*") if s is None}
+            strip_key = "*" not in sub_names and remote not in sub_names
+            related: List[Dict] = []
+            if keys:
+                related = self.table(name).select(f"{sub}, {remote}" if strip_key else sub).in_(remote, keys).execute().data
+            grouped: Dict[Any, List[Dict]] = {}
+            for rel in related:
+                key = rel.pop(remote) if strip_key else rel[remote]
+                grouped.setdefault(key, []).append(rel)
+            for row, out in zip(rows, result):
+                matches = grouped.get(row.get(local), [])
+                out[alias] = [dict(m) for m in matches] if many else (dict(matches[0]) if matches else None)
+        return result
@@ -0,0 +1,165 @@
+# src/backends/functions.py
+"""
+Python versions of the Postgres functions the DAOs call through `rpc()`,
+so the local backends answer the same calls as Supabase.
+"""
+import datetime
+from typing import Dict, List
+
+
+def _sum_quantities(items: List[Dict]) -> Dict[int, int]:
+    requested: Dict[int, int] = {}
+    for item in items:
+        requested[int(item["prod_id"])] = requested.get(int(item["prod_id"]), 0) + int(item["quantity"])
+    return requested
+
+
+def sales_report(client, start_date: str, end_date: str) -> List[Dict]:
+    end_exclusive = (datetime.date.fromisoformat(end_date) + datetime.timedelta(days=1)).isoformat()
+    rows = (client.table("orders").select("total_amount").eq("status", "COMPLETED")
+            .gte("order_date", start_date).lt("order_date", end_exclusive).execute().data)
+    return [{"total_revenue": sum(r["total_amount"] or 0 for r in rows), "total_orders": len(rows)}]
+
+
+def daily_sales(client, start_date: str, end_date: str) -> List[Dict]:
+    end_exclusive = (datetime.date.fromisoformat(end_date) + datetime.timedelta(days=1)).isoformat()
+    rows = (client.table("orders").select("order_date, total_amount").eq("status", "COMPLETED")
+            .gte("order_date", start_date).lt("order_date", end_exclusive).execute().data)
+    days: Dict[str, Dict] = {}
+    for r in rows:
+        day = str(r["order_date"])[:10]
+        entry = days.setdefault(day, {"day": day, "total_revenue": 0, "total_orders": 0})
+        entry["total_revenue"] += r["total_amount"] or 0
+        entry["total_orders"] += 1
+    return [days[day] for day in sorted(days)]
+
+
+def reserve_stock(client, items: List[Dict]) -> List[Dict]:
+    requested = _sum_quantities(items)
+    with client.transaction():
+        rows = client.table("products").select("prod_id, stock").in_("prod_id", list(requested)).execute().data
+        stock = {r["prod_id"]: r["stock"] for r in rows}
+        failed = [
+            {"prod_id": prod_id, "requested": qty, "available": stock.get(prod_id)}
+            for prod_id, qty in requested.items()
+            if stock.get(prod_id) is None or stock[prod_id] < qty
+        ]
+        if failed:
+            return failed
+        for prod_id, qty in requested.items():
+            client.table("products").update({"stock": stock[prod_id] - qty}).eq("prod_id", prod_id).execute()
+    return []
+
+
+def release_stock(client, items: List[Dict]) -> List[Dict]:
+    requested = _sum_quantities(items)
+    with client.transaction():
+        rows = client.table("products").select("prod_id, stock").in_("prod_id", list(requested)).execute().data
+        stock = {r["prod_id"]: r["stock"] for r in rows}
+        for prod_id, qty in requested.items():
+            if prod_id in stock:
+                client.table("products").update({"stock": stock[prod_id] + qty}).eq("prod_id", prod_id).execute()
+    return [
+        {"prod_id": prod_id, "requested": qty, "available": None}
+        for prod_id, qty in requested.items()
+        if prod_id not in stock
+    ]
+
+
+MOVEMENT_REASONS = ("order", "cancel", "restock", "adjustment")
+
+
+def _available(client, prod_ids: List[int]) -> Dict[int, int]:
+    rows = client.table("products").select("prod_id, stock").in_("prod_id", prod_ids).execute().data
+    available = {r["prod_id"]: r["stock"] or 0 for r in rows}
+    pending = (client.table("stock_movements").select("prod_id, quantity")
+               .in_("prod_id", prod_ids).eq("compacted", False).execute().data)
+    for m in pending:
+        if m["prod_id"] in available:
+            available[m["prod_id"]] += m["quantity"]
+    return available
+
+
+def available_stock(client, prod_ids: List[int]) -> List[Dict]:
+    with client.transaction():
+        available = _available(client, [int(p) for p in prod_ids])
+    return [{"prod_id": prod_id, "available": qty} for prod_id, qty in available.items()]
+
+
+def ledger_reserve_stock(client, items: List[Dict]) -> List[Dict]:
+    requested = _sum_quantities(items)
+    with client.transaction():
+        available = _available(client, list(requested))
+        failed = [
+            {"prod_id": prod_id, "requested": qty, "available": available.get(prod_id)}
+            for prod_id, qty in requested.items()
+            if available.get(prod_id) is None or available[prod_id] < qty
+        ]
+        if failed:
+            return failed
+        lines: Dict[tuple, int] = {}
+        for item in items:
+            key = (int(item["prod_id"]), item.get("reservation"))
+            lines[key] = lines.get(key, 0) + int(item["quantity"])
+        client.table("stock_movements").insert(
+            [{"prod_id": prod_id, "quantity": -qty, "reason": "order", "reservation": reservation}
+             for (prod_id, reservation), qty in lines.items()]).execute()
+    return []
+
+
+def link_stock_reservations(client, links: List[Dict]) -> List[Dict]:
+    with client.transaction():
+        for link in links:
+            (client.table("stock_movements").update({"order_id": int(link["order_id"])})
+             .eq("reservation", link["reservation"]).is_("order_id", "null").execute())
+    return []
+
+
+def record_stock_movements(client, items: List[Dict], reason: str) -> List[Dict]:
+    if reason not in MOVEMENT_REASONS:
+        raise ValueError(f"Unknown stock movement reason '{reason}'.")
+    prod_ids = list(_sum_quantities(items))
+    with client.transaction():
+        existing = {r["prod_id"] for r in
+                    client.table("products").select("prod_id").in_("prod_id", prod_ids).execute().data}
+        rows = [{"prod_id": int(item["prod_id"]), "quantity": int(item["quantity"]), "reason": reason,
+                 "order_id": item.get("order_id")} for item in items if int(item["prod_id"]) in existing]
+        if rows:
+            client.table("stock_movements").insert(rows).execute()
+    return [
+        {"prod_id": prod_id, "requested": qty, "available": None}
+        for prod_id, qty in _sum_quantities(items).items()
+        if prod_id not in existing
+    ]
+
+
+def compact_stock(client) -> List[Dict]:
+    with client.transaction():
+        pending = (client.table("stock_movements").select("prod_id, quantity")
+                   .eq("compacted", False).execute().data)
+        if not pending:
+            return []
+        folded: Dict[int, Dict] = {}
+        for m in pending:
+            entry = folded.setdefault(m["prod_id"], {"prod_id": m["prod_id"], "movements": 0, "delta": 0})
+            entry["movements"] += 1
+            entry["delta"] += m["quantity"]
+        client.table("stock_movements").update({"compacted": True}).eq("compacted", False).execute()
+        rows = client.table("products").select("prod_id, stock").in_("prod_id", list(folded)).execute().data
+        for r in rows:
+            client.table("products").update(
+                {"stock": (r["stock"] or 0) + folded[r["prod_id"]]["delta"]}).eq("prod_id", r["prod_id"]).execute()
+    return [folded[prod_id] for prod_id in sorted(folded)]
+
+
+FUNCTIONS = {
+    "sales_report": sales_report,
+    "daily_sales": daily_sales,
+    "reserve_stock": reserve_stock,
+    "release_stock": release_stock,
+    "available_stock": available_stock,
+    "ledger_reserve_stock": ledger_reserve_stock,
+    "link_stock_reservations": link_stock_reservations,
+    "record_stock_movements": record_stock_movements,
+    "compact_stock": compact_stock,
+}
@@ -0,0 +1,233 @@
+# src/backends/memory.py
+import bisect
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from src.backends.base import SCHEMA, BackendError, LocalClient, LocalQuery
+
+
+def _like_to_regex(pattern: str, ignore_case: bool) -> "re.Pattern":
+    parts = []
+    for ch in pattern:
+        if ch in "%*":
+            parts.append(".*")
+        elif ch == "_":
+            parts.append(".")
+        else:
+            parts.append(re.escape(ch))
+    return re.compile("^" + "".join(parts) + "$", re.IGNORECASE if ignore_case else 0)
+
+
+def _compile_filter(column: str, op: str, value: Any) -> Callable[[Dict], bool]:
+    if op == "eq":
+        return lambda row: row.get(column) is not None and row.get(column) == value
+    if op == "neq":
+        return lambda row: row.get(column) is not None and row.get(column) != value
+    if op == "in":
+        values = set(value)
+        return lambda row: row.get(column) in values
+    if op == "is":
+        return lambda row: row.get(column) is value or row.get(column) == value
+    if op in ("like", "ilike"):
+        regex = _like_to_regex(value, op == "ilike")
+        return lambda row: row.get(column) is not None and bool(regex.match(str(row.get(column))))
+    compare = {
+        "gt": lambda a: a > value,
+        "gte": lambda a: a >= value,
+        "lt": lambda a: a < value,
+        "lte": lambda a: a <= value,
+    }.get(op)
+    if compare is None:
+        raise BackendError(f"Unsupported filter '{op}'.")
+    return lambda row: row.get(column) is not None and compare(row.get(column))
+
+
+class MemoryClient(LocalClient):
+    """
+    Dict-backed backend living entirely in the current process.
+    Rows are keyed by primary key; unique columns keep a side index, and a sorted
+    key list lets keyset pages start at their bound and stop once full.
+    """
+    def __init__(self):
+        super().__init__()
+        self._rows: Dict[str, Dict[Any, Dict]] = {name: {} for name in SCHEMA}
+        self._unique: Dict[str, Dict[str, Dict[Any, Any]]] = {
+            name: {column: {} for column in spec["unique"]} for name, spec in SCHEMA.items()
+        }
+        self._next_id: Dict[str, int] = {name: 1 for name in SCHEMA}
+        self._pk_order: Dict[str, List[Any]] = {name: [] for name in SCHEMA}
+
+    def _run(self, query: LocalQuery) -> Tuple[List[Dict], Optional[int]]:
+        handler = getattr(self, f"_{query.action}")
+        return handler(query)
+
+    # --- Reads ---
+    def _matching(self, query: LocalQuery) -> List[Dict]:
+        table = self._rows[query.table]
+        pk = SCHEMA[query.table]["pk"]
+        filters = query.filters
+        # Primary-key and unique lookups skip the table scan
+        for column, op, value in filters:
+            if op == "eq" and column == pk:
+                candidates = [table[value]] if value in table else []
+                break
+            if op == "in" and column == pk:
+                candidates = [table[v] for v in dict.fromkeys(value) if v in table]
+                break
+            if op == "eq" and column in self._unique[query.table]:
+                key = self._unique[query.table][column].get(value)
+                candidates = [table[key]] if key is not None else []
+                break
+        else:
+            candidates = list(table.values())
+        predicates = [_compile_filter(*f) for f in filters]
+        return [row for row in candidates if all(p(row) for p in predicates)]
+
+    def _page_in_pk_order(self, query: LocalQuery) -> List[Dict]:
+        """Walks rows in primary-key order from any gt/gte bound and stops once the page is full."""
+        table = self._rows[query.table]
+        pk = SCHEMA[query.table]["pk"]
+        keys = self._pk_order[query.table]
+        start = 0
+        for column, op, value in query.filters:
+            if column == pk and op == "gt":
+                start = max(start, bisect.bisect_right(keys, value))
+            elif column == pk and op == "gte":
+                start = max(start, bisect.bisect_left(keys, value))
+        predicates = [_compile_filter(*f) for f in query.filters]
+        wanted = query.offset + query.limit_count
+        rows = []
+        for i in range(start, len(keys)):
+            row = table[keys[i]]
+            if all(p(row) for p in predicates):
+                rows.append(row)
+                if len(rows) == wanted:
+                    break
+        return [dict(r) for r in rows[query.offset:]]
+
+    def _select(self, query: LocalQuery) -> Tuple[List[Dict], Optional[int]]:
+        pk = SCHEMA[query.table]["pk"]
+        unique = self._unique[query.table]
+        if (query.limit_count is not None and not query.count and query.order_by in ([], [(pk, False)])
+                and not any(op in ("eq", "in") and (column == pk or column in unique)
+                            for column, op, _ in query.filters)):
+            return self._page_in_pk_order(query), None
+        rows = self._matching(query)
+        for column, desc in reversed(query.order_by):
+            present = [r for r in rows if r.get(column) is not None]
+            missing = [r for r in rows if r.get(column) is None]
+            present.sort(key=lambda r: r[column], reverse=desc)
+            rows = missing + present if desc else present + missing
+        if not query.order_by:
+            pk = SCHEMA[query.table]["pk"]
+            rows.sort(key=lambda r: r[pk])
+        count = len(rows) if query.count else None
+        end = None if query.limit_count is None else query.offset + query.limit_count
+        return [dict(r) for r in rows[query.offset:end]], count
+
+    # --- Writes ---
+    def _prepare(self, table: str, row: Dict) -> Dict:
+        spec = SCHEMA[table]
+        pk = spec["pk"]
+        new_row = {pk: None, **row}
+        for column, default in spec["defaults"].items():
+            if column not in new_row:
+                new_row[column] = default() if callable(default) else default
+        for column in spec["required"]:
+            if new_row.get(column) is None:
+                raise BackendError(f"null value in column '{column}' of relation '{table}' violates not-null constraint")
+        if new_row.get(pk) is None:
+            new_row[pk] = self._next_id[table]
+        self._next_id[table] = max(self._next_id[table], new_row[pk] + 1)
+        return new_row
+
+    def _check_unique(self, table: str, row: Dict, pk_value: Any) -> None:
+        for column, index in self._unique[table].items():
+            owner = index.get(row.get(column))
+            if owner is not None and owner != pk_value:
+                raise BackendError(f"duplicate key value violates unique constraint '{table}_{column}_key'")
+
+    def _store(self, table: str, row: Dict) -> None:
+        pk = SCHEMA[table]["pk"]
+        old = self._rows[table].get(row[pk])
+        for column, index in self._unique[table].items():
+            if old is not None and old.get(column) is not None:
+                index.pop(old[column], None)
+            if row.get(column) is not None:
+                index[row[column]] = row[pk]
+        if old is None:
+            keys = self._pk_order[table]
+            if not keys or row[pk] > keys[-1]:
+                keys.append(row[pk])
+            else:
+                bisect.insort(keys, row[pk])
+        self._rows[table][row[pk]] = row
+
+    def _insert(self, query: LocalQuery) -> Tuple[List[Dict], Optional[int]]:
+        table = query.table
+        pk = SCHEMA[table]["pk"]
+        next_id = self._next_id[table]
+        prepared = []
+        seen: Dict[str, set] = {column: set() for column in [pk, *self._unique[table]]}
+        try:
+            for row in query.payload:
+                new_row = self._prepare(table, row)
+                if new_row[pk] in self._rows[table]:
+                    raise BackendError(f"duplicate key value violates unique constraint '{table}_pkey'")
+                self._check_unique(table, new_row, new_row[pk])
+                # Duplicates within the same multi-row insert
+                for column, values in seen.items():
+                    value = new_row.get(column)
+                    if value is not None and value in values:
+                        raise BackendError(f"duplicate key value violates unique constraint '{table}_{column}_key'")
+                    values.add(value)
+                prepared.append(new_row)
+        except BackendError:
+            self._next_id[table] = next_id
+            raise
+        for row in prepared:
+            self._store(table, row)
+        return [dict(r) for r in prepared], None
+
+    def _upsert(self, query: LocalQuery) -> Tuple[List[Dict], Optional[int]]:
+        table = query.table
+        pk = SCHEMA[table]["pk"]
+        conflict = query.on_conflict
+        written = []
+        for row in query.payload:
+            if conflict == pk:
+                existing = self._rows[table].get(row.get(pk))
+            else:
+                key = self._unique[table].get(conflict, {}).get(row.get(conflict))
+                existing = self._rows[table].get(key) if key is not None else None
+            if existing is None:
+                new_row = self._prepare(table, row)
+            else:
+                new_row = {**existing, **row, pk: existing[pk]}
+            self._check_unique(table, new_row, new_row[pk])
+            self._store(table, new_row)
+            written.append(dict(new_row))
+        return written, None
+
+    def _update(self, query: LocalQuery) -> Tuple[List[Dict], Optional[int]]:
+        table = query.table
+        pk = SCHEMA[table]["pk"]
+        updated = []
+        for row in self._matching(query):
+            new_row = {**row, **query.payload}
+            self._check_unique(table, new_row, row[pk])
+            updated.append(new_row)
+        for row in updated:
+            self._store(table, row)
+        return [dict(r) for r in updated], None
+
+    def _delete(self, query: LocalQuery) -> Tuple[List[Dict], Optional[int]]:
+        table = query.table
+        pk = SCHEMA[table]["pk"]
+        deleted = self._matching(query)
+        for row in deleted:
+            del self._rows[table][row[pk]]
+            keys = self._pk_order[table]
+            del keys[bisect.bisect_left(keys, row[pk])]
+            for column, index in self._unique[table].items():
+                index.pop(row.get(column), None)
+        return [dict(r) for r in deleted], None
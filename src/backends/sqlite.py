@@ -0,0 +1,208 @@
+# src/backends/sqlite.py
+import sqlite3
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+from src.backends.base import SCHEMA, BackendError, LocalClient, LocalQuery
+
+_NOW = "(strftime('%Y-%m-%dT%H:%M:%S+00:00', 'now'))"
+
+DDL = f"""
+CREATE TABLE IF NOT EXISTS products (
+    prod_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    sku TEXT NOT NULL UNIQUE,
+    price REAL NOT NULL,
+    stock INTEGER NOT NULL DEFAULT 0,
+    category TEXT,
+    created_at TEXT DEFAULT {_NOW}
+);
+CREATE TABLE IF NOT EXISTS customers (
+    cust_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    email TEXT NOT NULL UNIQUE,
+    phone TEXT NOT NULL,
+    city TEXT,
+    created_at TEXT DEFAULT {_NOW}
+);
+CREATE TABLE IF NOT EXISTS orders (
+    order_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    cust_id INTEGER NOT NULL REFERENCES customers (cust_id),
+    order_date TEXT DEFAULT {_NOW},
+    total_amount REAL DEFAULT 0,
+    status TEXT DEFAULT 'PLACED',
+    idempotency_key TEXT
+);
+CREATE TABLE IF NOT EXISTS order_items (
+    item_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    order_id INTEGER NOT NULL REFERENCES orders (order_id),
+    prod_id INTEGER NOT NULL REFERENCES products (prod_id),
+    quantity INTEGER NOT NULL,
+    price REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS payments (
+    payment_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    order_id INTEGER NOT NULL REFERENCES orders (order_id),
+    amount REAL NOT NULL,
+    method TEXT,
+    status TEXT DEFAULT 'PENDING',
+    paid_at TEXT
+);
+CREATE TABLE IF NOT EXISTS stock_movements (
+    movement_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    prod_id INTEGER NOT NULL REFERENCES products (prod_id) ON DELETE CASCADE,
+    quantity INTEGER NOT NULL,
+    reason TEXT NOT NULL CHECK (reason IN ('order', 'cancel', 'restock', 'adjustment')),
+    order_id INTEGER,
+    reservation TEXT,
+    compacted INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT DEFAULT {_NOW}
+);
+CREATE INDEX IF NOT EXISTS idx_products_category ON products (category);
+CREATE INDEX IF NOT EXISTS idx_products_stock ON products (stock);
+CREATE INDEX IF NOT EXISTS idx_customers_city ON customers (city);
+CREATE INDEX IF NOT EXISTS idx_orders_cust_id ON orders (cust_id);
+CREATE INDEX IF NOT EXISTS idx_orders_order_date ON orders (order_date);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_orders_idempotency_key ON orders (idempotency_key);
+CREATE INDEX IF NOT EXISTS idx_order_items_order_id ON order_items (order_id);
+CREATE INDEX IF NOT EXISTS idx_order_items_prod_id ON order_items (prod_id);
+CREATE INDEX IF NOT EXISTS idx_payments_order_id ON payments (order_id);
+CREATE INDEX IF NOT EXISTS idx_stock_movements_prod_id ON stock_movements (prod_id, movement_id);
+CREATE INDEX IF NOT EXISTS idx_stock_movements_pending ON stock_movements (prod_id) WHERE compacted = 0;
+CREATE INDEX IF NOT EXISTS idx_stock_movements_reservation ON stock_movements (reservation) WHERE order_id IS NULL;
+"""
+
+_OPERATORS = {"eq": "=", "neq": "!=", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+
+
+class SQLiteClient(LocalClient):
+    """
+    Embedded SQLite backend. `sku` and `email` are unique-indexed, and `city`,
+    `cust_id` and `order_id` carry secondary indexes so the DAO lookups stay indexed.
+    """
+    def __init__(self, path: str = "retail.db"):
+        super().__init__()
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode = WAL")
+            self._conn.execute("PRAGMA synchronous = NORMAL")
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(orders)")}
+        if columns and "idempotency_key" not in columns:
+            # Databases created before idempotency keys were stored on orders
+            self._conn.execute("ALTER TABLE orders ADD COLUMN idempotency_key TEXT")
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(stock_movements)")}
+        if columns and "reservation" not in columns:
+            # Ledgers created before reservations were linked to their orders
+            self._conn.execute("ALTER TABLE stock_movements ADD COLUMN reservation TEXT")
+        self._conn.executescript(DDL)
+        self._depth = 0
+
+    def close(self) -> None:
+        self._conn.close()
+
+    @contextmanager
+    def transaction(self):
+        with self._lock:
+            if self._depth:
+                self._depth += 1
+                try:
+                    yield
+                finally:
+                    self._depth -= 1
+                return
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._depth = 1
+            try:
+                yield
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            else:
+                self._conn.execute("COMMIT")
+            finally:
+                self._depth = 0
+
+    def _run(self, query: LocalQuery) -> Tuple[List[Dict], Optional[int]]:
+        try:
+            if query.action == "select":
+                return self._select(query)
+            with self.transaction():
+                return getattr(self, f"_{query.action}")(query), None
+        except sqlite3.Error as e:
+            raise BackendError(str(e)) from e
+
+    def _where(self, query: LocalQuery) -> Tuple[str, List[Any]]:
+        clauses, params = [], []
+        for column, op, value in query.filters:
+            if op == "in":
+                if not value:
+                    clauses.append("0")
+                    continue
+                clauses.append(f'"{column}" IN ({", ".join("?" for _ in value)})')
+                params.extend(value)
+            elif op == "is":
+                clauses.append(f'"{column}" IS ?')
+                params.append(value)
+            elif op == "ilike":
+                # SQLite's LIKE is already case-insensitive for ASCII
+                clauses.append(f'"{column}" LIKE ?')
+                params.append(value.replace("*", "%"))
+            elif op == "like":
+                clauses.append(f'"{column}" GLOB ?')
+                params.append(value.replace("%", "*").replace("_", "?"))
+            elif op in _OPERATORS:
+                clauses.append(f'"{column}" {_OPERATORS[op]} ?')
+                params.append(value)
+            else:
+                raise BackendError(f"Unsupported filter '{op}'.")
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def _fetch(self, sql: str, params: List[Any]) -> List[Dict]:
+        return [dict(row) for row in self._conn.execute(sql, params).fetchall()]
+
+    def _select(self, query: LocalQuery) -> Tuple[List[Dict], Optional[int]]:
+        where, params = self._where(query)
+        count = None
+        if query.count:
+            count = self._conn.execute(f"SELECT COUNT(*) FROM {query.table}{where}", params).fetchone()[0]
+        order_by = query.order_by or [(SCHEMA[query.table]["pk"], False)]
+        order = ", ".join(
+            f'"{column}" {"DESC NULLS FIRST" if desc else "ASC NULLS LAST"}' for column, desc in order_by
+        )
+        sql = f"SELECT * FROM {query.table}{where} ORDER BY {order}"
+        if query.limit_count is not None or query.offset:
+            sql += f" LIMIT {-1 if query.limit_count is None else int(query.limit_count)} OFFSET {int(query.offset)}"
+        return self._fetch(sql, params), count
+
+    def _insert(self, query: LocalQuery) -> List[Dict]:
+        rows = []
+        for row in query.payload:
+            columns = ", ".join(f'"{c}"' for c in row)
+            marks = ", ".join("?" for _ in row)
+            sql = f"INSERT INTO {query.table} ({columns}) VALUES ({marks}) RETURNING *"
+            rows.extend(self._fetch(sql, list(row.values())))
+        return rows
+
+    def _upsert(self, query: LocalQuery) -> List[Dict]:
+        rows = []
+        for row in query.payload:
+            columns = ", ".join(f'"{c}"' for c in row)
+            marks = ", ".join("?" for _ in row)
+            updates = ", ".join(f'"{c}" = excluded."{c}"' for c in row if c != query.on_conflict)
+            action = f"DO UPDATE SET {updates}" if updates else "DO NOTHING"
+            sql = (f"INSERT INTO {query.table} ({columns}) VALUES ({marks}) "
+                   f'ON CONFLICT ("{query.on_conflict}") {action} RETURNING *')
+            rows.extend(self._fetch(sql, list(row.values())))
+        return rows
+
+    def _update(self, query: LocalQuery) -> List[Dict]:
+        where, params = self._where(query)
+        assignments = ", ".join(f'"{c}" = ?' for c in query.payload)
+        sql = f"UPDATE {query.table} SET {assignments}{where} RETURNING *"
+        return self._fetch(sql, list(query.payload.values()) + params)
+
+    def _delete(self, query: LocalQuery) -> List[Dict]:
+        where, params = self._where(query)
+        return self._fetch(f"DELETE FROM {query.table}{where} RETURNING *", params)
@@ -0,0 +1,44 @@
+# src/batching.py
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+def chunked(iterable: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Yields lists of up to `size` items without materializing the whole iterable."""
+    if size < 1:
+        raise ValueError("Chunk size must be at least 1.")
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def insert_with_fallback(insert_fn: Callable[[List[Dict]], List[Dict]], pending: List[Tuple[int, Dict]],
+                         key: str) -> Iterator[Tuple[int, Dict, Optional[Dict], Optional[str]]]:
+    """
+    Inserts every pending (index, payload) with a single multi-row call. If the batch is
+    refused (e.g. a duplicate raced in concurrently), retries row by row so only the
+    offending rows fail. Yields (index, payload, inserted row or None, error or None).
+    """
+    if not pending:
+        return
+    try:
+        inserted = {row[key]: row for row in insert_fn([payload for _, payload in pending])}
+    except Exception:
+        inserted = None
+    if inserted is not None:
+        for idx, payload in pending:
+            row = inserted.get(payload[key])
+            yield idx, payload, row, None if row else "Insert returned no row."
+        return
+    for idx, payload in pending:
+        try:
+            rows = insert_fn([payload])
+        except Exception as e:
+            yield idx, payload, None, str(e)
+            continue
+        yield idx, payload, rows[0] if rows else None, None if rows else "Insert returned no row."
@@ -0,0 +1,225 @@
+# src/catalog.py
+"""
+Read-only product catalog snapshot in a compact binary file.
+
+Layout (little-endian, every section 8-byte aligned):
+
+    header      magic "RCAT", version u32, count u64, created_at f64
+    prod_id     count x int64, ascending
+    price       count x float64
+    stock       count x int64
+    sku_order   count x int64, row numbers sorted by SKU (UTF-8 bytes)
+    text_index  (2 * count + 1) x int64, offsets of each row's SKU and name in `text`
+    text        UTF-8 SKUs and names, back to back
+
+The file is memory-mapped and the columns are `memoryview`s cast over the mapping,
+so opening it costs a header read and lookups only touch the pages they need.
+Lookups by prod_id are O(1) when IDs are contiguous and a binary search otherwise.
+SKU lookups are a binary search over `sku_order`.
+"""
+import bisect
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from typing import Dict, Iterable, List, Optional
+
+MAGIC = b"RCAT"
+VERSION = 1
+_HEADER = struct.Struct("<4sIQd")
+
+
+class CatalogError(Exception):
+    pass
+
+
+def _check_byteorder() -> None:
+    # Columns are read through memoryview casts, which use the native byte order
+    if sys.byteorder != "little":
+        raise CatalogError("Catalog snapshots are only supported on little-endian machines.")
+
+
+class _MappedColumns:
+    """One mapping of a snapshot file. Replaced as a whole when the file changes."""
+    def __init__(self, path: str):
+        _check_byteorder()
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            if stat.st_size < _HEADER.size:
+                raise CatalogError(f"{path} is not a catalog snapshot.")
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, created_at = _HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self.mm.close()
+            raise CatalogError(f"{path} is not a version {VERSION} catalog snapshot.")
+        # Four columns of `count` words and the text index of 2 * count + 1, then the text
+        text_base = _HEADER.size + 8 * (6 * count + 1)
+        if stat.st_size < text_base or stat.st_size < text_base + struct.unpack_from("<q", self.mm, text_base - 8)[0]:
+            self.mm.close()
+            raise CatalogError(f"{path} is truncated: {stat.st_size} bytes for {count} products.")
+        self.signature = (stat.st_ino, stat.st_mtime_ns)
+        self.count = count
+        self.created_at = created_at
+        view = memoryview(self.mm)
+        offset = _HEADER.size
+        columns = []
+        for fmt, length in (("q", count), ("d", count), ("q", count), ("q", count), ("q", 2 * count + 1)):
+            columns.append(view[offset:offset + 8 * length].cast(fmt))
+            offset += 8 * length
+        self.prod_ids, self.prices, self.stock, self.sku_order, self.text_index = columns
+        self.text_base = offset
+        # Contiguous IDs (the usual case for a serial key) turn lookups into an index
+        self.first_id = self.prod_ids[0] if count else 0
+        self.dense = count > 0 and self.prod_ids[count - 1] - self.first_id + 1 == count
+
+    def row_of(self, prod_id: int) -> Optional[int]:
+        if self.dense:
+            row = prod_id - self.first_id
+            return row if 0 <= row < self.count else None
+        row = bisect.bisect_left(self.prod_ids, prod_id)
+        return row if row < self.count and self.prod_ids[row] == prod_id else None
+
+    def text(self, i: int) -> bytes:
+        return self.mm[self.text_base + self.text_index[i]:self.text_base + self.text_index[i + 1]]
+
+    def row(self, row: int) -> Dict:
+        return {"prod_id": self.prod_ids[row], "sku": self.text(2 * row).decode("utf-8"),
+                "name": self.text(2 * row + 1).decode("utf-8"),
+                "price": self.prices[row], "stock": self.stock[row]}
+
+    def row_of_sku(self, sku: bytes) -> Optional[int]:
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.text(2 * self.sku_order[mid]) < sku:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.count and self.text(2 * self.sku_order[lo]) == sku:
+            return self.sku_order[lo]
+        return None
+
+
+class CatalogSnapshot:
+    """
+    Memory-mapped view of a snapshot written by `CatalogSnapshot.write`.
+    Rows come back as {prod_id, sku, name, price, stock}. Stock is as of `created_at`
+    and is only a hint; reservations still go to the database.
+    """
+    def __init__(self, path: str, max_age: Optional[float] = None):
+        self.path = path
+        self.max_age = max_age
+        self._columns = _MappedColumns(path)
+
+    def __len__(self) -> int:
+        return self._columns.count
+
+    @property
+    def created_at(self) -> float:
+        return self._columns.created_at
+
+    @property
+    def age(self) -> float:
+        return time.time() - self._columns.created_at
+
+    def fresh(self) -> bool:
+        """True unless the snapshot is older than `max_age` seconds."""
+        return self.max_age is None or self.age <= self.max_age
+
+    def reload_if_changed(self) -> bool:
+        """
+        Maps the file again if it was replaced since it was opened (one stat call).
+        Lookups already running finish on the old mapping, which is unmapped once unused.
+        """
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return False
+        if (stat.st_ino, stat.st_mtime_ns) == self._columns.signature:
+            return False
+        self._columns = _MappedColumns(self.path)
+        return True
+
+    # --- Lookups ---
+    def get(self, prod_id: int) -> Optional[Dict]:
+        columns = self._columns
+        row = columns.row_of(prod_id)
+        return columns.row(row) if row is not None else None
+
+    def get_many(self, prod_ids: Iterable[int]) -> List[Dict]:
+        """Same shape as ProductDAO.get_products_by_ids; unknown IDs are skipped."""
+        columns = self._columns
+        rows = (columns.row_of(prod_id) for prod_id in dict.fromkeys(prod_ids))
+        return [columns.row(row) for row in rows if row is not None]
+
+    def get_price(self, prod_id: int) -> Optional[float]:
+        columns = self._columns
+        row = columns.row_of(prod_id)
+        return columns.prices[row] if row is not None else None
+
+    def get_by_sku(self, sku: str) -> Optional[Dict]:
+        columns = self._columns
+        row = columns.row_of_sku(sku.encode("utf-8"))
+        return columns.row(row) if row is not None else None
+
+    # --- Writing ---
+    @staticmethod
+    def write(path: str, products: Iterable[Dict]) -> int:
+        """
+        Writes every product to `path` and returns how many were written. The file is
+        written beside the target and renamed over it, so readers never see a partial
+        snapshot and processes that mapped the old file keep a valid view of it.
+        """
+        _check_byteorder()
+        prod_ids, prices, stock = array("q"), array("d"), array("q")
+        skus: List[bytes] = []
+        names: List[bytes] = []
+        for product in products:
+            prod_ids.append(product["prod_id"])
+            prices.append(float(product.get("price") or 0))
+            stock.append(int(product.get("stock") or 0))
+            skus.append((product.get("sku") or "").encode("utf-8"))
+            names.append((product.get("name") or "").encode("utf-8"))
+        count = len(prod_ids)
+        if any(prod_ids[i] >= prod_ids[i + 1] for i in range(count - 1)):
+            # iter_products already yields in prod_id order; anything else is sorted here
+            order = sorted(range(count), key=prod_ids.__getitem__)
+            prod_ids = array("q", (prod_ids[i] for i in order))
+            prices = array("d", (prices[i] for i in order))
+            stock = array("q", (stock[i] for i in order))
+            skus, names = [skus[i] for i in order], [names[i] for i in order]
+        sku_order = array("q", sorted(range(count), key=skus.__getitem__))
+        text_index, text = array("q", [0]), bytearray()
+        for sku, name in zip(skus, names):
+            text += sku
+            text_index.append(len(text))
+            text += name
+            text_index.append(len(text))
+
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(_HEADER.pack(MAGIC, VERSION, count, time.time()))
+                for column in (prod_ids, prices, stock, sku_order, text_index):
+                    f.write(column.tobytes())
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return count
+
+
+def open_snapshot(path: str, max_age: Optional[float] = None) -> Optional[CatalogSnapshot]:
+    """Opens the snapshot at `path`, or returns None if there is none or it cannot be read."""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        return CatalogSnapshot(path, max_age)
+    except (OSError, ValueError, CatalogError):
+        return None
@@ -0,0 +1,83 @@
+# src/cli/client.py
+"""
+Thin client for the retail CLI daemon (`retail-cli serve`). Imports only the
+standard library, so a forwarded command starts in a few milliseconds.
+
+    RETAIL_CLI_SOCKET=/tmp/retail-cli.sock python -m src.cli.client product list
+
+Relative paths given to PATH_OPTIONS are made absolute before the command is sent,
+because the daemon runs in its own working directory. Commands that read stdin
+(`--file -`) cannot be forwarded.
+"""
+import json
+import os
+import socket
+import sys
+from typing import List
+
+# Options whose value is a file path
+PATH_OPTIONS = ("--file", "--report", "--output", "--path")
+
+
+def absolute_paths(argv: List[str]) -> List[str]:
+    """Copy of `argv` with the values of PATH_OPTIONS made absolute against this process's cwd."""
+    result = []
+    expect_path = False
+    for arg in argv:
+        if expect_path:
+            arg = arg if arg == "-" else os.path.abspath(arg)
+            expect_path = False
+        elif arg in PATH_OPTIONS:
+            expect_path = True
+        else:
+            option, eq, value = arg.partition("=")
+            if eq and option in PATH_OPTIONS and value != "-":
+                arg = f"{option}={os.path.abspath(value)}"
+        result.append(arg)
+    return result
+
+
+def reads_stdin(argv: List[str]) -> bool:
+    """True if the command reads its input from stdin (`--file -`)."""
+    for i, arg in enumerate(argv):
+        if arg == "--file=-" or (arg == "--file" and argv[i + 1:i + 2] == ["-"]):
+            return True
+    return False
+
+
+def forward(socket_path: str, argv: List[str]) -> int:
+    """Sends a command to the daemon, writes its output as it arrives and returns its exit status."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        sock.sendall((json.dumps({"argv": absolute_paths(argv)}) + "\n").encode("utf-8"))
+        with sock.makefile("rb") as reader:
+            for line in reader:
+                frame = json.loads(line)
+                if "exit_code" in frame:
+                    return frame["exit_code"]
+                stream = sys.stdout if "stdout" in frame else sys.stderr
+                try:
+                    stream.write(frame.get("stdout", frame.get("stderr", "")))
+                    stream.flush()
+                except BrokenPipeError:
+                    # The reader went away (e.g. `| head`); closing the socket stops the command
+                    os.dup2(os.open(os.devnull, os.O_WRONLY), stream.fileno())
+                    return 1
+    print("❌ Error: the daemon closed the connection before the command finished.", file=sys.stderr)
+    return 1
+
+
+def main():
+    socket_path = os.getenv("RETAIL_CLI_SOCKET", "/tmp/retail-cli.sock")
+    if reads_stdin(sys.argv[1:]):
+        print("❌ Error: '--file -' reads stdin, which the daemon cannot see. Run it with src.cli.main.",
+              file=sys.stderr)
+        sys.exit(2)
+    try:
+        sys.exit(forward(socket_path, sys.argv[1:]))
+    except (FileNotFoundError, ConnectionRefusedError):
+        print(f"❌ Error: no retail-cli daemon listening on {socket_path}. Start one with 'serve'.", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,151 +1,641 @@
 # src/cli/main.py
 import argparse
+import io
 import json
-from src.config import config
-from src.dao.product_dao import ProductDAO
-from src.dao.customer_dao import CustomerDAO
-from src.dao.order_dao import OrderDAO
-from src.dao.payment_dao import PaymentDAO
-from src.services.product_service import ProductService, ProductError
-from src.services.customer_service import CustomerService, CustomerError
-from src.services.order_service import OrderService, OrderError
-from src.services.payment_service import PaymentService, PaymentError
-from src.services.reporting_service import ReportingService
+import os
+import sys
+from contextlib import redirect_stderr, redirect_stdout
+from functools import cached_property
+from typing import Optional
 
+
+def _positive_int(value: str) -> int:
+    """argparse type for sizes such as --page-size and --chunk-size: a whole number of at least 1."""
+    size = int(value)
+    if size < 1:
+        raise argparse.ArgumentTypeError("must be at least 1")
+    return size
+
+# DAOs, services and the database client are imported and built on first use, so
+# `--help`, argument errors and the thin client never pay for modules they don't need.
 class RetailCLI:
     def __init__(self):
-        db_client = config.get_supabase_client()
-        # DAOs
-        product_dao = ProductDAO(db_client)
-        customer_dao = CustomerDAO(db_client)
-        order_dao = OrderDAO(db_client)
-        payment_dao = PaymentDAO(db_client)
-        # Services
-        self.product_service = ProductService(product_dao)
-        self.customer_service = CustomerService(customer_dao, order_dao)
-        self.order_service = OrderService(order_dao, product_dao, customer_dao, payment_dao)
-        self.payment_service = PaymentService(payment_dao, order_dao)
-        self.reporting_service = ReportingService(order_dao)
-
-    def run(self):
-        parser = self._build_parser()
-        args = parser.parse_args()
+        self._daos = []
+        self.tracer = None
+        self._parser = None
+        self.out = None
+
+    # --- Lazily built components ---
+    @cached_property
+    def db_client(self):
+        from src.config import config, LazyClient
+        return LazyClient(config.get_db_client)
+
+    def _register_dao(self, dao):
+        self._daos.append(dao)
+        if self.tracer is not None:
+            self._instrument([dao])
+        return dao
+
+    @cached_property
+    def product_dao(self):
+        from src.config import config
+        if config.stock_ledger:
+            from src.dao.ledger_product_dao import LedgerProductDAO, CachedLedgerProductDAO
+            if config.cache_enabled:
+                from src.cache import TTLCache
+                return self._register_dao(
+                    CachedLedgerProductDAO(self.db_client, TTLCache(config.cache_size, config.cache_ttl)))
+            return self._register_dao(LedgerProductDAO(self.db_client))
+        if config.cache_enabled:
+            from src.cache import TTLCache
+            from src.dao.cached_product_dao import CachedProductDAO
+            return self._register_dao(CachedProductDAO(self.db_client, TTLCache(config.cache_size, config.cache_ttl)))
+        from src.dao.product_dao import ProductDAO
+        return self._register_dao(ProductDAO(self.db_client))
+
+    @cached_property
+    def customer_dao(self):
+        from src.config import config
+        if config.cache_enabled:
+            from src.cache import TTLCache
+            from src.dao.cached_customer_dao import CachedCustomerDAO
+            return self._register_dao(CachedCustomerDAO(self.db_client, TTLCache(config.cache_size, config.cache_ttl)))
+        from src.dao.customer_dao import CustomerDAO
+        return self._register_dao(CustomerDAO(self.db_client))
+
+    @cached_property
+    def order_dao(self):
+        from src.dao.order_dao import OrderDAO
+        return self._register_dao(OrderDAO(self.db_client))
+
+    @cached_property
+    def payment_dao(self):
+        from src.dao.payment_dao import PaymentDAO
+        return self._register_dao(PaymentDAO(self.db_client))
+
+    @cached_property
+    def product_service(self):
+        from src.services.product_service import ProductService
+        return ProductService(self.product_dao)
+
+    @cached_property
+    def customer_service(self):
+        from src.config import config
+        from src.services.customer_service import CustomerService
+        from src.services.customer_search import CustomerSearchIndex
+        # The index loads on the first search, so other customer commands never pay for it
+        search_index = CustomerSearchIndex(self.customer_dao, config.search_refresh_interval,
+                                           config.search_rebuild_interval)
+        return CustomerService(self.customer_dao, self.order_dao, search_index)
+
+    @cached_property
+    def order_service(self):
+        from src.config import config
+        from src.services.order_service import OrderService
+        catalog = None
+        if config.catalog_snapshot_path:
+            from src.catalog import open_snapshot
+            catalog = open_snapshot(config.catalog_snapshot_path, config.catalog_max_age)
+        return OrderService(self.order_dao, self.product_dao, self.customer_dao, self.payment_dao, catalog,
+                            self.idempotency)
+
+    @cached_property
+    def order_queue_service(self):
+        from src.config import config
+        from src.dao.order_queue_dao import OrderQueueDAO
+        from src.services.order_queue_service import OrderQueueService
+        return OrderQueueService(OrderQueueDAO(config.order_queue_path), self.order_service, config.order_queue_batch)
+
+    def _start_queue_flusher(self):
+        """Flushes queued orders in the background while the shell or server runs."""
+        from src.config import config
+        if not config.order_queue_autoflush:
+            return None
+        from src.services.order_queue_service import QueueFlusher
+        return QueueFlusher(self.order_queue_service, config.order_queue_interval).start()
+
+    @cached_property
+    def payment_service(self):
+        from src.services.payment_service import PaymentService
+        return PaymentService(self.payment_dao, self.order_dao, self.idempotency)
+
+    @cached_property
+    def idempotency(self):
+        """One guard for every service, so keys are remembered across commands and processes."""
+        from src.config import config
+        from src.idempotency import IdempotencyGuard, MemoryIdempotencyStore, SQLiteIdempotencyStore
+        if config.idempotency_path:
+            store = SQLiteIdempotencyStore(config.idempotency_path, config.idempotency_max_keys, config.idempotency_ttl)
+        else:
+            store = MemoryIdempotencyStore(config.idempotency_max_keys, config.idempotency_ttl)
+        return IdempotencyGuard(store)
+
+    @cached_property
+    def reporting_service(self):
+        from src.config import config
+        from src.services.reporting_service import ReportingService
+        rollup_dao = None
+        if config.rollup_path:
+            from src.dao.sales_rollup_dao import SalesRollupDAO
+            rollup_dao = SalesRollupDAO(config.rollup_path, config.rollup_source)
+        return ReportingService(self.order_dao, rollup_dao, config.rollup_mutable_days)
+
+    @cached_property
+    def analytics_service(self):
+        from src.services.analytics_service import SalesAnalyticsService
+        return SalesAnalyticsService(self.order_dao, self.product_dao, self.customer_dao)
+
+    @property
+    def parser(self):
+        # Built once and reused by the shell and the socket server
+        if self._parser is None:
+            self._parser = self._build_parser()
+        return self._parser
+
+    def run(self, argv=None, nested: bool = False) -> int:
+        """
+        Runs one command line; returns 1 if the command reported an error, else 0.
+        `nested` is set inside the shell and the daemon, which refuse to start another one.
+        """
+        parser = self.parser
+        args = parser.parse_args(argv)
         if not hasattr(args, "func"):
             parser.print_help()
-            return
-        args.func(args)
+            return 0
+        if nested and args.cmd in ("shell", "serve"):
+            print(f"❌ Error: '{args.cmd}' is not available inside the shell or the daemon.", file=sys.stderr)
+            return 2
+        from src.cli.output import FORMATS, OutputWriter
+        # RETAIL_FORMAT sets the default output format, like RETAIL_PROFILE does for profiling
+        fmt = args.format or os.getenv("RETAIL_FORMAT", "").strip().lower() or "json"
+        if fmt not in FORMATS:
+            parser.error(f"RETAIL_FORMAT must be one of: {', '.join(FORMATS)} (got '{fmt}').")
+        self.out = OutputWriter(fmt)
+        if args.cmd in ("shell", "serve"):
+            args.func(args)
+            return 0
+        # RETAIL_PROFILE=table|json turns profiling on without touching the command line
+        profile_env = os.getenv("RETAIL_PROFILE", "").strip().lower()
+        if not (args.profile or args.profile_format or profile_env):
+            args.func(args)
+            return 1 if self.out.failed else 0
+        self.enable_profiling()
+        with self.tracer.command(f"{args.cmd} {getattr(args, 'action', '')}".strip()):
+            args.func(args)
+        self._print_profile(args.profile_format or ("json" if profile_env == "json" else "table"))
+        return 1 if self.out.failed else 0
+
+    def execute(self, argv, nested: bool = True) -> int:
+        """Runs one command line in-process and returns its exit status instead of exiting."""
+        try:
+            return self.run(argv, nested)
+        except SystemExit as e:
+            if e.code is None or isinstance(e.code, int):
+                return e.code or 0
+            print(e.code, file=sys.stderr)
+            return 1
+
+    def enable_profiling(self):
+        """Wraps every DAO with round-trip and latency tracing, including ones built later."""
+        if self.tracer is None:
+            from src.tracing import Tracer
+            from src.config import config
+            self.tracer = Tracer()
+            self._instrument(self._daos)
+            if config.backend == "supabase":
+                self.tracer.add_source("http", config.http_stats)
+        return self.tracer
+
+    def _instrument(self, daos):
+        from src.tracing import instrument
+        instrument(daos, self.tracer)
+        for dao in daos:
+            if hasattr(dao, "cache"):
+                self.tracer.add_source(f"{type(dao).__name__}.cache", dao.cache.stats)
+
+    def _print_profile(self, fmt):
+        if fmt == "json":
+            print(json.dumps(self.tracer.to_dict(), indent=2, default=str), file=sys.stderr)
+        else:
+            print(self.tracer.format_table(), file=sys.stderr)
         
     # --- Product Command Handlers ---
     def _cmd_product_add(self, args):
+        from src.services.product_service import ProductError
         try:
             p = self.product_service.add_product(args.name, args.sku, args.price, args.stock, args.category)
-            print("✅ Product created successfully:")
-            print(json.dumps(p, indent=2, default=str))
+            self.out.message("✅ Product created successfully:")
+            self.out.record(p)
         except ProductError as e:
-            print(f"❌ Error: {e}")
+            self.out.error(f"❌ Error: {e}")
 
     def _cmd_product_list(self, args):
-        products = self.product_service.product_dao.list_products(limit=100)
-        print(json.dumps(products, indent=2, default=str))
+        if args.all:
+            self.out.rows(self.product_dao.iter_products(page_size=args.page_size))
+            return
+        products = self.product_dao.list_products(limit=100)
+        self.out.record(products)
+
+    def _cmd_product_low_stock(self, args):
+        from src.services.product_service import ProductError
+        try:
+            products = self.product_service.get_low_stock(args.threshold, args.category, args.page_size)
+        except ProductError as e:
+            self.out.error(f"❌ Error: {e}")
+            return
+        if args.target is not None:
+            products = ({**p, "restock_qty": max(args.target - (p.get("stock") or 0), 0)} for p in products)
+        self.out.rows(products)
+
+    def _cmd_product_restock(self, args):
+        from src.services.product_service import ProductError
+        deltas = []
+        for item_str in args.item:
+            try:
+                prod_id, delta = item_str.split(":")
+                deltas.append((int(prod_id), int(delta)))
+            except ValueError:
+                self.out.error(f"❌ Error: Invalid item format '{item_str}'. Use prod_id:delta.")
+                return
+        try:
+            products = self.product_service.restock_products(deltas)
+            self.out.message(f"✅ Restocked {len(products)} product(s):")
+            self.out.record(products)
+        except ProductError as e:
+            self.out.error(f"❌ Error: {e}")
+
+    def _cmd_product_compact_stock(self, args):
+        import time
+        from src.services.product_service import ProductError
+        try:
+            while True:
+                folded = self.product_service.compact_stock()
+                movements = sum(row["movements"] for row in folded)
+                self.out.message(f"✅ Compacted {movements} movement(s) into {len(folded)} product(s).")
+                if not args.every:
+                    break
+                time.sleep(args.every)
+        except ProductError as e:
+            self.out.error(f"❌ Error: {e}")
+        except KeyboardInterrupt:
+            pass
+
+    def _cmd_product_movements(self, args):
+        from src.services.product_service import ProductError
+        try:
+            movements = self.product_service.get_stock_movements(args.prod_id, args.limit)
+            self.out.record(movements)
+        except ProductError as e:
+            self.out.error(f"❌ Error: {e}")
+
+    def _cmd_product_import(self, args):
+        from src.cli.readers import iter_records
+        results = self.product_service.import_products(iter_records(args.file), args.chunk_size)
+        self._print_import_report(results, "sku", args.report)
+
+    def _print_import_report(self, results, key, report_path, describe_accepted=None, label="Import"):
+        """
+        Streams rejected rows as they happen and finishes with a summary. Accepted rows
+        are printed too when `describe_accepted` formats them. With ndjson or csv output,
+        every result is written to stdout as a row instead.
+        """
+        from src.cli.output import dumps
+        counts = {"accepted": 0, "rejected": 0}
+        report = open(report_path, "w", encoding="utf-8") if report_path else None
+
+        def tally(result):
+            if report:
+                report.write(dumps(result) + "\n")
+            counts["accepted" if result["status"] == "accepted" else "rejected"] += 1
+            return result
+
+        try:
+            if self.out.machine_readable:
+                self.out.rows(map(tally, results))
+            else:
+                for result in map(tally, results):
+                    if result["status"] == "accepted":
+                        if describe_accepted:
+                            self.out.message(f"✅ Line {result['line']}: {describe_accepted(result)}")
+                    else:
+                        self.out.message(f"❌ Line {result['line']} ({key}={result.get(key)}): {result['reason']}")
+        except OSError as e:
+            self.out.error(f"❌ Error: {e}")
+        finally:
+            if report:
+                report.close()
+        self.out.message(f"✅ {label} finished: {counts['accepted']} accepted, {counts['rejected']} rejected.")
 
     # --- Customer Command Handlers ---
     def _cmd_customer_add(self, args):
+        from src.services.customer_service import CustomerError
         try:
             c = self.customer_service.add_customer(args.name, args.email, args.phone, args.city)
-            print("✅ Customer created successfully:")
-            print(json.dumps(c, indent=2, default=str))
+            self.out.message("✅ Customer created successfully:")
+            self.out.record(c)
         except CustomerError as e:
-            print(f"❌ Error: {e}")
+            self.out.error(f"❌ Error: {e}")
 
     def _cmd_customer_update(self, args):
+        from src.services.customer_service import CustomerError
         try:
             c = self.customer_service.update_customer_details(args.id, args.phone, args.city)
-            print(f"✅ Customer {args.id} updated successfully:")
-            print(json.dumps(c, indent=2, default=str))
+            self.out.message(f"✅ Customer {args.id} updated successfully:")
+            self.out.record(c)
         except CustomerError as e:
-            print(f"❌ Error: {e}")
+            self.out.error(f"❌ Error: {e}")
 
     def _cmd_customer_delete(self, args):
+        from src.services.customer_service import CustomerError
         try:
             c = self.customer_service.delete_customer(args.id)
-            print(f"✅ Customer {args.id} deleted successfully:")
-            print(json.dumps(c, indent=2, default=str))
+            self.out.message(f"✅ Customer {args.id} deleted successfully:")
+            self.out.record(c)
         except CustomerError as e:
-            print(f"❌ Error: {e}")
+            self.out.error(f"❌ Error: {e}")
 
     def _cmd_customer_list(self, args):
+        if args.all:
+            self.out.rows(self.customer_service.iter_all_customers(page_size=args.page_size))
+            return
         customers = self.customer_service.list_all_customers()
-        print(json.dumps(customers, indent=2, default=str))
+        self.out.record(customers)
     
+    def _cmd_customer_import(self, args):
+        from src.cli.readers import iter_records
+        results = self.customer_service.import_customers(iter_records(args.file), args.chunk_size)
+        self._print_import_report(results, "email", args.report)
+
     def _cmd_customer_search(self, args):
+        from src.services.customer_service import CustomerError
         try:
-            customers = self.customer_service.find_customer(email=args.email, city=args.city)
+            if args.query is not None:
+                customers = self.customer_service.search_customers(args.query, limit=args.limit)
+            else:
+                customers = self.customer_service.find_customer(email=args.email, city=args.city)
             if not customers:
-                print("No customers found matching the criteria.")
+                self.out.message("No customers found matching the criteria.")
                 return
-            print(json.dumps(customers, indent=2, default=str))
+            self.out.record(customers)
         except CustomerError as e:
-            print(f"❌ Error: {e}")
+            self.out.error(f"❌ Error: {e}")
 
     # --- Order Command Handlers ---
     def _cmd_order_create(self, args):
+        from src.services.order_service import OrderError
         items = []
         for item_str in args.item:
             try:
                 prod_id, qty = item_str.split(":")
                 items.append({"prod_id": int(prod_id), "quantity": int(qty)})
             except ValueError:
-                print(f"❌ Error: Invalid item format '{item_str}'. Use prod_id:qty.")
+                self.out.error(f"❌ Error: Invalid item format '{item_str}'. Use prod_id:qty.")
                 return
+        if args.queue and args.idempotency_key:
+            self.out.error("❌ Error: --idempotency-key cannot be combined with --queue.")
+            return
+        if args.queue:
+            from src.services.order_queue_service import OrderQueueError
+            try:
+                entry = self.order_queue_service.submit(args.cust_id, items)
+                self.out.message(f"✅ Order queued with provisional ID {entry['provisional_id']}; it is created on the next flush.")
+                self.out.record(entry)
+            except OrderQueueError as e:
+                self.out.error(f"❌ Error: {e}")
+            return
         try:
-            order = self.order_service.create_order(args.cust_id, items)
-            print("✅ Order created successfully (payment pending):")
-            print(json.dumps(order, indent=2, default=str))
+            order = self.order_service.create_order(args.cust_id, items, args.idempotency_key)
+            self.out.message("✅ Order created successfully (payment pending):")
+            self.out.record(order)
         except OrderError as e:
-            print(f"❌ Error: {e}")
+            self.out.error(f"❌ Error: {e}")
+
+    def _cmd_order_create_batch(self, args):
+        from src.cli.readers import iter_records
+        from src.services.order_service import OrderError
+        results = self.order_service.create_orders_batch(iter_records(args.file), args.chunk_size)
+        try:
+            self._print_import_report(results, "cust_id", args.report, lambda r: (
+                f"order {r['order_id']} for customer {r['cust_id']}, total {r['total_amount']:.2f}"))
+        except OrderError as e:
+            self.out.error(f"❌ Error: {e}")
+
+    def _cmd_order_intake(self, args):
+        from src.cli.readers import iter_records
+        from src.services.order_intake import OrderIntakeEngine, OrderIntakeError
+        try:
+            engine = OrderIntakeEngine(self.order_service, args.workers, args.max_pending, args.shards)
+        except OrderIntakeError as e:
+            self.out.error(f"❌ Error: {e}")
+            return
+        with engine:
+            self._print_import_report(engine.process(iter_records(args.file)), "cust_id", args.report, lambda r: (
+                f"order {r['order_id']} for customer {r['cust_id']}, total {r['total_amount']:.2f}"), label="Intake")
+        self.out.summary(engine.stats())
 
     def _cmd_order_show(self, args):
+        from src.services.order_service import OrderError
+        if len(args.order_id) > 1:
+            orders = self.order_service.get_orders_details(args.order_id)
+            found = {order["order_id"] for order in orders}
+            missing = [order_id for order_id in args.order_id if order_id not in found]
+            if missing:
+                self.out.error(f"❌ Error: Orders not found: {', '.join(map(str, missing))}")
+            self.out.record(orders)
+            return
         try:
-            order = self.order_service.get_order_details(args.order_id)
-            print(json.dumps(order, indent=2, default=str))
+            order = self.order_service.get_order_details(args.order_id[0])
+            self.out.record(order)
         except OrderError as e:
-            print(f"❌ Error: {e}")
+            self.out.error(f"❌ Error: {e}")
 
     def _cmd_order_list(self, args):
+        from src.services.order_service import OrderError
         try:
             orders = self.order_service.list_orders_for_customer(args.cust_id)
-            print(json.dumps(orders, indent=2, default=str))
+            self.out.record(orders)
         except OrderError as e:
-            print(f"❌ Error: {e}")
+            self.out.error(f"❌ Error: {e}")
 
     def _cmd_order_cancel(self, args):
+        from src.services.order_service import OrderError
         try:
             order = self.order_service.cancel_order(args.order_id)
-            print(f"✅ Order {args.order_id} cancelled and payment refunded:")
-            print(json.dumps(order, indent=2, default=str))
+            self.out.message(f"✅ Order {args.order_id} cancelled and payment refunded:")
+            self.out.record(order)
         except OrderError as e:
-            print(f"❌ Error: {e}")
+            self.out.error(f"❌ Error: {e}")
 
     # --- Payment Command Handlers ---
     def _cmd_payment_process(self, args):
+        from src.services.payment_service import PaymentError
         try:
-            payment = self.payment_service.process_payment(args.order_id, args.method)
-            print(f"✅ Payment for order {args.order_id} processed successfully:")
-            print(json.dumps(payment, indent=2, default=str))
+            payment = self.payment_service.process_payment(args.order_id, args.method, args.idempotency_key)
+            self.out.message(f"✅ Payment for order {args.order_id} processed successfully:")
+            self.out.record(payment)
         except PaymentError as e:
-            print(f"❌ Error: {e}")
+            self.out.error(f"❌ Error: {e}")
+
+    def _cmd_payment_process_batch(self, args):
+        from src.cli.readers import iter_records
+        summary = {"settled": 0, "settled_amount": 0.0, "by_method": {}, "rejected": 0, "rejected_by_reason": {}}
+
+        def tally(result):
+            if result["status"] == "accepted":
+                method = summary["by_method"].setdefault(result["method"], {"count": 0, "amount": 0.0})
+                method["count"] += 1
+                method["amount"] = round(method["amount"] + result["amount"], 2)
+                summary["settled"] += 1
+                summary["settled_amount"] = round(summary["settled_amount"] + result["amount"], 2)
+            else:
+                summary["rejected"] += 1
+                summary["rejected_by_reason"][result["code"]] = summary["rejected_by_reason"].get(result["code"], 0) + 1
+            return result
+
+        results = self.payment_service.settle_payments(iter_records(args.file), args.chunk_size)
+        self._print_import_report(map(tally, results), "order_id", args.report, label="Settlement")
+        self.out.message("📊 Reconciliation Summary:")
+        self.out.summary(summary)
 
     # --- Reporting Command Handlers ---
     def _cmd_report_sales(self, args):
         try:
             summary = self.reporting_service.generate_sales_summary(args.start_date, args.end_date)
-            print("📈 Sales Summary Report:")
-            print(json.dumps(summary, indent=2, default=str))
+            self.out.message("📈 Sales Summary Report:")
+            self.out.record(summary)
+        except Exception as e:
+            self.out.error(f"❌ Error generating report: {e}")
+
+    def _cmd_report_rebuild(self, args):
+        try:
+            result = self.reporting_service.rebuild_rollups(args.start_date, args.end_date)
+            self.out.message("✅ Sales rollups rebuilt:")
+            self.out.record(result)
         except Exception as e:
-            print(f"❌ Error generating report: {e}")
+            self.out.error(f"❌ Error rebuilding rollups: {e}")
+
+    def _cmd_report_breakdown(self, args):
+        from src.services.analytics_service import AnalyticsError, export_rows
+        try:
+            rows = self.analytics_service.breakdown(args.start_date, args.end_date, args.by.split(","),
+                                                    status=args.status or None, page_size=args.page_size)
+            if args.top:
+                rows = rows[:args.top]
+            if args.output:
+                export_rows(rows, args.output)
+                self.out.message(f"✅ Wrote {len(rows)} row(s) to {args.output}")
+                return
+            self.out.message(f"📊 Sales Breakdown by {args.by}:")
+            self.out.record(rows)
+        except (AnalyticsError, OSError) as e:
+            self.out.error(f"❌ Error: {e}")
+
+    # --- Catalog Command Handlers ---
+    def _cmd_catalog_snapshot(self, args):
+        from src.config import config
+        path = args.output or config.catalog_snapshot_path or "catalog.snap"
+        try:
+            count = self.product_service.write_catalog_snapshot(path, args.page_size)
+            self.out.message(f"✅ Wrote {count} product(s) to {path}")
+        except OSError as e:
+            self.out.error(f"❌ Error: {e}")
+
+    def _cmd_catalog_info(self, args):
+        from src.config import config
+        from src.catalog import CatalogSnapshot, CatalogError
+        path = args.path or config.catalog_snapshot_path or "catalog.snap"
+        try:
+            snapshot = CatalogSnapshot(path, config.catalog_max_age)
+        except (OSError, CatalogError) as e:
+            self.out.error(f"❌ Error: {e}")
+            return
+        self.out.record({"path": path, "products": len(snapshot), "size_bytes": os.path.getsize(path),
+                         "age_seconds": round(snapshot.age, 1), "fresh": snapshot.fresh()})
+
+    # --- Order Queue Command Handlers ---
+    def _print_queue_outcome(self, outcome):
+        if self.out.machine_readable:
+            self.out.row(outcome, ("queue_id", "cust_id", "status", "order_id", "total_amount", "reason"))
+        elif outcome["status"] == "ACCEPTED":
+            self.out.message(f"✅ Q{outcome['queue_id']}: order {outcome['order_id']} for customer {outcome['cust_id']}")
+        else:
+            self.out.message(f"❌ Q{outcome['queue_id']} (cust_id={outcome['cust_id']}): {outcome['reason']}")
+
+    def _cmd_queue_flush(self, args):
+        from src.config import config
+        from src.services.order_queue_service import OrderQueueError, QueueFlusher
+        flusher = QueueFlusher(self.order_queue_service, args.interval or config.order_queue_interval,
+                               on_result=self._print_queue_outcome,
+                               on_error=lambda e: self.out.message(f"❌ Error: {e}"))
+        if args.watch:
+            try:
+                flusher.run()
+            except KeyboardInterrupt:
+                pass
+            return
+        try:
+            flushed = flusher.run_once()
+            self.out.message(f"✅ Flushed {flushed} queued order(s).")
+        except OrderQueueError as e:
+            self.out.error(f"❌ Error: {e}")
+
+    def _cmd_queue_status(self, args):
+        self.out.record(self.order_queue_service.status())
+
+    def _cmd_queue_list(self, args):
+        entries = self.order_queue_service.list_queued(args.status, args.limit)
+        self.out.record(entries)
+
+    def _cmd_queue_purge(self, args):
+        removed = self.order_queue_service.purge_accepted(args.older_than_days)
+        self.out.message(f"✅ Removed {removed} accepted order(s) from the queue.")
+
+    # --- Long-lived Session Handlers ---
+    def _cmd_shell(self, args):
+        import shlex
+        try:
+            import readline  # noqa: F401  (line editing and history when available)
+        except ImportError:
+            pass
+        self._start_queue_flusher()
+        print("Retail shell. Type a command (e.g. 'product list'), 'help', or 'exit'.")
+        while True:
+            try:
+                line = input("retail> ").strip()
+            except EOFError:
+                print()
+                return
+            except KeyboardInterrupt:
+                print()
+                continue
+            if not line:
+                continue
+            if line in ("exit", "quit"):
+                return
+            if line == "help":
+                line = "--help"
+            try:
+                argv = shlex.split(line)
+            except ValueError as e:
+                print(f"❌ Error: {e}")
+                continue
+            self.execute(argv)
+
+    def _cmd_serve(self, args):
+        from src.cli.server import serve
+        self._start_queue_flusher()
+        serve(self, args.socket)
 
     def _build_parser(self):
         parser = argparse.ArgumentParser(prog="retail-cli")
+        parser.add_argument("--profile", action="store_true",
+                            help="Print DAO round trips and latencies to stderr after the command")
+        parser.add_argument("--profile-format", choices=["table", "json"], default=None,
+                            help="Profile output format (default: table)")
+        parser.add_argument("--format", choices=["json", "ndjson", "csv", "table"], default=None,
+                            help="Output format for results (default: json, or RETAIL_FORMAT). "
+                                 "With ndjson and csv, status lines go to stderr")
         sub = parser.add_subparsers(dest="cmd", help="Available commands")
         
         # Product commands
@@ -159,7 +649,30 @@ class RetailCLI:
         addp.add_argument("--category")
         addp.set_defaults(func=self._cmd_product_add)
         listp = pprod_sub.add_parser("list", help="List all products")
+        listp.add_argument("--all", action="store_true", help="Stream every product instead of the first 100")
+        listp.add_argument("--page-size", type=_positive_int, default=1000, help="Rows fetched per request with --all")
         listp.set_defaults(func=self._cmd_product_list)
+        lowp = pprod_sub.add_parser("low-stock", help="List products at or below a stock threshold")
+        lowp.add_argument("--threshold", type=int, default=5, help="Include products with stock <= this (default 5)")
+        lowp.add_argument("--category", help="Only this category")
+        lowp.add_argument("--target", type=int, help="Add restock_qty needed to bring each product up to this level")
+        lowp.add_argument("--page-size", type=_positive_int, default=1000, help="Rows fetched per request")
+        lowp.set_defaults(func=self._cmd_product_low_stock)
+        restp = pprod_sub.add_parser("restock", help="Add stock to many products in one bulk write")
+        restp.add_argument("--item", required=True, nargs="+", help="Format: prod_id:delta")
+        restp.set_defaults(func=self._cmd_product_restock)
+        compp = pprod_sub.add_parser("compact-stock", help="Fold pending stock movements into the stock snapshot")
+        compp.add_argument("--every", type=float, help="Keep compacting every N seconds until interrupted")
+        compp.set_defaults(func=self._cmd_product_compact_stock)
+        movp = pprod_sub.add_parser("movements", help="Show a product's stock movement history")
+        movp.add_argument("--prod-id", type=int, required=True)
+        movp.add_argument("--limit", type=int, default=100, help="Most recent movements to show (default 100)")
+        movp.set_defaults(func=self._cmd_product_movements)
+        impp = pprod_sub.add_parser("import", help="Bulk import products from a CSV or JSON Lines file")
+        impp.add_argument("--file", required=True, help="Path to .csv or .jsonl (columns: name, sku, price, stock, category)")
+        impp.add_argument("--chunk-size", type=_positive_int, default=500, help="Rows per lookup/insert batch")
+        impp.add_argument("--report", help="Write a per-row JSON Lines report to this path")
+        impp.set_defaults(func=self._cmd_product_import)
         
         # Customer commands
         p_cust = sub.add_parser("customer", help="Manage customers")
@@ -179,11 +692,20 @@ class RetailCLI:
         delc.add_argument("--id", type=int, required=True, help="ID of the customer to delete")
         delc.set_defaults(func=self._cmd_customer_delete)
         listc = pcust_sub.add_parser("list", help="List all customers")
+        listc.add_argument("--all", action="store_true", help="Stream every customer instead of the first 100")
+        listc.add_argument("--page-size", type=_positive_int, default=1000, help="Rows fetched per request with --all")
         listc.set_defaults(func=self._cmd_customer_list)
-        searchc = pcust_sub.add_parser("search", help="Search for a customer by email or city")
+        impc = pcust_sub.add_parser("import", help="Bulk import customers from a CSV or JSON Lines file")
+        impc.add_argument("--file", required=True, help="Path to .csv or .jsonl (columns: name, email, phone, city)")
+        impc.add_argument("--chunk-size", type=_positive_int, default=500, help="Rows per lookup/insert batch")
+        impc.add_argument("--report", help="Write a per-row JSON Lines report to this path")
+        impc.set_defaults(func=self._cmd_customer_import)
+        searchc = pcust_sub.add_parser("search", help="Search for a customer by email, city or free text")
         search_group = searchc.add_mutually_exclusive_group(required=True)
         search_group.add_argument("--email", help="Email to search for")
         search_group.add_argument("--city", help="City to search for")
+        search_group.add_argument("--query", help="Partial name, email, phone prefix/suffix or city; tolerates typos")
+        searchc.add_argument("--limit", type=int, default=20, help="Maximum results for --query")
         searchc.set_defaults(func=self._cmd_customer_search)
 
         # Order commands
@@ -192,9 +714,28 @@ class RetailCLI:
         createo = porder_sub.add_parser("create", help="Create a new order")
         createo.add_argument("--cust-id", type=int, required=True)
         createo.add_argument("--item", required=True, nargs="+", help="Format: prod_id:qty")
+        createo.add_argument("--queue", action="store_true",
+                             help="Queue the order locally and return at once; it is created on the next flush")
+        createo.add_argument("--idempotency-key",
+                             help="Client-chosen key; retrying with it returns the first order instead of a duplicate")
         createo.set_defaults(func=self._cmd_order_create)
+        batcho = porder_sub.add_parser("create-batch", help="Create many orders from a JSON Lines or CSV file")
+        batcho.add_argument("--file", required=True,
+                            help='Path to .jsonl ({"cust_id": 1, "items": [{"prod_id": 2, "quantity": 3}]}) '
+                                 'or .csv (columns: cust_id, items as "prod_id:qty prod_id:qty")')
+        batcho.add_argument("--chunk-size", type=_positive_int, default=500, help="Orders per validation/insert batch")
+        batcho.add_argument("--report", help="Write a per-order JSON Lines report to this path")
+        batcho.set_defaults(func=self._cmd_order_create_batch)
+        intakeo = porder_sub.add_parser("intake", help="Create orders from a file one by one with a pool of workers")
+        intakeo.add_argument("--file", required=True, help="Same formats as create-batch; '-' reads JSON Lines from stdin")
+        intakeo.add_argument("--workers", type=int, default=8)
+        intakeo.add_argument("--max-pending", type=int, default=1000,
+                             help="Orders queued ahead of the workers before reading the file pauses")
+        intakeo.add_argument("--shards", type=int, default=64, help="Lock shards that products are spread over")
+        intakeo.add_argument("--report", help="Write a per-order JSON Lines report to this path")
+        intakeo.set_defaults(func=self._cmd_order_intake)
         showo = porder_sub.add_parser("show", help="Show details of a specific order")
-        showo.add_argument("--order-id", type=int, required=True)
+        showo.add_argument("--order-id", type=int, required=True, nargs="+", help="One or more order IDs")
         showo.set_defaults(func=self._cmd_order_show)
         listo = porder_sub.add_parser("list", help="List all orders for a customer")
         listo.add_argument("--cust-id", type=int, required=True)
@@ -209,7 +750,15 @@ class RetailCLI:
         procp = ppay_sub.add_parser("process", help="Process a pending payment")
         procp.add_argument("--order-id", type=int, required=True)
         procp.add_argument("--method", required=True, choices=["Cash", "Card", "UPI"])
+        procp.add_argument("--idempotency-key",
+                           help="Client-chosen key; retrying with it returns the first result instead of charging again")
         procp.set_defaults(func=self._cmd_payment_process)
+        batchp = ppay_sub.add_parser("process-batch", help="Settle many pending payments from a gateway export")
+        batchp.add_argument("--file", required=True,
+                            help="Path to .csv or .jsonl (columns: order_id, method, optional amount)")
+        batchp.add_argument("--chunk-size", type=_positive_int, default=500, help="Settlements per lookup/update batch")
+        batchp.add_argument("--report", help="Write a per-row JSON Lines report to this path")
+        batchp.set_defaults(func=self._cmd_payment_process_batch)
 
         # Report commands
         p_report = sub.add_parser("report", help="Generate reports")
@@ -218,12 +767,86 @@ class RetailCLI:
         reps.add_argument("--start-date", required=True, help="Format: YYYY-MM-DD")
         reps.add_argument("--end-date", required=True, help="Format: YYYY-MM-DD")
         reps.set_defaults(func=self._cmd_report_sales)
+        rebr = preport_sub.add_parser("rebuild", help="Re-fetch the locally stored daily sales rollups")
+        rebr.add_argument("--start-date", help="Format: YYYY-MM-DD (default: first stored day)")
+        rebr.add_argument("--end-date", help="Format: YYYY-MM-DD (default: last stored day)")
+        rebr.set_defaults(func=self._cmd_report_rebuild)
+        brk = preport_sub.add_parser("breakdown", help="Revenue, units and orders grouped by product, category, city or day")
+        brk.add_argument("--by", required=True, help="Comma-separated: product, category, city, day")
+        brk.add_argument("--start-date", required=True, help="Format: YYYY-MM-DD")
+        brk.add_argument("--end-date", required=True, help="Format: YYYY-MM-DD")
+        brk.add_argument("--status", default="COMPLETED", help="Order status to include (default COMPLETED; '' for all)")
+        brk.add_argument("--top", type=int, help="Only the N groups with the highest revenue")
+        brk.add_argument("--output", help="Write to a .csv or .parquet file instead of printing")
+        brk.add_argument("--page-size", type=_positive_int, default=1000, help="Orders fetched per request")
+        brk.set_defaults(func=self._cmd_report_breakdown)
+
+        # Local order queue commands
+        p_queue = sub.add_parser("queue", help="Manage the local order queue")
+        pqueue_sub = p_queue.add_subparsers(dest="action", required=True)
+        flushq = pqueue_sub.add_parser("flush", help="Create the queued orders in the database, oldest first")
+        flushq.add_argument("--watch", action="store_true", help="Keep flushing until interrupted")
+        flushq.add_argument("--interval", type=float, help="Seconds between flushes with --watch")
+        flushq.set_defaults(func=self._cmd_queue_flush)
+        statq = pqueue_sub.add_parser("status", help="Show queued orders per status")
+        statq.set_defaults(func=self._cmd_queue_status)
+        listq = pqueue_sub.add_parser("list", help="List queued orders")
+        listq.add_argument("--status", choices=["pending", "flushing", "accepted", "rejected"])
+        listq.add_argument("--limit", type=int, default=100)
+        listq.set_defaults(func=self._cmd_queue_list)
+        purgeq = pqueue_sub.add_parser("purge", help="Delete accepted orders from the queue file")
+        purgeq.add_argument("--older-than-days", type=float, default=7, help="Keep anything newer (default 7)")
+        purgeq.set_defaults(func=self._cmd_queue_purge)
+
+        # Catalog snapshot commands
+        p_cat = sub.add_parser("catalog", help="Manage the local catalog snapshot")
+        pcat_sub = p_cat.add_subparsers(dest="action", required=True)
+        snap = pcat_sub.add_parser("snapshot", help="Write every product's price and stock to a memory-mappable file")
+        snap.add_argument("--output", help="Snapshot path (default: RETAIL_CATALOG_SNAPSHOT or catalog.snap)")
+        snap.add_argument("--page-size", type=_positive_int, default=1000, help="Products fetched per request")
+        snap.set_defaults(func=self._cmd_catalog_snapshot)
+        info = pcat_sub.add_parser("info", help="Show the size and age of a catalog snapshot")
+        info.add_argument("--path", help="Snapshot path (default: RETAIL_CATALOG_SNAPSHOT or catalog.snap)")
+        info.set_defaults(func=self._cmd_catalog_info)
+
+        # Long-lived modes (keep the client, connections and caches warm)
+        shell = sub.add_parser("shell", help="Start an interactive shell that runs commands in one process")
+        shell.set_defaults(func=self._cmd_shell)
+        serve = sub.add_parser("serve", help="Serve commands over a Unix socket for the thin client")
+        serve.add_argument("--socket", default=os.getenv("RETAIL_CLI_SOCKET", "/tmp/retail-cli.sock"))
+        serve.set_defaults(func=self._cmd_serve)
 
         return parser
 
+def _command_of(argv) -> Optional[str]:
+    """The subcommand `argv` runs, found with the real parser (global options may come first)."""
+    try:
+        with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
+            return RetailCLI().parser.parse_args(argv).cmd
+    except SystemExit:
+        return None  # --help or a usage error: run locally, which prints it
+
 def main():
+    # With RETAIL_CLI_SOCKET set and a daemon listening, forward to it instead of starting up
+    socket_path = os.getenv("RETAIL_CLI_SOCKET")
+    if (socket_path and os.path.exists(socket_path)
+            and _command_of(sys.argv[1:]) not in (None, "serve", "shell")):
+        from src.cli.client import forward, reads_stdin
+        # The daemon cannot read this process's stdin, so `--file -` always runs locally
+        if not reads_stdin(sys.argv[1:]):
+            try:
+                sys.exit(forward(socket_path, sys.argv[1:]))
+            except (FileNotFoundError, ConnectionRefusedError):
+                pass  # stale socket; run the command locally
     cli = RetailCLI()
-    cli.run()
+    try:
+        exit_code = cli.run()
+        sys.stdout.flush()
+    except BrokenPipeError:
+        # The reader went away (e.g. `| head`); stop quietly instead of printing a traceback
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
+    sys.exit(exit_code)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
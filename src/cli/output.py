@@ -0,0 +1,191 @@
+# src/cli/output.py
+"""
+Output writers for command results, selected with `--format`:
+
+    json    indented JSON (default); listings stream as an array, one row at a time
+    ndjson  one compact JSON object per line, for jq and line-oriented tools
+    csv     a header, then one line per row
+    table   aligned columns
+
+Rows are written as they are produced, so a listing is never held in memory. csv
+and table read the first SAMPLE_ROWS rows ahead to choose the columns (and widths).
+With ndjson and csv, status lines (✅/❌) go to stderr and stdout carries only data.
+orjson is used for encoding when it is installed.
+"""
+import csv
+import itertools
+import json
+import sys
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+try:
+    import orjson
+except ImportError:  # optional: the standard json module is used instead
+    orjson = None
+
+FORMATS = ("json", "ndjson", "csv", "table")
+# Rows read ahead to pick csv/table columns; keys that first appear later are left out
+SAMPLE_ROWS = 100
+# Table cells are cut to this many characters
+MAX_CELL = 60
+
+
+def dumps(obj: Any, indent: bool = False) -> str:
+    """Encodes `obj` as JSON, compact or indented by two spaces; unknown types become strings."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=str,
+                                option=orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)).decode("utf-8")
+        except TypeError:
+            pass  # e.g. integers wider than 64 bits
+    if indent:
+        return json.dumps(obj, indent=2, default=str, ensure_ascii=False)
+    return json.dumps(obj, default=str, ensure_ascii=False, separators=(",", ":"))
+
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return dumps(value)
+    return str(value)
+
+
+def _sample(rows: Iterable[Dict]) -> Tuple[List[Dict], Iterator[Dict]]:
+    rows = iter(rows)
+    return list(itertools.islice(rows, SAMPLE_ROWS)), rows
+
+
+def _columns(sample: List[Dict]) -> List[str]:
+    return list(dict.fromkeys(key for row in sample for key in row))
+
+
+def _fit(text: str, width: int) -> str:
+    return text if len(text) <= width else text[:width - 1] + "…"
+
+
+class OutputWriter:
+    """
+    Writes one command's results in the chosen format. The streams are looked up on
+    every write, so output follows `sys.stdout`/`sys.stderr` when the daemon redirects them.
+    """
+    def __init__(self, fmt: str = "json", stream: Optional[TextIO] = None, err_stream: Optional[TextIO] = None):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown output format '{fmt}'. Use one of: {', '.join(FORMATS)}.")
+        self.format = fmt
+        self._stream = stream
+        self._err_stream = err_stream
+        self._csv_writer = None
+        self.failed = False
+
+    @property
+    def stream(self) -> TextIO:
+        return self._stream or sys.stdout
+
+    @property
+    def machine_readable(self) -> bool:
+        """True for formats whose stdout must contain nothing but data."""
+        return self.format in ("ndjson", "csv")
+
+    def message(self, text: str) -> None:
+        """A status line: stdout for json and table, stderr for ndjson and csv."""
+        print(text, file=(self._err_stream or sys.stderr) if self.machine_readable else self.stream)
+
+    def error(self, text: str) -> None:
+        """A status line for a failed command; the command then exits with status 1."""
+        self.failed = True
+        self.message(text)
+
+    def record(self, obj: Any) -> None:
+        """Writes a single result: one object, or a list that is written as rows."""
+        if isinstance(obj, list):
+            self.rows(obj)
+        elif self.format == "json":
+            self.stream.write(dumps(obj, indent=True) + "\n")
+        elif self.format == "ndjson":
+            self.stream.write(dumps(obj) + "\n")
+        elif not isinstance(obj, dict):
+            self.stream.write(_cell(obj) + "\n")
+        elif self.format == "csv":
+            self._rows_csv([obj])
+        else:
+            self._key_value_table(obj)
+
+    def summary(self, obj: Dict) -> None:
+        """Totals that follow a listing: written like `record`, or to stderr as JSON for ndjson and csv."""
+        if self.machine_readable:
+            print(dumps(obj), file=self._err_stream or sys.stderr)
+        else:
+            self.record(obj)
+
+    def rows(self, rows: Iterable[Dict]) -> int:
+        """Writes rows as they are produced and returns how many were written."""
+        return getattr(self, f"_rows_{self.format}")(rows)
+
+    def row(self, row: Dict, fields: Optional[Sequence[str]] = None) -> None:
+        """
+        Writes one row of a listing whose rows arrive one by one (e.g. from a callback).
+        ndjson and csv only. The csv header is written before the first row, from
+        `fields` or else the first row's keys.
+        """
+        if self.format == "ndjson":
+            self.stream.write(dumps(row) + "\n")
+            return
+        if self.format != "csv":
+            raise ValueError("Rows can only be written one by one as ndjson or csv.")
+        if self._csv_writer is None:
+            self._csv_writer = csv.DictWriter(self.stream, fieldnames=list(fields or row), extrasaction="ignore",
+                                              lineterminator="\n")
+            self._csv_writer.writeheader()
+        self._csv_writer.writerow({key: _cell(value) for key, value in row.items()})
+
+    def _rows_json(self, rows: Iterable[Dict]) -> int:
+        stream = self.stream
+        stream.write("[")
+        count = 0
+        for count, row in enumerate(rows, 1):
+            # Indented one level, as json.dumps(rows, indent=2) would
+            stream.write(("," if count > 1 else "") + "\n  " + dumps(row, indent=True).replace("\n", "\n  "))
+        stream.write("\n]\n" if count else "]\n")
+        return count
+
+    def _rows_ndjson(self, rows: Iterable[Dict]) -> int:
+        stream = self.stream
+        count = 0
+        for count, row in enumerate(rows, 1):
+            stream.write(dumps(row) + "\n")
+        return count
+
+    def _rows_csv(self, rows: Iterable[Dict]) -> int:
+        sample, rows = _sample(rows)
+        fields = _columns(sample)
+        self._csv_writer = None
+        count = 0
+        for count, row in enumerate(itertools.chain(sample, rows), 1):
+            self.row(row, fields)
+        return count
+
+    def _rows_table(self, rows: Iterable[Dict]) -> int:
+        sample, rows = _sample(rows)
+        if not sample:
+            self.message("(no rows)")
+            return 0
+        columns = _columns(sample)
+        widths = [min(MAX_CELL, max([len(column)] + [len(_cell(row.get(column))) for row in sample]))
+                  for column in columns]
+        stream = self.stream
+
+        def line(cells: Iterable[str]) -> str:
+            return "  ".join(_fit(cell, width).ljust(width) for cell, width in zip(cells, widths)).rstrip() + "\n"
+
+        stream.write(line(columns))
+        stream.write(line("-" * width for width in widths))
+        count = 0
+        for count, row in enumerate(itertools.chain(sample, rows), 1):
+            stream.write(line(_cell(row.get(column)) for column in columns))
+        return count
+
+    def _key_value_table(self, obj: Dict) -> None:
+        width = max((len(str(key)) for key in obj), default=0)
+        for key, value in obj.items():
+            self.stream.write(f"{str(key).ljust(width)}  {_cell(value)}\n")
@@ -0,0 +1,36 @@
+# src/cli/readers.py
+import csv
+import json
+import sys
+from typing import Dict, Iterator, Tuple
+
+
+def iter_records(path: str) -> Iterator[Tuple[int, Dict]]:
+    """
+    Streams (line number, row) pairs from a CSV (header row required) or a
+    JSON Lines file, chosen by extension. `-` reads JSON Lines from stdin.
+    Rows that are not valid JSON objects are yielded with an `_error` key.
+    """
+    if path.lower().endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+        return
+
+    f = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                row = {"_error": f"Invalid JSON: {e}"}
+            if not isinstance(row, dict):
+                row = {"_error": "Each line must be a JSON object."}
+            yield line_no, row
+    finally:
+        if f is not sys.stdin:
+            f.close()
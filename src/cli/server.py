@@ -0,0 +1,114 @@
+# src/cli/server.py
+"""
+Unix-socket daemon for the retail CLI. One warm RetailCLI instance answers every
+request, so the DB client, HTTP connections and caches survive between commands.
+
+Protocol: the client sends one JSON line {"argv": [...]}. The daemon streams the
+command's output back as JSON lines {"stdout": str} or {"stderr": str}, at most
+CHUNK_SIZE characters each, and ends with {"exit_code": int}. Path arguments must
+be absolute (the client makes them so), since the daemon has its own working directory.
+"""
+import io
+import json
+import os
+import signal
+import socketserver
+import sys
+from contextlib import redirect_stderr, redirect_stdout
+
+# Output is sent to the client in frames of up to this many characters
+CHUNK_SIZE = 65536
+
+
+class _FrameWriter(io.TextIOBase):
+    """Text stream that sends what is written to the client as frames of one kind."""
+    def __init__(self, wfile, kind: str, buffered: bool = True, before_write=None):
+        self.wfile = wfile
+        self.kind = kind
+        self.buffered = buffered
+        self.before_write = before_write
+        self._buffer = []
+        self._size = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        if self.before_write:
+            self.before_write()
+        self._buffer.append(text)
+        self._size += len(text)
+        if self._size >= CHUNK_SIZE or not self.buffered:
+            self.flush()
+        return len(text)
+
+    def flush(self) -> None:
+        if not self._size:
+            return
+        text, self._buffer, self._size = "".join(self._buffer), [], 0
+        for start in range(0, len(text), CHUNK_SIZE):
+            send_frame(self.wfile, {self.kind: text[start:start + CHUNK_SIZE]})
+
+
+def send_frame(wfile, frame: dict) -> None:
+    wfile.write((json.dumps(frame) + "\n").encode("utf-8"))
+    wfile.flush()
+
+
+class _CommandHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            try:
+                argv = json.loads(line)["argv"]
+            except (ValueError, KeyError, TypeError):
+                send_frame(self.wfile, {"stderr": "❌ Error: malformed request\n"})
+                send_frame(self.wfile, {"exit_code": 2})
+                return
+            send_frame(self.wfile, {"exit_code": run_streamed(self.server.cli, argv, self.wfile)})
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client went away; the command was abandoned
+
+
+def run_streamed(cli, argv, wfile) -> int:
+    """
+    Runs a command with stdout/stderr sent to the client as they are written and
+    returns its exit status. Commands run one at a time.
+    """
+    out = _FrameWriter(wfile, "stdout")
+    # stdout is flushed before each stderr write, so the two arrive in the order written
+    err = _FrameWriter(wfile, "stderr", buffered=False, before_write=out.flush)
+    with redirect_stdout(out), redirect_stderr(err):
+        try:
+            # nested: `serve` and `shell` are refused wherever they appear after global options
+            exit_code = cli.execute(argv, nested=True)
+        except (BrokenPipeError, ConnectionResetError):
+            raise
+        except Exception as e:
+            print(f"❌ Error: {e}", file=sys.stderr)
+            exit_code = 1
+        out.flush()
+    return exit_code
+
+
+def serve(cli, socket_path: str) -> None:
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    # A single-threaded server: stdout redirection is process-wide, so requests are serialized
+    server = socketserver.UnixStreamServer(socket_path, _CommandHandler)
+    server.cli = cli
+
+    def _stop(signum, frame):
+        raise KeyboardInterrupt
+    signal.signal(signal.SIGTERM, _stop)
+    print(f"Listening on {socket_path} (Ctrl+C to stop)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
@@ -1,27 +1,225 @@
 # src/config.py
 import os
 from dotenv import load_dotenv
-from supabase import create_client, Client
+
+class LazyClient:
+    """
+    Stands in for the database client until the first query needs it, so commands
+    that never reach the database (help, argument errors) never connect.
+    """
+    def __init__(self, factory):
+        self._factory = factory
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = self._factory()
+        return self._client
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
 
 class AppConfig:
     """
     Manages application configuration and shared resources like the database client.
     """
-    _supabase_client: Client = None
+    _supabase_client = None
+    _db_client = None
+    _async_db_client = None
+    _http_client = None
+    _async_http_client = None
 
     def __init__(self):
         load_dotenv()
 
-    def get_supabase_client(self) -> Client:
+    @property
+    def backend(self) -> str:
+        """Storage backend selected by RETAIL_BACKEND: 'supabase' (default), 'sqlite' or 'memory'."""
+        return os.getenv("RETAIL_BACKEND", "supabase").strip().lower()
+
+    @property
+    def cache_enabled(self) -> bool:
+        """RETAIL_CACHE=1 puts a read-through cache in front of ProductDAO and CustomerDAO."""
+        return os.getenv("RETAIL_CACHE", "").strip().lower() in ("1", "true", "yes", "on")
+
+    @property
+    def cache_size(self) -> int:
+        return int(os.getenv("RETAIL_CACHE_SIZE", "1024"))
+
+    @property
+    def cache_ttl(self) -> float:
+        return float(os.getenv("RETAIL_CACHE_TTL", "30"))
+
+    @property
+    def stock_ledger(self) -> bool:
+        """RETAIL_STOCK_LEDGER=1 records stock changes in the stock_movements ledger (LedgerProductDAO)."""
+        return os.getenv("RETAIL_STOCK_LEDGER", "").strip().lower() in ("1", "true", "yes", "on")
+
+    @property
+    def catalog_snapshot_path(self) -> str:
+        """Catalog snapshot file used to price orders locally (RETAIL_CATALOG_SNAPSHOT); empty disables it."""
+        return os.getenv("RETAIL_CATALOG_SNAPSHOT", "").strip()
+
+    @property
+    def catalog_max_age(self) -> float:
+        """Seconds after which the catalog snapshot is ignored (RETAIL_CATALOG_MAX_AGE)."""
+        return float(os.getenv("RETAIL_CATALOG_MAX_AGE", "3600"))
+
+    @property
+    def order_queue_path(self) -> str:
+        """Local SQLite file for queued orders (RETAIL_ORDER_QUEUE, default order_queue.db)."""
+        return os.getenv("RETAIL_ORDER_QUEUE", "order_queue.db").strip()
+
+    @property
+    def order_queue_batch(self) -> int:
+        return int(os.getenv("RETAIL_ORDER_QUEUE_BATCH", "200"))
+
+    @property
+    def order_queue_interval(self) -> float:
+        """Seconds between flushes of the order queue (RETAIL_ORDER_QUEUE_INTERVAL)."""
+        return float(os.getenv("RETAIL_ORDER_QUEUE_INTERVAL", "2"))
+
+    @property
+    def order_queue_autoflush(self) -> bool:
+        """RETAIL_ORDER_QUEUE_AUTOFLUSH=1 flushes the order queue in the background in shell and serve modes."""
+        return os.getenv("RETAIL_ORDER_QUEUE_AUTOFLUSH", "").strip().lower() in ("1", "true", "yes", "on")
+
+    @property
+    def idempotency_path(self) -> str:
+        """
+        Local SQLite file for idempotency keys (RETAIL_IDEMPOTENCY_PATH, default
+        $XDG_DATA_HOME/retail-cli/idempotency.db, i.e. ~/.local/share/...); set it empty to
+        keep them in memory. The memory backend keeps them in memory too.
+        """
+        data_home = os.getenv("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share")
+        default = "" if self.backend == "memory" else os.path.join(data_home, "retail-cli", "idempotency.db")
+        return os.getenv("RETAIL_IDEMPOTENCY_PATH", default).strip()
+
+    @property
+    def idempotency_ttl(self) -> float:
+        """Seconds an idempotency key and its result are kept (RETAIL_IDEMPOTENCY_TTL, default one day)."""
+        return float(os.getenv("RETAIL_IDEMPOTENCY_TTL", "86400"))
+
+    @property
+    def idempotency_max_keys(self) -> int:
+        return int(os.getenv("RETAIL_IDEMPOTENCY_MAX_KEYS", "10000"))
+
+    @property
+    def search_refresh_interval(self) -> float:
+        """Seconds between incremental customer search index refreshes (RETAIL_SEARCH_REFRESH)."""
+        return float(os.getenv("RETAIL_SEARCH_REFRESH", "5"))
+
+    @property
+    def search_rebuild_interval(self) -> float:
+        """Seconds between full customer search index rebuilds (RETAIL_SEARCH_REBUILD)."""
+        return float(os.getenv("RETAIL_SEARCH_REBUILD", "300"))
+
+    @property
+    def rollup_path(self) -> str:
+        """
+        Local SQLite file for daily sales rollups (RETAIL_ROLLUP_PATH). Rollups are off
+        unless it is set; ":memory:" keeps them for the life of the process.
+        """
+        return os.getenv("RETAIL_ROLLUP_PATH", "").strip()
+
+    @property
+    def rollup_mutable_days(self) -> int:
+        """Recent days that are always re-fetched instead of read from the rollups (RETAIL_ROLLUP_MUTABLE_DAYS)."""
+        return int(os.getenv("RETAIL_ROLLUP_MUTABLE_DAYS", "7"))
+
+    @property
+    def rollup_source(self) -> str:
+        """Identifies the database the rollups were computed from."""
+        if self.backend == "supabase":
+            return os.getenv("SUPABASE_URL", "supabase")
+        if self.backend == "sqlite":
+            return "sqlite:" + os.path.abspath(os.getenv("RETAIL_SQLITE_PATH", "retail.db"))
+        return self.backend
+
+    @property
+    def http_settings(self) -> dict:
+        """Connection pool, timeout and retry settings for the supabase HTTP transport."""
+        return {
+            "max_connections": int(os.getenv("RETAIL_HTTP_MAX_CONNECTIONS", "20")),
+            "max_keepalive": int(os.getenv("RETAIL_HTTP_MAX_KEEPALIVE", "10")),
+            "keepalive_expiry": float(os.getenv("RETAIL_HTTP_KEEPALIVE_EXPIRY", "30")),
+            "http2": os.getenv("RETAIL_HTTP2", "1").strip().lower() in ("1", "true", "yes", "on"),
+            "connect_timeout": float(os.getenv("RETAIL_HTTP_CONNECT_TIMEOUT", "5")),
+            "read_timeout": float(os.getenv("RETAIL_HTTP_READ_TIMEOUT", "30")),
+            "pool_timeout": float(os.getenv("RETAIL_HTTP_POOL_TIMEOUT", "10")),
+            "retries": int(os.getenv("RETAIL_HTTP_RETRIES", "3")),
+            "backoff": float(os.getenv("RETAIL_HTTP_BACKOFF", "0.2")),
+            "backoff_max": float(os.getenv("RETAIL_HTTP_BACKOFF_MAX", "5")),
+        }
+
+    def get_supabase_client(self):
         """
-        Initializes and returns a singleton Supabase client instance.
+        Initializes and returns a singleton Supabase client instance, sharing one
+        pooled, retrying HTTP client across every DAO.
         """
         if self._supabase_client is None:
+            from supabase import create_client, ClientOptions
+            from src.http_transport import build_http_client
             supabase_url = os.getenv("SUPABASE_URL")
             supabase_key = os.getenv("SUPABASE_KEY")
             if not supabase_url or not supabase_key:
                 raise RuntimeError("SUPABASE_URL and SUPABASE_KEY must be set in .env file")
-            self._supabase_client = create_client(supabase_url, supabase_key)
+            settings = self.http_settings
+            self._http_client = build_http_client(settings)
+            options = ClientOptions(httpx_client=self._http_client, postgrest_client_timeout=settings["read_timeout"])
+            self._supabase_client = create_client(supabase_url, supabase_key, options=options)
         return self._supabase_client
 
-config = AppConfig()
\ No newline at end of file
+    def http_stats(self) -> dict:
+        """Request, retry and connection pool counters for the supabase transports built so far."""
+        stats = {}
+        if self._http_client is not None:
+            stats["sync"] = self._http_client._transport.pool_stats()
+        if self._async_http_client is not None:
+            stats["async"] = self._async_http_client._transport.pool_stats()
+        return stats
+
+    def get_db_client(self):
+        """
+        Returns the singleton client for the configured backend. Every backend
+        exposes the same `table()` / `rpc()` interface, so DAOs work with any of them.
+        """
+        if self._db_client is None:
+            backend = self.backend
+            if backend == "supabase":
+                self._db_client = self.get_supabase_client()
+            elif backend == "sqlite":
+                from src.backends.sqlite import SQLiteClient
+                self._db_client = SQLiteClient(os.getenv("RETAIL_SQLITE_PATH", "retail.db"))
+            elif backend == "memory":
+                from src.backends.memory import MemoryClient
+                self._db_client = MemoryClient()
+            else:
+                raise RuntimeError(f"Unknown RETAIL_BACKEND '{backend}'. Use supabase, sqlite or memory.")
+        return self._db_client
+
+    async def get_async_db_client(self):
+        """
+        Returns the singleton asyncio client for the configured backend. Local
+        backends are wrapped so their queries run in worker threads.
+        """
+        if self._async_db_client is None:
+            if self.backend == "supabase":
+                from supabase import acreate_client, AsyncClientOptions
+                from src.http_transport import build_async_http_client
+                supabase_url = os.getenv("SUPABASE_URL")
+                supabase_key = os.getenv("SUPABASE_KEY")
+                if not supabase_url or not supabase_key:
+                    raise RuntimeError("SUPABASE_URL and SUPABASE_KEY must be set in .env file")
+                settings = self.http_settings
+                self._async_http_client = build_async_http_client(settings)
+                options = AsyncClientOptions(httpx_client=self._async_http_client,
+                                             postgrest_client_timeout=settings["read_timeout"])
+                self._async_db_client = await acreate_client(supabase_url, supabase_key, options=options)
+            else:
+                from src.backends.async_adapter import AsyncClientAdapter
+                self._async_db_client = AsyncClientAdapter(self.get_db_client())
+        return self._async_db_client
+
+config = AppConfig()
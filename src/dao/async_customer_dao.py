@@ -0,0 +1,40 @@
+# src/dao/async_customer_dao.py
+from typing import Optional, List, Dict, TYPE_CHECKING
+if TYPE_CHECKING:
+    from supabase import AsyncClient
+
+class AsyncCustomerDAO:
+    """
+    Asyncio counterpart of CustomerDAO, built on the async supabase client.
+    """
+    def __init__(self, db_client: "AsyncClient"):
+        self.db = db_client
+        self.table = "customers"
+
+    async def create_customer(self, name: str, email: str, phone: str, city: Optional[str]) -> Optional[Dict]:
+        resp = await self.db.table(self.table).insert({"name": name, "email": email, "phone": phone, "city": city}).execute()
+        return resp.data[0] if resp.data else None
+
+    async def get_customer_by_email(self, email: str) -> Optional[Dict]:
+        resp = await self.db.table(self.table).select("*").eq("email", email).limit(1).execute()
+        return resp.data[0] if resp.data else None
+
+    async def get_customer_by_id(self, cust_id: int) -> Optional[Dict]:
+        resp = await self.db.table(self.table).select("*").eq("cust_id", cust_id).limit(1).execute()
+        return resp.data[0] if resp.data else None
+
+    async def update_customer(self, cust_id: int, fields: Dict) -> Optional[Dict]:
+        resp = await self.db.table(self.table).update(fields).eq("cust_id", cust_id).execute()
+        return resp.data[0] if resp.data else None
+
+    async def delete_customer(self, cust_id: int) -> Optional[Dict]:
+        resp = await self.db.table(self.table).delete().eq("cust_id", cust_id).execute()
+        return resp.data[0] if resp.data else None
+
+    async def list_customers(self, limit: int = 100) -> List[Dict]:
+        resp = await self.db.table(self.table).select("*").order("cust_id").limit(limit).execute()
+        return resp.data or []
+
+    async def search_customers_by_city(self, city: str, limit: int = 100) -> List[Dict]:
+        resp = await self.db.table(self.table).select("*").eq("city", city).limit(limit).execute()
+        return resp.data or []
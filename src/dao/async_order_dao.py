@@ -0,0 +1,60 @@
+# src/dao/async_order_dao.py
+from typing import List, Dict, Optional, TYPE_CHECKING
+if TYPE_CHECKING:
+    from supabase import AsyncClient
+from src.dao.order_dao import ORDER_DETAILS_SELECT
+
+class AsyncOrderDAO:
+    """
+    Asyncio counterpart of OrderDAO, built on the async supabase client.
+    """
+    def __init__(self, db_client: "AsyncClient"):
+        self.db = db_client
+
+    async def create_order(self, cust_id: int, total_amount: float, status: str = "PLACED") -> Optional[Dict]:
+        """Inserts a new order record and returns it."""
+        payload = {"cust_id": cust_id, "total_amount": total_amount, "status": status}
+        resp = await self.db.table("orders").insert(payload).execute()
+        return resp.data[0] if resp.data else None
+
+    async def create_order_items(self, order_id: int, items: List[Dict]) -> List[Dict]:
+        """Inserts multiple item records for a given order."""
+        payload = [
+            {"order_id": order_id, "prod_id": item["prod_id"], "quantity": item["quantity"], "price": item["price"]}
+            for item in items
+        ]
+        resp = await self.db.table("order_items").insert(payload).execute()
+        return resp.data or []
+
+    async def get_order_by_id(self, order_id: int) -> Optional[Dict]:
+        """Retrieves a single order by its ID."""
+        resp = await self.db.table("orders").select("*").eq("order_id", order_id).limit(1).execute()
+        return resp.data[0] if resp.data else None
+
+    async def get_order_items_by_order_id(self, order_id: int) -> List[Dict]:
+        """Retrieves all items associated with a single order."""
+        resp = await self.db.table("order_items").select("*, products(name, sku)").eq("order_id", order_id).execute()
+        return resp.data or []
+
+    async def get_order_with_details(self, order_id: int) -> Optional[Dict]:
+        """Retrieves an order with `customer` and `items` embedded, in a single request."""
+        resp = await self.db.table("orders").select(ORDER_DETAILS_SELECT).eq("order_id", order_id).limit(1).execute()
+        return resp.data[0] if resp.data else None
+
+    async def list_orders_by_customer(self, cust_id: int) -> List[Dict]:
+        """Retrieves all orders placed by a specific customer."""
+        resp = await self.db.table("orders").select("*").eq("cust_id", cust_id).order("order_date", desc=True).execute()
+        return resp.data or []
+
+    async def update_order_status(self, order_id: int, status: str, from_status: Optional[str] = None) -> Optional[Dict]:
+        """Updates the status of an order; with `from_status`, only while it is still in that status."""
+        query = self.db.table("orders").update({"status": status}).eq("order_id", order_id)
+        if from_status:
+            query = query.eq("status", from_status)
+        resp = await query.execute()
+        return resp.data[0] if resp.data else None
+
+    async def get_sales_report_data(self, start_date: str, end_date: str) -> List[Dict]:
+        """Fetches aggregated sales data for completed orders via the `sales_report` RPC."""
+        resp = await self.db.rpc('sales_report', {'start_date': start_date, 'end_date': end_date}).execute()
+        return resp.data or []
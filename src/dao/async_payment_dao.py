@@ -0,0 +1,51 @@
+# src/dao/async_payment_dao.py
+from typing import Dict, List, Optional, TYPE_CHECKING
+import datetime
+if TYPE_CHECKING:
+    from supabase import AsyncClient
+
+class AsyncPaymentDAO:
+    """
+    Asyncio counterpart of PaymentDAO, built on the async supabase client.
+    """
+    def __init__(self, db_client: "AsyncClient"):
+        self.db = db_client
+        self.table = "payments"
+
+    async def create_payment(self, order_id: int, amount: float, status: str = "PENDING") -> Optional[Dict]:
+        """Inserts a new payment record."""
+        payload = {"order_id": order_id, "amount": amount, "status": status}
+        resp = await self.db.table(self.table).insert(payload).execute()
+        return resp.data[0] if resp.data else None
+
+    async def get_payment_by_order_id(self, order_id: int) -> Optional[Dict]:
+        """Retrieves a payment record by its associated order_id."""
+        resp = await self.db.table(self.table).select("*").eq("order_id", order_id).limit(1).execute()
+        return resp.data[0] if resp.data else None
+
+    async def mark_payments_paid(self, order_ids: List[int], method: str) -> List[Dict]:
+        """Marks the PENDING payments of the given orders as PAID and returns the rows that changed."""
+        if not order_ids:
+            return []
+        updates = {"status": "PAID", "method": method, "paid_at": datetime.datetime.now().isoformat()}
+        resp = await (self.db.table(self.table).update(updates)
+                      .in_("order_id", list(order_ids)).eq("status", "PENDING").execute())
+        return resp.data or []
+
+    async def mark_payments_refunded(self, order_ids: List[int], from_status: str = "PENDING") -> List[Dict]:
+        """Marks the payments of the given orders still in `from_status` as REFUNDED and returns the changed rows."""
+        if not order_ids:
+            return []
+        resp = await (self.db.table(self.table).update({"status": "REFUNDED"})
+                      .in_("order_id", list(order_ids)).eq("status", from_status).execute())
+        return resp.data or []
+
+    async def update_payment_by_order_id(self, order_id: int, updates: Dict) -> Optional[Dict]:
+        """
+        Updates a payment record using the order_id.
+        Automatically adds the 'paid_at' timestamp if status is 'PAID'.
+        """
+        if updates.get("status") == "PAID":
+            updates["paid_at"] = datetime.datetime.now().isoformat()
+        resp = await self.db.table(self.table).update(updates).eq("order_id", order_id).execute()
+        return resp.data[0] if resp.data else None
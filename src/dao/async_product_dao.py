@@ -0,0 +1,60 @@
+# src/dao/async_product_dao.py
+from typing import Optional, List, Dict, TYPE_CHECKING
+if TYPE_CHECKING:
+    from supabase import AsyncClient
+
+class AsyncProductDAO:
+    """
+    Asyncio counterpart of ProductDAO, built on the async supabase client.
+    """
+    def __init__(self, db_client: "AsyncClient"):
+        self.db = db_client
+        self.table = "products"
+
+    async def create_product(self, name: str, sku: str, price: float, stock: int = 0, category: Optional[str] = None) -> Optional[Dict]:
+        payload = {"name": name, "sku": sku, "price": price, "stock": stock, "category": category}
+        resp = await self.db.table(self.table).insert(payload).execute()
+        if resp.data:
+            return resp.data[0]
+        return await self.get_product_by_sku(sku)
+
+    async def get_product_by_id(self, prod_id: int) -> Optional[Dict]:
+        resp = await self.db.table(self.table).select("*").eq("prod_id", prod_id).limit(1).execute()
+        return resp.data[0] if resp.data else None
+
+    async def get_product_by_sku(self, sku: str) -> Optional[Dict]:
+        resp = await self.db.table(self.table).select("*").eq("sku", sku).limit(1).execute()
+        return resp.data[0] if resp.data else None
+
+    async def get_products_by_ids(self, prod_ids: List[int]) -> List[Dict]:
+        ids = list(dict.fromkeys(prod_ids))
+        if not ids:
+            return []
+        resp = await self.db.table(self.table).select("*").in_("prod_id", ids).execute()
+        return resp.data or []
+
+    async def update_product(self, prod_id: int, fields: Dict) -> Optional[Dict]:
+        resp = await self.db.table(self.table).update(fields).eq("prod_id", prod_id).execute()
+        if resp.data:
+            return resp.data[0]
+        return await self.get_product_by_id(prod_id)
+
+    async def list_products(self, limit: int = 100) -> List[Dict]:
+        resp = await self.db.table(self.table).select("*").order("prod_id", desc=False).limit(limit).execute()
+        return resp.data or []
+
+    async def reserve_stock(self, items: List[Dict]) -> List[Dict]:
+        """Same contract as ProductDAO.reserve_stock: returns the lines that could not be reserved."""
+        if not items:
+            return []
+        payload = [{"prod_id": item["prod_id"], "quantity": item["quantity"]} for item in items]
+        resp = await self.db.rpc("reserve_stock", {"items": payload}).execute()
+        return resp.data or []
+
+    async def release_stock(self, items: List[Dict]) -> List[Dict]:
+        """Same contract as ProductDAO.release_stock: returns the lines whose product no longer exists."""
+        if not items:
+            return []
+        payload = [{"prod_id": item["prod_id"], "quantity": item["quantity"]} for item in items]
+        resp = await self.db.rpc("release_stock", {"items": payload}).execute()
+        return resp.data or []
@@ -0,0 +1,56 @@
+# src/dao/cached_customer_dao.py
+from typing import Dict, List, Optional
+from src.cache import TTLCache
+from src.dao.customer_dao import CustomerDAO
+
+
+class CachedCustomerDAO(CustomerDAO):
+    """
+    CustomerDAO with a read-through cache for lookups by ID and email.
+    update_customer and delete_customer invalidate the cached row.
+    """
+    def __init__(self, db_client, cache: Optional[TTLCache] = None):
+        super().__init__(db_client)
+        self.cache = cache or TTLCache()
+
+    def _remember(self, customer: Optional[Dict]) -> Optional[Dict]:
+        if customer:
+            self.cache.set(("id", customer["cust_id"]), dict(customer))
+            self.cache.set(("email", customer["email"]), customer["cust_id"])
+        return customer
+
+    def invalidate(self, cust_id: int) -> None:
+        customer = self.cache.pop(("id", cust_id))
+        if customer:
+            self.cache.pop(("email", customer["email"]))
+
+    def create_customer(self, name: str, email: str, phone: str, city: Optional[str]) -> Optional[Dict]:
+        return self._remember(super().create_customer(name, email, phone, city))
+
+    def get_customer_by_email(self, email: str) -> Optional[Dict]:
+        cust_id = self.cache.get(("email", email))
+        if cust_id is not None:
+            customer = self.cache.get(("id", cust_id))
+            if customer is not None and customer["email"] == email:
+                return dict(customer)
+        return self._remember(super().get_customer_by_email(email))
+
+    def get_customer_by_id(self, cust_id: int) -> Optional[Dict]:
+        customer = self.cache.get(("id", cust_id))
+        if customer is None:
+            customer = self._remember(super().get_customer_by_id(cust_id))
+        return dict(customer) if customer else None
+
+    def get_customers_by_ids(self, cust_ids: List[int]) -> List[Dict]:
+        customers = super().get_customers_by_ids(cust_ids)
+        for customer in customers:
+            self._remember(customer)
+        return customers
+
+    def update_customer(self, cust_id: int, fields: Dict) -> Optional[Dict]:
+        self.invalidate(cust_id)
+        return self._remember(super().update_customer(cust_id, fields))
+
+    def delete_customer(self, cust_id: int) -> Optional[Dict]:
+        self.invalidate(cust_id)
+        return super().delete_customer(cust_id)
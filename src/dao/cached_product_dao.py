@@ -0,0 +1,65 @@
+# src/dao/cached_product_dao.py
+from typing import Dict, List, Optional
+from src.cache import TTLCache
+from src.dao.product_dao import ProductDAO
+
+
+class CachedProductDAO(ProductDAO):
+    """
+    ProductDAO with a read-through cache for single-product lookups.
+    Rows are cached by prod_id; SKUs map to a prod_id and are re-checked on read.
+    Multi-product reads always go to the database (they feed order validation)
+    and refresh the cache; every write invalidates the rows it touches.
+    """
+    def __init__(self, db_client, cache: Optional[TTLCache] = None):
+        super().__init__(db_client)
+        self.cache = cache or TTLCache()
+
+    def _remember(self, product: Optional[Dict]) -> Optional[Dict]:
+        if product:
+            self.cache.set(("id", product["prod_id"]), dict(product))
+            self.cache.set(("sku", product["sku"]), product["prod_id"])
+        return product
+
+    def invalidate(self, prod_id: int) -> None:
+        product = self.cache.pop(("id", prod_id))
+        if product:
+            self.cache.pop(("sku", product["sku"]))
+
+    def create_product(self, name: str, sku: str, price: float, stock: int = 0, category: Optional[str] = None) -> Optional[Dict]:
+        return self._remember(super().create_product(name, sku, price, stock, category))
+
+    def get_product_by_id(self, prod_id: int) -> Optional[Dict]:
+        product = self.cache.get(("id", prod_id))
+        if product is None:
+            product = self._remember(super().get_product_by_id(prod_id))
+        return dict(product) if product else None
+
+    def get_product_by_sku(self, sku: str) -> Optional[Dict]:
+        prod_id = self.cache.get(("sku", sku))
+        if prod_id is not None:
+            product = self.cache.get(("id", prod_id))
+            if product is not None and product["sku"] == sku:
+                return dict(product)
+        return self._remember(super().get_product_by_sku(sku))
+
+    def get_products_by_ids(self, prod_ids: List[int]) -> List[Dict]:
+        products = super().get_products_by_ids(prod_ids)
+        for product in products:
+            self._remember(product)
+        return products
+
+    def update_product(self, prod_id: int, fields: Dict) -> Optional[Dict]:
+        self.invalidate(prod_id)
+        product = super().update_product(prod_id, fields)
+        return self._remember(product)
+
+    def reserve_stock(self, items: List[Dict]) -> List[Dict]:
+        for item in items:
+            self.invalidate(item["prod_id"])
+        return super().reserve_stock(items)
+
+    def release_stock(self, items: List[Dict], reason: str = "cancel") -> List[Dict]:
+        for item in items:
+            self.invalidate(item["prod_id"])
+        return super().release_stock(items, reason)
@@ -1,12 +1,13 @@
 # src/dao/customer_dao.py
-from typing import Optional, List, Dict
-from supabase import Client
+from typing import Optional, List, Dict, Iterator, TYPE_CHECKING
+if TYPE_CHECKING:
+    from supabase import Client
 
 class CustomerDAO:
     """
     Data Access Object for handling customer-related database operations.
     """
-    def __init__(self, db_client: Client):
+    def __init__(self, db_client: "Client"):
         self.db = db_client
         self.table = "customers"
 
@@ -34,6 +35,50 @@ class CustomerDAO:
         resp = self.db.table(self.table).select("*").order("cust_id").limit(limit).execute()
         return resp.data or []
 
+    def iter_customers(self, page_size: int = 1000, city: Optional[str] = None,
+                       after_id: Optional[int] = None) -> Iterator[Dict]:
+        """
+        Yields every customer in cust_id order, paging by the last cust_id seen.
+        `after_id` starts after a known ID, e.g. to pick up only newly added customers.
+        """
+        if page_size < 1:
+            raise ValueError("page_size must be at least 1.")
+        last_id = after_id
+        while True:
+            query = self.db.table(self.table).select("*")
+            if city:
+                query = query.eq("city", city)
+            if last_id is not None:
+                query = query.gt("cust_id", last_id)
+            rows = query.order("cust_id").limit(page_size).execute().data or []
+            if not rows:
+                return
+            yield from rows
+            last_id = rows[-1]["cust_id"]
+
     def search_customers_by_city(self, city: str, limit: int = 100) -> List[Dict]:
         resp = self.db.table(self.table).select("*").eq("city", city).limit(limit).execute()
-        return resp.data or []
\ No newline at end of file
+        return resp.data or []
+
+    def get_customers_by_ids(self, cust_ids: List[int]) -> List[Dict]:
+        """Fetches the customers matching any of the given IDs in a single round trip."""
+        unique_ids = list(dict.fromkeys(cust_ids))
+        if not unique_ids:
+            return []
+        resp = self.db.table(self.table).select("*").in_("cust_id", unique_ids).execute()
+        return resp.data or []
+
+    def get_customers_by_emails(self, emails: List[str]) -> List[Dict]:
+        """Fetches the customers matching any of the given emails in a single round trip."""
+        unique_emails = list(dict.fromkeys(emails))
+        if not unique_emails:
+            return []
+        resp = self.db.table(self.table).select("*").in_("email", unique_emails).execute()
+        return resp.data or []
+
+    def create_customers(self, rows: List[Dict]) -> List[Dict]:
+        """Inserts many customers with one multi-row insert and returns the inserted rows."""
+        if not rows:
+            return []
+        resp = self.db.table(self.table).insert(rows).execute()
+        return resp.data or []
@@ -0,0 +1,142 @@
+# src/dao/ledger_product_dao.py
+from typing import Dict, Iterator, List, Optional
+from src.batching import chunked
+from src.dao.cached_product_dao import CachedProductDAO
+from src.dao.product_dao import ProductDAO
+
+MOVEMENT_REASONS = ("order", "cancel", "restock", "adjustment")
+
+
+class LedgerProductDAO(ProductDAO):
+    """
+    ProductDAO that records every stock change as a row in the append-only
+    `stock_movements` ledger instead of rewriting `products.stock`.
+    `products.stock` is a snapshot; available stock is the snapshot plus the movements
+    not yet compacted into it, and every product read reports that figure as `stock`.
+    Reservations are still checked on the server, but only lock against other
+    reservations of the same product; cancellations, restocks and adjustments are
+    plain inserts. `compact_stock` folds the ledger back into the snapshot.
+    """
+    def __init__(self, db_client):
+        super().__init__(db_client)
+        self.movements_table = "stock_movements"
+
+    # --- Reads report available stock ---
+    def get_available_stock(self, prod_ids: List[int]) -> Dict[int, int]:
+        """Returns {prod_id: snapshot + pending movements} in one RPC call; unknown IDs are left out."""
+        ids = list(dict.fromkeys(prod_ids))
+        if not ids:
+            return {}
+        resp = self.db.rpc("available_stock", {"prod_ids": ids}).execute()
+        return {row["prod_id"]: row["available"] for row in resp.data or []}
+
+    def _with_available(self, rows: List[Dict]) -> List[Dict]:
+        available = self.get_available_stock([row["prod_id"] for row in rows])
+        for row in rows:
+            row["stock"] = available.get(row["prod_id"], row.get("stock"))
+        return rows
+
+    def _one_with_available(self, row: Optional[Dict]) -> Optional[Dict]:
+        return self._with_available([row])[0] if row else None
+
+    def get_product_by_id(self, prod_id: int) -> Optional[Dict]:
+        return self._one_with_available(super().get_product_by_id(prod_id))
+
+    def get_product_by_sku(self, sku: str) -> Optional[Dict]:
+        return self._one_with_available(super().get_product_by_sku(sku))
+
+    def get_products_by_ids(self, prod_ids: List[int]) -> List[Dict]:
+        return self._with_available(super().get_products_by_ids(prod_ids))
+
+    def get_products_by_skus(self, skus: List[str]) -> List[Dict]:
+        return self._with_available(super().get_products_by_skus(skus))
+
+    def list_products(self, limit: int = 100) -> List[Dict]:
+        return self._with_available(super().list_products(limit))
+
+    def iter_products(self, page_size: int = 1000, category: Optional[str] = None) -> Iterator[Dict]:
+        # Pages from the parent arrive page_size rows at a time, so this adds one RPC per page
+        for page in chunked(super().iter_products(page_size, category), page_size):
+            yield from self._with_available(page)
+
+    def iter_low_stock(self, threshold: int, page_size: int = 1000, category: Optional[str] = None) -> Iterator[Dict]:
+        """
+        Pending movements can take any product below the threshold, so the snapshot
+        cannot be filtered on the server; every product is paged and checked here.
+        """
+        for product in self.iter_products(page_size, category):
+            if (product.get("stock") or 0) <= threshold:
+                yield product
+
+    # --- Writes append movements ---
+    def update_product(self, prod_id: int, fields: Dict) -> Optional[Dict]:
+        """A new `stock` value is recorded as an adjustment from the current available stock."""
+        fields = dict(fields)
+        stock = fields.pop("stock", None)
+        if stock is not None:
+            current = self.get_available_stock([prod_id]).get(prod_id)
+            if current is None:
+                return None
+            if stock != current:
+                self.record_movements([{"prod_id": prod_id, "quantity": stock - current}], "adjustment")
+        if fields:
+            super().update_product(prod_id, fields)
+        return self.get_product_by_id(prod_id)
+
+    def reserve_stock(self, items: List[Dict]) -> List[Dict]:
+        """
+        Same contract as ProductDAO.reserve_stock, through the `ledger_reserve_stock` RPC:
+        all-or-nothing, recorded as negative 'order' movements. A line's `reservation`
+        reference is stored on its movement so `link_reservations` can add the order ID later.
+        """
+        if not items:
+            return []
+        payload = [{"prod_id": item["prod_id"], "quantity": item["quantity"], "reservation": item.get("reservation")}
+                   for item in items]
+        resp = self.db.rpc("ledger_reserve_stock", {"items": payload}).execute()
+        return resp.data or []
+
+    def link_reservations(self, order_ids: Dict[str, int]) -> None:
+        """Stores each order ID on the 'order' movements of its {reservation: order_id} with one RPC call."""
+        if not order_ids:
+            return
+        links = [{"reservation": reservation, "order_id": order_id} for reservation, order_id in order_ids.items()]
+        self.db.rpc("link_stock_reservations", {"links": links}).execute()
+
+    def release_stock(self, items: List[Dict], reason: str = "cancel") -> List[Dict]:
+        """Same contract as ProductDAO.release_stock, recorded as positive movements with `reason`."""
+        return self.record_movements(items, reason)
+
+    def record_movements(self, items: List[Dict], reason: str) -> List[Dict]:
+        """
+        Appends one movement per {prod_id, quantity[, order_id]} line with a single RPC call.
+        Returns the lines whose product does not exist; nothing is recorded for them.
+        """
+        if reason not in MOVEMENT_REASONS:
+            raise ValueError(f"Unknown stock movement reason '{reason}'.")
+        if not items:
+            return []
+        payload = [{"prod_id": item["prod_id"], "quantity": item["quantity"], "order_id": item.get("order_id")}
+                   for item in items]
+        resp = self.db.rpc("record_stock_movements", {"items": payload, "reason": reason}).execute()
+        return resp.data or []
+
+    # --- Ledger maintenance and history ---
+    def compact_stock(self) -> List[Dict]:
+        """
+        Folds every pending movement into `products.stock` on the server and returns
+        {prod_id, movements, delta} per product. Available stock does not change.
+        """
+        resp = self.db.rpc("compact_stock", {}).execute()
+        return resp.data or []
+
+    def get_movements(self, prod_id: int, limit: int = 100) -> List[Dict]:
+        """Returns a product's most recent movements, newest first."""
+        resp = (self.db.table(self.movements_table).select("*").eq("prod_id", prod_id)
+                .order("movement_id", desc=True).limit(limit).execute())
+        return resp.data or []
+
+
+class CachedLedgerProductDAO(CachedProductDAO, LedgerProductDAO):
+    """The read-through product cache on top of the ledger; caches available stock."""
+    pass
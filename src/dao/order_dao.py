@@ -1,17 +1,25 @@
 # src/dao/order_dao.py
-from typing import List, Dict, Optional
-from supabase import Client
+import datetime
+from typing import List, Dict, Optional, Iterator, TYPE_CHECKING
+if TYPE_CHECKING:
+    from supabase import Client
+
+# Order with its customer and line items (with product name/SKU) in one embedded select
+ORDER_DETAILS_SELECT = "*, customer:customers(*), items:order_items(*, products(name, sku))"
 
 class OrderDAO:
     """
     Data Access Object for order-related database operations.
     """
-    def __init__(self, db_client: Client):
+    def __init__(self, db_client: "Client"):
         self.db = db_client
 
-    def create_order(self, cust_id: int, total_amount: float, status: str = "PLACED") -> Optional[Dict]:
-        """Inserts a new order record and returns it."""
+    def create_order(self, cust_id: int, total_amount: float, status: str = "PLACED",
+                     idempotency_key: Optional[str] = None) -> Optional[Dict]:
+        """Inserts a new order record and returns it. `idempotency_key` is unique across orders."""
         payload = {"cust_id": cust_id, "total_amount": total_amount, "status": status}
+        if idempotency_key:
+            payload["idempotency_key"] = idempotency_key
         resp = self.db.table("orders").insert(payload).execute()
         return resp.data[0] if resp.data else None
 
@@ -26,26 +34,145 @@ class OrderDAO:
         resp = self.db.table("order_items").insert(payload).execute()
         return resp.data or []
 
+    def create_orders(self, rows: List[Dict]) -> List[Dict]:
+        """
+        Inserts many orders (cust_id, total_amount, optional status) with one multi-row
+        insert. The inserted rows come back in the same order as `rows`.
+        """
+        if not rows:
+            return []
+        resp = self.db.table("orders").insert(rows).execute()
+        return resp.data or []
+
+    def create_order_items_bulk(self, items: List[Dict]) -> List[Dict]:
+        """Inserts item records for any number of orders; each item carries its own order_id."""
+        if not items:
+            return []
+        payload = [
+            {"order_id": item["order_id"], "prod_id": item["prod_id"], "quantity": item["quantity"], "price": item["price"]}
+            for item in items
+        ]
+        resp = self.db.table("order_items").insert(payload).execute()
+        return resp.data or []
+
     def get_order_by_id(self, order_id: int) -> Optional[Dict]:
         """Retrieves a single order by its ID."""
         resp = self.db.table("orders").select("*").eq("order_id", order_id).limit(1).execute()
         return resp.data[0] if resp.data else None
 
+    def get_order_by_idempotency_key(self, idempotency_key: str) -> Optional[Dict]:
+        """The order created with the given idempotency key, if any."""
+        resp = self.db.table("orders").select("*").eq("idempotency_key", idempotency_key).limit(1).execute()
+        return resp.data[0] if resp.data else None
+
+    def get_orders_by_idempotency_keys(self, idempotency_keys: List[str]) -> List[Dict]:
+        """The orders created with any of the given idempotency keys, in one request."""
+        if not idempotency_keys:
+            return []
+        resp = self.db.table("orders").select("*").in_("idempotency_key", list(dict.fromkeys(idempotency_keys))).execute()
+        return resp.data or []
+
+    def void_orders(self, order_ids: List[int]) -> List[Dict]:
+        """
+        Cancels orders that were never completely written and clears their idempotency
+        keys, so a retry with the same key places the order again. Returns the changed rows.
+        """
+        if not order_ids:
+            return []
+        resp = (self.db.table("orders").update({"status": "CANCELLED", "idempotency_key": None})
+                .in_("order_id", list(order_ids)).execute())
+        return resp.data or []
+
     def get_order_items_by_order_id(self, order_id: int) -> List[Dict]:
         """Retrieves all items associated with a single order."""
         resp = self.db.table("order_items").select("*, products(name, sku)").eq("order_id", order_id).execute()
         return resp.data or []
         
+    def get_order_with_details(self, order_id: int) -> Optional[Dict]:
+        """Retrieves an order with `customer` and `items` embedded, in a single request."""
+        resp = self.db.table("orders").select(ORDER_DETAILS_SELECT).eq("order_id", order_id).limit(1).execute()
+        return resp.data[0] if resp.data else None
+
+    def get_orders_with_details(self, order_ids: List[int]) -> List[Dict]:
+        """Retrieves many orders with customer and items embedded, in a single request, in the order asked."""
+        ids = list(dict.fromkeys(order_ids))
+        if not ids:
+            return []
+        resp = self.db.table("orders").select(ORDER_DETAILS_SELECT).in_("order_id", ids).execute()
+        by_id = {order["order_id"]: order for order in resp.data or []}
+        return [by_id[order_id] for order_id in ids if order_id in by_id]
+
     def list_orders_by_customer(self, cust_id: int) -> List[Dict]:
         """Retrieves all orders placed by a specific customer."""
         resp = self.db.table("orders").select("*").eq("cust_id", cust_id).order("order_date", desc=True).execute()
         return resp.data or []
 
-    def update_order_status(self, order_id: int, status: str) -> Optional[Dict]:
-        """Updates the status of an order."""
-        resp = self.db.table("orders").update({"status": status}).eq("order_id", order_id).execute()
+    def iter_orders(self, page_size: int = 1000, cust_id: Optional[int] = None,
+                    status: Optional[str] = None) -> Iterator[Dict]:
+        """Yields orders in order_id order, paging by the last order_id seen."""
+        if page_size < 1:
+            raise ValueError("page_size must be at least 1.")
+        last_id = None
+        while True:
+            query = self.db.table("orders").select("*")
+            if cust_id is not None:
+                query = query.eq("cust_id", cust_id)
+            if status:
+                query = query.eq("status", status)
+            if last_id is not None:
+                query = query.gt("order_id", last_id)
+            rows = query.order("order_id").limit(page_size).execute().data or []
+            if not rows:
+                return
+            yield from rows
+            last_id = rows[-1]["order_id"]
+
+    def iter_orders_with_items(self, start_date: str, end_date: str, status: Optional[str] = "COMPLETED",
+                               page_size: int = 1000) -> Iterator[Dict]:
+        """
+        Yields the orders placed between the two dates (inclusive), each with its
+        `order_items` (prod_id, quantity, price) embedded, so a page of orders and their
+        lines costs one request. Paged by order_id.
+        """
+        if page_size < 1:
+            raise ValueError("page_size must be at least 1.")
+        end_exclusive = (datetime.date.fromisoformat(end_date) + datetime.timedelta(days=1)).isoformat()
+        last_id = None
+        while True:
+            query = (self.db.table("orders")
+                     .select("order_id, cust_id, order_date, order_items(prod_id, quantity, price)")
+                     .gte("order_date", start_date).lt("order_date", end_exclusive))
+            if status:
+                query = query.eq("status", status)
+            if last_id is not None:
+                query = query.gt("order_id", last_id)
+            rows = query.order("order_id").limit(page_size).execute().data or []
+            if not rows:
+                return
+            yield from rows
+            last_id = rows[-1]["order_id"]
+
+    def update_order_status(self, order_id: int, status: str, from_status: Optional[str] = None) -> Optional[Dict]:
+        """
+        Updates the status of an order. With `from_status`, only an order still in that
+        status is changed, and None means another writer moved it first.
+        """
+        query = self.db.table("orders").update({"status": status}).eq("order_id", order_id)
+        if from_status:
+            query = query.eq("status", from_status)
+        resp = query.execute()
         return resp.data[0] if resp.data else None
     
+    def update_orders_status(self, order_ids: List[int], status: str, from_status: Optional[str] = None) -> List[Dict]:
+        """Sets the status of many orders with one update and returns the changed rows; guarded like update_order_status."""
+        if not order_ids:
+            return []
+        query = self.db.table("orders").update({"status": status}).in_("order_id", list(order_ids))
+        if from_status:
+            query = query.eq("status", from_status)
+        resp = query.execute()
+        return resp.data or []
+
     # ADD THIS NEW METHOD FOR REPORTING
     def get_sales_report_data(self, start_date: str, end_date: str) -> List[Dict]:
         """
@@ -53,4 +180,12 @@ class OrderDAO:
         by calling a PostgreSQL function (RPC).
         """
         resp = self.db.rpc('sales_report', {'start_date': start_date, 'end_date': end_date}).execute()
-        return resp.data or []
\ No newline at end of file
+        return resp.data or []
+
+    def get_daily_sales(self, start_date: str, end_date: str) -> List[Dict]:
+        """
+        Fetches per-day revenue and order counts for completed orders within a date range
+        (inclusive) through the `daily_sales` RPC. Days without sales are omitted.
+        """
+        resp = self.db.rpc('daily_sales', {'start_date': start_date, 'end_date': end_date}).execute()
+        return resp.data or []
@@ -0,0 +1,184 @@
+# src/dao/order_queue_dao.py
+import datetime
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # not on Windows: flushers are then told apart by FLUSH_LEASE alone
+    fcntl = None
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS queued_orders (
+    queue_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    cust_id INTEGER NOT NULL,
+    items TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'PENDING',
+    order_id INTEGER,
+    reason TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_queued_orders_status ON queued_orders (status, queue_id);
+CREATE TABLE IF NOT EXISTS queue_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+STATUSES = ("PENDING", "FLUSHING", "ACCEPTED", "REJECTED")
+# Without fcntl, FLUSHING orders older than this many seconds are taken as abandoned
+FLUSH_LEASE = 600
+
+
+def _now() -> str:
+    return datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")
+
+
+class OrderQueueDAO:
+    """
+    Local SQLite queue of orders waiting to be written to the database.
+    The file runs in WAL mode with synchronous=FULL, so an order is on disk once
+    `enqueue` returns. `queue_id` is the order's provisional ID and fixes flush order.
+    `queue_uid` is a random ID created with the file, so idempotency keys built from
+    queue IDs do not collide between queue files.
+    """
+    def __init__(self, path: str = "order_queue.db"):
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=FULL")
+        self.conn.executescript(SCHEMA)
+        self.conn.execute("INSERT OR IGNORE INTO queue_meta (key, value) VALUES ('uid', ?)", (uuid.uuid4().hex,))
+        self.queue_uid = self.conn.execute("SELECT value FROM queue_meta WHERE key = 'uid'").fetchone()[0]
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict:
+        entry = dict(row)
+        entry["items"] = json.loads(entry["items"])
+        return entry
+
+    def enqueue(self, cust_id: int, items: List[Dict]) -> Dict:
+        now = _now()
+        with self._lock:
+            cur = self.conn.execute(
+                "INSERT INTO queued_orders (cust_id, items, created_at, updated_at) VALUES (?, ?, ?, ?)",
+                (cust_id, json.dumps(items), now, now))
+            row = self.conn.execute("SELECT * FROM queued_orders WHERE queue_id = ?", (cur.lastrowid,)).fetchone()
+        return self._to_dict(row)
+
+    def get(self, queue_id: int) -> Optional[Dict]:
+        with self._lock:
+            row = self.conn.execute("SELECT * FROM queued_orders WHERE queue_id = ?", (queue_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def claim_batch(self, limit: int) -> List[Dict]:
+        """Marks the oldest `limit` pending orders FLUSHING and returns them in queue order."""
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self.conn.execute(
+                    "SELECT * FROM queued_orders WHERE status = 'PENDING' ORDER BY queue_id LIMIT ?",
+                    (limit,)).fetchall()
+                self.conn.executemany(
+                    "UPDATE queued_orders SET status = 'FLUSHING', attempts = attempts + 1, updated_at = ? "
+                    "WHERE queue_id = ?", [(_now(), row["queue_id"]) for row in rows])
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+        return [{**self._to_dict(row), "status": "FLUSHING", "attempts": row["attempts"] + 1} for row in rows]
+
+    def complete(self, results: List[Dict]) -> None:
+        """
+        Records flush outcomes in one transaction. Each result is
+        {queue_id, status: ACCEPTED|REJECTED, order_id or reason}.
+        """
+        now = _now()
+        with self._lock:
+            self.conn.execute("BEGIN")
+            try:
+                self.conn.executemany(
+                    "UPDATE queued_orders SET status = ?, order_id = ?, reason = ?, last_error = NULL, updated_at = ? "
+                    "WHERE queue_id = ?",
+                    [(r["status"], r.get("order_id"), r.get("reason"), now, r["queue_id"]) for r in results])
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+    def release(self, queue_ids: List[int], error: str) -> None:
+        """Puts claimed orders back to PENDING after a failed flush, keeping the error."""
+        with self._lock:
+            self.conn.executemany(
+                "UPDATE queued_orders SET status = 'PENDING', last_error = ?, updated_at = ? WHERE queue_id = ?",
+                [(error, _now(), queue_id) for queue_id in queue_ids])
+
+    @contextmanager
+    def flush_lock(self):
+        """
+        Holds an exclusive lock on `<path>.lock` for the duration of a flush and yields
+        True, or yields False at once if another process holds it. Without fcntl
+        (Windows) or for an in-memory queue nothing is locked and it yields None.
+        """
+        if fcntl is None or self.path == ":memory:":
+            yield None
+            return
+        with open(self.path + ".lock", "a") as f:
+            try:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def recover(self, older_than: float = 0) -> int:
+        """
+        Returns orders left FLUSHING by a process that stopped mid-flush to PENDING,
+        if they were claimed more than `older_than` seconds ago. Only call it while no
+        other flusher can be running (`flush_lock`). The orders are flushed again, so
+        one whose write reached the database just before the crash can be created twice.
+        """
+        now = datetime.datetime.now(datetime.timezone.utc)
+        stale_before = (now - datetime.timedelta(seconds=older_than)).isoformat(timespec="seconds")
+        with self._lock:
+            cur = self.conn.execute(
+                "UPDATE queued_orders SET status = 'PENDING', last_error = 'interrupted flush', updated_at = ? "
+                "WHERE status = 'FLUSHING' AND updated_at <= ?", (now.isoformat(timespec="seconds"), stale_before))
+        return cur.rowcount
+
+    def list(self, status: Optional[str] = None, limit: int = 100) -> List[Dict]:
+        with self._lock:
+            if status:
+                rows = self.conn.execute("SELECT * FROM queued_orders WHERE status = ? ORDER BY queue_id LIMIT ?",
+                                         (status, limit)).fetchall()
+            else:
+                rows = self.conn.execute("SELECT * FROM queued_orders ORDER BY queue_id LIMIT ?", (limit,)).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def stats(self) -> Dict:
+        """Counts per status, plus the oldest pending order and the last flush error."""
+        with self._lock:
+            counts = dict(self.conn.execute("SELECT status, COUNT(*) FROM queued_orders GROUP BY status").fetchall())
+            oldest = self.conn.execute(
+                "SELECT queue_id, created_at, attempts, last_error FROM queued_orders "
+                "WHERE status = 'PENDING' ORDER BY queue_id LIMIT 1").fetchone()
+        return {
+            "counts": {status: counts.get(status, 0) for status in STATUSES},
+            "oldest_pending": dict(oldest) if oldest else None,
+        }
+
+    def purge(self, before: str) -> int:
+        """Deletes ACCEPTED orders last updated before the given ISO timestamp."""
+        with self._lock:
+            cur = self.conn.execute("DELETE FROM queued_orders WHERE status = 'ACCEPTED' AND updated_at < ?", (before,))
+        return cur.rowcount
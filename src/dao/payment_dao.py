@@ -1,13 +1,14 @@
 # src/dao/payment_dao.py
-from typing import Dict, Optional
-from supabase import Client
+from typing import Dict, List, Optional, TYPE_CHECKING
 import datetime
+if TYPE_CHECKING:
+    from supabase import Client
 
 class PaymentDAO:
     """
     Data Access Object for handling payment-related database operations.
     """
-    def __init__(self, db_client: Client):
+    def __init__(self, db_client: "Client"):
         self.db = db_client
         self.table = "payments"
 
@@ -17,11 +18,51 @@ class PaymentDAO:
         resp = self.db.table(self.table).insert(payload).execute()
         return resp.data[0] if resp.data else None
 
+    def create_payments(self, rows: List[Dict]) -> List[Dict]:
+        """Inserts many payment records (order_id, amount, optional status) with one multi-row insert."""
+        if not rows:
+            return []
+        payload = [{"order_id": row["order_id"], "amount": row["amount"], "status": row.get("status", "PENDING")}
+                   for row in rows]
+        resp = self.db.table(self.table).insert(payload).execute()
+        return resp.data or []
+
     def get_payment_by_order_id(self, order_id: int) -> Optional[Dict]:
         """Retrieves a payment record by its associated order_id."""
         resp = self.db.table(self.table).select("*").eq("order_id", order_id).limit(1).execute()
         return resp.data[0] if resp.data else None
 
+    def get_payments_by_order_ids(self, order_ids: List[int]) -> List[Dict]:
+        """Fetches the payments for any of the given orders in a single round trip."""
+        unique_ids = list(dict.fromkeys(order_ids))
+        if not unique_ids:
+            return []
+        resp = self.db.table(self.table).select("*").in_("order_id", unique_ids).execute()
+        return resp.data or []
+
+    def mark_payments_paid(self, order_ids: List[int], method: str) -> List[Dict]:
+        """
+        Marks the PENDING payments of the given orders as PAID with one update and returns
+        the rows that changed. Payments settled or refunded in the meantime are left alone.
+        """
+        if not order_ids:
+            return []
+        updates = {"status": "PAID", "method": method, "paid_at": datetime.datetime.now().isoformat()}
+        resp = (self.db.table(self.table).update(updates)
+                .in_("order_id", list(order_ids)).eq("status", "PENDING").execute())
+        return resp.data or []
+
+    def mark_payments_refunded(self, order_ids: List[int], from_status: str = "PENDING") -> List[Dict]:
+        """
+        Marks the payments of the given orders that are still in `from_status` as REFUNDED
+        with one update and returns the changed rows.
+        """
+        if not order_ids:
+            return []
+        resp = (self.db.table(self.table).update({"status": "REFUNDED"})
+                .in_("order_id", list(order_ids)).eq("status", from_status).execute())
+        return resp.data or []
+
     def update_payment_by_order_id(self, order_id: int, updates: Dict) -> Optional[Dict]:
         """
         Updates a payment record using the order_id.
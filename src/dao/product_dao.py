@@ -109,22 +109,25 @@ class ProductDAO:
 '''
 
 # src/dao/product_dao.py
-from typing import Optional, List, Dict
-from supabase import Client
+from typing import Optional, List, Dict, Iterator, TYPE_CHECKING
+if TYPE_CHECKING:
+    from supabase import Client
 
 class ProductDAO:
     """
     Data Access Object for handling product-related database operations.
     """
-    def __init__(self, db_client: Client):
+    def __init__(self, db_client: "Client"):
         self.db = db_client
         self.table = "products"
 
     def create_product(self, name: str, sku: str, price: float, stock: int = 0, category: Optional[str] = None) -> Optional[Dict]:
         payload = {"name": name, "sku": sku, "price": price, "stock": stock, "category": category}
-        self.db.table(self.table).insert(payload).execute()
-        resp = self.db.table(self.table).select("*").eq("sku", sku).limit(1).execute()
-        return resp.data[0] if resp.data else None
+        resp = self.db.table(self.table).insert(payload).execute()
+        if resp.data:
+            return resp.data[0]
+        # Fall back to a re-select when the insert returns no representation
+        return self.get_product_by_sku(sku)
 
     def get_product_by_id(self, prod_id: int) -> Optional[Dict]:
         resp = self.db.table(self.table).select("*").eq("prod_id", prod_id).limit(1).execute()
@@ -135,9 +138,100 @@ class ProductDAO:
         return resp.data[0] if resp.data else None
 
     def update_product(self, prod_id: int, fields: Dict) -> Optional[Dict]:
-        self.db.table(self.table).update(fields).eq("prod_id", prod_id).execute()
+        resp = self.db.table(self.table).update(fields).eq("prod_id", prod_id).execute()
+        if resp.data:
+            return resp.data[0]
         return self.get_product_by_id(prod_id)
 
     def list_products(self, limit: int = 100) -> List[Dict]:
         resp = self.db.table(self.table).select("*").order("prod_id", desc=False).limit(limit).execute()
-        return resp.data or []
\ No newline at end of file
+        return resp.data or []
+
+    def iter_products(self, page_size: int = 1000, category: Optional[str] = None) -> Iterator[Dict]:
+        """
+        Yields every product in prod_id order, fetching `page_size` rows per request.
+        Pages continue from the last prod_id seen (keyset), so late pages cost the same as early ones.
+        """
+        if page_size < 1:
+            raise ValueError("page_size must be at least 1.")
+        last_id = None
+        while True:
+            query = self.db.table(self.table).select("*")
+            if category:
+                query = query.eq("category", category)
+            if last_id is not None:
+                query = query.gt("prod_id", last_id)
+            rows = query.order("prod_id").limit(page_size).execute().data or []
+            if not rows:
+                return
+            yield from rows
+            last_id = rows[-1]["prod_id"]
+
+    def iter_low_stock(self, threshold: int, page_size: int = 1000, category: Optional[str] = None) -> Iterator[Dict]:
+        """Yields products with stock <= threshold in prod_id order, filtered on the server and paged by keyset."""
+        if page_size < 1:
+            raise ValueError("page_size must be at least 1.")
+        last_id = None
+        while True:
+            query = self.db.table(self.table).select("*").lte("stock", threshold)
+            if category:
+                query = query.eq("category", category)
+            if last_id is not None:
+                query = query.gt("prod_id", last_id)
+            rows = query.order("prod_id").limit(page_size).execute().data or []
+            if not rows:
+                return
+            yield from rows
+            last_id = rows[-1]["prod_id"]
+
+    def get_products_by_ids(self, prod_ids: List[int]) -> List[Dict]:
+        """Fetches several products in a single round trip using an IN filter."""
+        ids = list(dict.fromkeys(prod_ids))
+        if not ids:
+            return []
+        resp = self.db.table(self.table).select("*").in_("prod_id", ids).execute()
+        return resp.data or []
+
+    def get_products_by_skus(self, skus: List[str]) -> List[Dict]:
+        """Fetches the products matching any of the given SKUs in a single round trip."""
+        unique_skus = list(dict.fromkeys(skus))
+        if not unique_skus:
+            return []
+        resp = self.db.table(self.table).select("*").in_("sku", unique_skus).execute()
+        return resp.data or []
+
+    def create_products(self, rows: List[Dict]) -> List[Dict]:
+        """Inserts many products with one multi-row insert and returns the inserted rows."""
+        if not rows:
+            return []
+        resp = self.db.table(self.table).insert(rows).execute()
+        return resp.data or []
+
+    def reserve_stock(self, items: List[Dict]) -> List[Dict]:
+        """
+        Atomically decrements stock for every {prod_id, quantity} line via the `reserve_stock` RPC.
+        The reservation is all-or-nothing: if any line is short, no stock is touched.
+        Lines may carry a `reservation` reference; only LedgerProductDAO records it.
+        Returns the failed lines as {prod_id, requested, available}; an empty list means success.
+        """
+        if not items:
+            return []
+        payload = [{"prod_id": item["prod_id"], "quantity": item["quantity"]} for item in items]
+        resp = self.db.rpc("reserve_stock", {"items": payload}).execute()
+        return resp.data or []
+
+    def release_stock(self, items: List[Dict], reason: str = "cancel") -> List[Dict]:
+        """
+        Atomically adds stock back for every {prod_id, quantity} line via the `release_stock` RPC.
+        `reason` (cancel, restock) is only recorded by LedgerProductDAO.
+        Returns the lines whose product no longer exists.
+        """
+        if not items:
+            return []
+        payload = [{"prod_id": item["prod_id"], "quantity": item["quantity"]} for item in items]
+        resp = self.db.rpc("release_stock", {"items": payload}).execute()
+        return resp.data or []
+
+    def link_reservations(self, order_ids: Dict[str, int]) -> None:
+        """Ties {reservation: order_id} to the orders they were taken for; only LedgerProductDAO records it."""
+        pass
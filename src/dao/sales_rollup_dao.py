@@ -0,0 +1,70 @@
+# src/dao/sales_rollup_dao.py
+import datetime
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS daily_sales (
+    source TEXT NOT NULL,
+    day TEXT NOT NULL,
+    total_revenue REAL NOT NULL,
+    total_orders INTEGER NOT NULL,
+    refreshed_at TEXT NOT NULL,
+    PRIMARY KEY (source, day)
+)
+"""
+
+
+class SalesRollupDAO:
+    """
+    Local SQLite store of per-day sales aggregates (revenue, order count).
+    Rows are keyed by `source` so rollups from different databases never mix.
+    """
+    def __init__(self, path: str = "rollups.db", source: str = "default"):
+        self.path = path
+        self.source = source
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(SCHEMA)
+
+    def get_days(self, start_date: str, end_date: str) -> Dict[str, Dict]:
+        """Returns the stored days between the two dates (inclusive), keyed by ISO date."""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT day, total_revenue, total_orders FROM daily_sales "
+                "WHERE source = ? AND day BETWEEN ? AND ?", (self.source, start_date, end_date)).fetchall()
+        return {day: {"day": day, "total_revenue": revenue, "total_orders": orders} for day, revenue, orders in rows}
+
+    def save_days(self, rows: List[Dict]) -> None:
+        """Inserts or replaces one aggregate per day in a single transaction."""
+        if not rows:
+            return
+        now = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")
+        with self._lock:
+            self.conn.execute("BEGIN")
+            try:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO daily_sales (source, day, total_revenue, total_orders, refreshed_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [(self.source, r["day"], r["total_revenue"], r["total_orders"], now) for r in rows])
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+    def delete_days(self, start_date: Optional[str] = None, end_date: Optional[str] = None) -> int:
+        """Removes stored days in the range (all of them when no bounds are given)."""
+        with self._lock:
+            cur = self.conn.execute(
+                "DELETE FROM daily_sales WHERE source = ? AND day >= ? AND day <= ?",
+                (self.source, start_date or "0000-01-01", end_date or "9999-12-31"))
+        return cur.rowcount
+
+    def get_stored_range(self) -> Optional[Dict]:
+        """Returns the first and last stored day, or None when nothing is stored."""
+        with self._lock:
+            first, last = self.conn.execute(
+                "SELECT MIN(day), MAX(day) FROM daily_sales WHERE source = ?", (self.source,)).fetchone()
+        return {"start_date": first, "end_date": last} if first else None
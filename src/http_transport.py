@@ -0,0 +1,176 @@
+# src/http_transport.py
+"""
+Pooled HTTP transport for the supabase client.
+
+One httpx client per process, with bounded connection pools, keep-alive, optional
+HTTP/2, per-phase timeouts and retries. Only idempotent requests are retried (reads
+and deletes; RPCs and inserts are POSTs and never are), on 502/503/504 and on
+connection failures, with full-jitter exponential backoff.
+"""
+import asyncio
+import random
+import threading
+import time
+from typing import Dict, Optional
+
+import httpx
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+RETRY_STATUSES = frozenset({502, 503, 504})
+RETRY_EXCEPTIONS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError, httpx.PoolTimeout)
+
+
+def http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class RetryPolicy:
+    """Decides whether and when to retry. Shared by the sync and async transports."""
+    def __init__(self, retries: int = 3, backoff: float = 0.2, backoff_max: float = 5.0):
+        self.retries = retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+
+    def retryable(self, request: httpx.Request, attempt: int) -> bool:
+        return attempt < self.retries and request.method in IDEMPOTENT_METHODS
+
+    def delay(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        # Honour a numeric Retry-After from the server, within the same cap
+        if response is not None:
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                return min(float(retry_after), self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff * (2 ** attempt)))
+
+
+class TransportStats:
+    """Thread-safe request/retry counters plus a view of the connection pool."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.in_flight = 0
+        self.retries = 0
+        self.failures = 0
+
+    def incr(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + n)
+
+    def to_dict(self, pool=None) -> Dict:
+        stats = {"requests": self.requests, "in_flight": self.in_flight,
+                 "retries": self.retries, "failures": self.failures}
+        # httpcore keeps its connections on the pool; not part of httpx's public API
+        connections = getattr(pool, "connections", None)
+        if connections is not None:
+            stats["connections"] = len(connections)
+            stats["idle_connections"] = sum(1 for c in connections if c.is_idle())
+            stats["http2_connections"] = sum(1 for c in connections if "HTTP/2" in c.info())
+        return stats
+
+
+class RetryTransport(httpx.BaseTransport):
+    """httpx transport that retries idempotent requests on transient failures."""
+    def __init__(self, transport: httpx.HTTPTransport, policy: RetryPolicy):
+        self._transport = transport
+        self.policy = policy
+        self.stats = TransportStats()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        self.stats.incr("requests")
+        self.stats.incr("in_flight")
+        try:
+            attempt = 0
+            while True:
+                try:
+                    response = self._transport.handle_request(request)
+                except RETRY_EXCEPTIONS:
+                    if not self.policy.retryable(request, attempt):
+                        self.stats.incr("failures")
+                        raise
+                    time.sleep(self.policy.delay(attempt))
+                else:
+                    if response.status_code not in RETRY_STATUSES or not self.policy.retryable(request, attempt):
+                        return response
+                    delay = self.policy.delay(attempt, response)
+                    response.close()
+                    time.sleep(delay)
+                attempt += 1
+                self.stats.incr("retries")
+        finally:
+            self.stats.incr("in_flight", -1)
+
+    def pool_stats(self) -> Dict:
+        return self.stats.to_dict(getattr(self._transport, "_pool", None))
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class AsyncRetryTransport(httpx.AsyncBaseTransport):
+    """Asyncio counterpart of RetryTransport."""
+    def __init__(self, transport: httpx.AsyncHTTPTransport, policy: RetryPolicy):
+        self._transport = transport
+        self.policy = policy
+        self.stats = TransportStats()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.stats.incr("requests")
+        self.stats.incr("in_flight")
+        try:
+            attempt = 0
+            while True:
+                try:
+                    response = await self._transport.handle_async_request(request)
+                except RETRY_EXCEPTIONS:
+                    if not self.policy.retryable(request, attempt):
+                        self.stats.incr("failures")
+                        raise
+                    await asyncio.sleep(self.policy.delay(attempt))
+                else:
+                    if response.status_code not in RETRY_STATUSES or not self.policy.retryable(request, attempt):
+                        return response
+                    delay = self.policy.delay(attempt, response)
+                    await response.aclose()
+                    await asyncio.sleep(delay)
+                attempt += 1
+                self.stats.incr("retries")
+        finally:
+            self.stats.incr("in_flight", -1)
+
+    def pool_stats(self) -> Dict:
+        return self.stats.to_dict(getattr(self._transport, "_pool", None))
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def _limits(settings: Dict) -> httpx.Limits:
+    return httpx.Limits(max_connections=settings["max_connections"],
+                        max_keepalive_connections=settings["max_keepalive"],
+                        keepalive_expiry=settings["keepalive_expiry"])
+
+
+def _timeout(settings: Dict) -> httpx.Timeout:
+    return httpx.Timeout(connect=settings["connect_timeout"], read=settings["read_timeout"],
+                         write=settings["read_timeout"], pool=settings["pool_timeout"])
+
+
+def _policy(settings: Dict) -> RetryPolicy:
+    return RetryPolicy(settings["retries"], settings["backoff"], settings["backoff_max"])
+
+
+def build_http_client(settings: Dict) -> httpx.Client:
+    """Builds the pooled client from `AppConfig.http_settings`."""
+    http2 = settings["http2"] and http2_available()
+    transport = RetryTransport(httpx.HTTPTransport(http2=http2, limits=_limits(settings)), _policy(settings))
+    return httpx.Client(transport=transport, timeout=_timeout(settings))
+
+
+def build_async_http_client(settings: Dict) -> httpx.AsyncClient:
+    http2 = settings["http2"] and http2_available()
+    transport = AsyncRetryTransport(httpx.AsyncHTTPTransport(http2=http2, limits=_limits(settings)), _policy(settings))
+    return httpx.AsyncClient(transport=transport, timeout=_timeout(settings))
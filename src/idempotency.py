@@ -0,0 +1,201 @@
+# src/idempotency.py
+"""
+Idempotency keys for operations that clients may retry.
+
+The first request with a key runs and its result is stored. A repeat with the same
+key and the same arguments gets the stored result back without running again; a
+repeat with different arguments is refused. While a request runs, its key holds an
+in-progress claim with a lease, so a second process retrying early is told to wait
+instead of running the operation twice.
+
+A request that fails with one of the caller's domain errors (nothing was written) is
+forgotten and can be retried at once. Any other failure, such as a timeout, may have
+happened after the database committed, so the claim is kept until its lease expires.
+The operation that runs after that must detect its own earlier attempt, e.g. through
+the key stored on the order row.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple, Type
+from src.cache import TTLCache
+
+IN_PROGRESS = "IN_PROGRESS"
+COMPLETED = "COMPLETED"
+# Striped locks that serialise requests for the same key within one process
+LOCK_STRIPES = 64
+
+
+class IdempotencyError(Exception):
+    pass
+
+
+def fingerprint(payload: Any) -> str:
+    """Stable hash of a request's arguments."""
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class MemoryIdempotencyStore:
+    """Keys held in a bounded, expiring `TTLCache`; only survives as long as the process."""
+    def __init__(self, maxsize: int = 10000, ttl: float = 86400):
+        self.cache = TTLCache(maxsize, ttl)
+        self._lock = threading.Lock()
+
+    def claim(self, key: str, fp: str, lease: float) -> Optional[Dict]:
+        """Returns the live record for `key`, or records an in-progress claim and returns None."""
+        with self._lock:
+            record = self.cache.get(key)
+            if record is not None and not (record["state"] == IN_PROGRESS and record["lease_until"] <= time.time()):
+                return record
+            self.cache.set(key, {"state": IN_PROGRESS, "fingerprint": fp, "lease_until": time.time() + lease})
+            return None
+
+    def complete(self, key: str, fp: str, result: Any) -> None:
+        self.cache.set(key, {"state": COMPLETED, "fingerprint": fp, "result": result})
+
+    def release(self, key: str) -> None:
+        self.cache.pop(key)
+
+    def stats(self) -> Dict:
+        return self.cache.stats()
+
+
+class SQLiteIdempotencyStore:
+    """
+    Keys in a local SQLite file, shared by every process on the host, so a retry from
+    a new CLI invocation still finds the first result. Rows expire after `ttl` seconds
+    and the table is trimmed to `maxsize` rows, oldest first. The file (and its
+    directory) is only created by the first keyed request.
+    """
+    # Expired and excess rows are pruned every this many completed requests
+    PRUNE_EVERY = 100
+
+    def __init__(self, path: str = "idempotency.db", maxsize: int = 10000, ttl: float = 86400):
+        self.path = path
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        # Callers hold self._lock, so the connection is opened once
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS idempotency_keys ("
+                "key TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, state TEXT NOT NULL, result TEXT, "
+                "created_at REAL NOT NULL, expires_at REAL NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_idempotency_expires ON idempotency_keys (expires_at)")
+            self._conn = conn
+        return self._conn
+
+    def claim(self, key: str, fp: str, lease: float) -> Optional[Dict]:
+        """Returns the live record for `key`, or records an in-progress claim and returns None."""
+        now = time.time()
+        with self._lock:
+            # IMMEDIATE takes the write lock up front, so two processes cannot both claim
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.conn.execute("DELETE FROM idempotency_keys WHERE key = ? AND expires_at <= ?", (key, now))
+                row = self.conn.execute("SELECT * FROM idempotency_keys WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    self.conn.execute(
+                        "INSERT INTO idempotency_keys (key, fingerprint, state, created_at, expires_at) "
+                        "VALUES (?, ?, ?, ?, ?)", (key, fp, IN_PROGRESS, now, now + lease))
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+        if row is None:
+            return None
+        record = {"state": row["state"], "fingerprint": row["fingerprint"]}
+        if row["state"] == COMPLETED:
+            record["result"] = json.loads(row["result"])
+        return record
+
+    def complete(self, key: str, fp: str, result: Any) -> None:
+        now = time.time()
+        with self._lock:
+            self.conn.execute(
+                "UPDATE idempotency_keys SET state = ?, result = ?, expires_at = ? WHERE key = ? AND fingerprint = ?",
+                (COMPLETED, json.dumps(result, default=str), now + self.ttl, key, fp))
+            self._writes += 1
+            if self._writes % self.PRUNE_EVERY == 0:
+                self._prune(now)
+
+    def release(self, key: str) -> None:
+        with self._lock:
+            self.conn.execute("DELETE FROM idempotency_keys WHERE key = ? AND state = ?", (key, IN_PROGRESS))
+
+    def _prune(self, now: float) -> None:
+        self.conn.execute("DELETE FROM idempotency_keys WHERE expires_at <= ?", (now,))
+        self.conn.execute(
+            "DELETE FROM idempotency_keys WHERE key IN (SELECT key FROM idempotency_keys "
+            "ORDER BY created_at DESC LIMIT -1 OFFSET ?)", (self.maxsize,))
+
+    def stats(self) -> Dict:
+        if self._conn is None and not os.path.exists(self.path):
+            return {"path": self.path, "maxsize": self.maxsize, "ttl": self.ttl, "completed": 0, "in_progress": 0}
+        with self._lock:
+            counts = dict(self.conn.execute(
+                "SELECT state, COUNT(*) FROM idempotency_keys WHERE expires_at > ? GROUP BY state",
+                (time.time(),)).fetchall())
+        return {"path": self.path, "maxsize": self.maxsize, "ttl": self.ttl,
+                "completed": counts.get(COMPLETED, 0), "in_progress": counts.get(IN_PROGRESS, 0)}
+
+
+class IdempotencyGuard:
+    """
+    Runs operations at most once per key. Keys are namespaced by `scope` (the
+    operation name), so the same client key can be used for an order and its payment.
+    Results must be JSON-serialisable to be kept in the SQLite store.
+    """
+    def __init__(self, store=None, lease: float = 60):
+        self.store = store if store is not None else MemoryIdempotencyStore()
+        self.lease = lease
+        self._stripes = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        self.executed = 0
+        self.replayed = 0
+
+    def run(self, scope: str, key: Optional[str], payload: Any, fn: Callable[[], Any],
+            release_on: Tuple[Type[BaseException], ...] = ()) -> Any:
+        """
+        Calls `fn` once for (`scope`, `key`) and returns its result; without a key it just
+        calls `fn`. `release_on` lists the exceptions that prove nothing was written.
+        """
+        if not key:
+            return fn()
+        full_key = f"{scope}:{key}"
+        fp = fingerprint(payload)
+        with self._stripes[hash(full_key) % LOCK_STRIPES]:
+            record = self.store.claim(full_key, fp, self.lease)
+            if record is not None:
+                if record["fingerprint"] != fp:
+                    raise IdempotencyError(f"Idempotency key '{key}' was already used for a different {scope} request.")
+                if record["state"] == IN_PROGRESS:
+                    raise IdempotencyError(f"A {scope} request with idempotency key '{key}' is still running "
+                                           f"or its outcome is unknown; retry in a minute.")
+                self.replayed += 1
+                return record["result"]
+            try:
+                result = fn()
+            except release_on:
+                # Nothing was written, so the client can retry straight away
+                self.store.release(full_key)
+                raise
+            self.store.complete(full_key, fp, result)
+            self.executed += 1
+            return result
+
+    def stats(self) -> Dict:
+        return {"executed": self.executed, "replayed": self.replayed, "store": self.store.stats()}
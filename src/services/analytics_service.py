@@ -0,0 +1,180 @@
+# src/services/analytics_service.py
+"""
+Columnar sales analytics.
+
+Orders and their line items are streamed a page at a time into flat typed buffers
+(one per column). Nothing is kept per row beyond those buffers. Product and customer
+attributes are fetched once per distinct ID and mapped onto the lines with NumPy
+indexing. Group-bys run on integer codes with `np.unique` and `np.bincount`.
+"""
+import csv
+import datetime
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple
+from src.batching import chunked
+from src.dao.customer_dao import CustomerDAO
+from src.dao.order_dao import OrderDAO
+from src.dao.product_dao import ProductDAO
+
+try:
+    import numpy as np
+except ImportError:  # optional: only the breakdown reports need it
+    np = None
+
+DIMENSIONS = ("product", "category", "city", "day")
+# IDs per `in` lookup when resolving product and customer attributes
+LOOKUP_CHUNK = 500
+
+
+class AnalyticsError(Exception):
+    pass
+
+
+class SalesColumns:
+    """One array per column, one entry per order line."""
+    def __init__(self, order_id, cust_id, prod_id, day, quantity, revenue, days: List[str]):
+        self.order_id = order_id
+        self.cust_id = cust_id
+        self.prod_id = prod_id
+        self.day = day          # index into `days`
+        self.quantity = quantity
+        self.revenue = revenue
+        self.days = days
+
+    def __len__(self) -> int:
+        return len(self.order_id)
+
+
+class SalesAnalyticsService:
+    """Revenue, units and order counts grouped by any mix of product, category, city and day."""
+    def __init__(self, order_dao: OrderDAO, product_dao: ProductDAO, customer_dao: CustomerDAO):
+        self.order_dao = order_dao
+        self.product_dao = product_dao
+        self.customer_dao = customer_dao
+
+    def load(self, start_date: str, end_date: str, status: Optional[str] = "COMPLETED",
+             page_size: int = 1000) -> SalesColumns:
+        """Streams the matching order lines into columns, one page of orders per request."""
+        _require_numpy()
+        order_id, cust_id, prod_id = array("q"), array("q"), array("q")
+        day, quantity, revenue = array("q"), array("q"), array("d")
+        day_codes: Dict[str, int] = {}
+        for order in self.order_dao.iter_orders_with_items(start_date, end_date, status, page_size):
+            items = order.get("order_items") or []
+            if not items:
+                continue
+            code = day_codes.setdefault(str(order["order_date"])[:10], len(day_codes))
+            n = len(items)
+            order_id.extend([order["order_id"]] * n)
+            cust_id.extend([order["cust_id"]] * n)
+            day.extend([code] * n)
+            for item in items:
+                prod_id.append(item["prod_id"])
+                quantity.append(item["quantity"])
+                revenue.append((item["price"] or 0) * item["quantity"])
+        return SalesColumns(np.frombuffer(order_id, dtype=np.int64), np.frombuffer(cust_id, dtype=np.int64),
+                            np.frombuffer(prod_id, dtype=np.int64), np.frombuffer(day, dtype=np.int64),
+                            np.frombuffer(quantity, dtype=np.int64), np.frombuffer(revenue, dtype=np.float64),
+                            list(day_codes))
+
+    def breakdown(self, start_date: str, end_date: str, by: Sequence[str],
+                  status: Optional[str] = "COMPLETED", page_size: int = 1000) -> List[Dict]:
+        """
+        Returns one row per group with `revenue`, `units` and `orders` (distinct orders
+        with at least one line in the group), highest revenue first.
+        """
+        by = self._parse_dimensions(by)
+        try:
+            datetime.date.fromisoformat(start_date)
+            datetime.date.fromisoformat(end_date)
+        except ValueError as e:
+            raise AnalyticsError(f"Invalid date: {e}") from e
+        return self.aggregate(self.load(start_date, end_date, status, page_size), by)
+
+    def aggregate(self, columns: SalesColumns, by: Sequence[str]) -> List[Dict]:
+        """Groups already loaded columns; lets one load serve several breakdowns."""
+        _require_numpy()
+        if not len(columns):
+            return []
+        rows_by_id: Dict[str, Dict[int, Dict]] = {}
+        codes, labels = zip(*(self._encode(columns, dimension, rows_by_id) for dimension in by))
+        sizes = tuple(len(dimension_labels) for dimension_labels in labels)
+        key = np.ravel_multi_index(codes, sizes)
+        groups, group_of_line = np.unique(key, return_inverse=True)
+        revenue = np.bincount(group_of_line, weights=columns.revenue, minlength=len(groups))
+        units = np.bincount(group_of_line, weights=columns.quantity, minlength=len(groups))
+        # Distinct (group, order) pairs, then pairs per group
+        order_codes, order_of_line = np.unique(columns.order_id, return_inverse=True)
+        pairs = np.unique(group_of_line.astype(np.int64) * len(order_codes) + order_of_line)
+        orders = np.bincount(pairs // len(order_codes), minlength=len(groups))
+
+        group_codes = np.unravel_index(groups, sizes)
+        rows = []
+        for g in np.argsort(-revenue, kind="stable"):
+            row: Dict = {}
+            for dimension_codes, dimension_labels in zip(group_codes, labels):
+                row.update(dimension_labels[dimension_codes[g]])
+            row.update(revenue=round(float(revenue[g]), 2), units=int(units[g]), orders=int(orders[g]))
+            rows.append(row)
+        return rows
+
+    @staticmethod
+    def _parse_dimensions(by: Sequence[str]) -> List[str]:
+        dimensions = [d.strip().lower() for d in by if d.strip()]
+        unknown = [d for d in dimensions if d not in DIMENSIONS]
+        if unknown or not dimensions:
+            raise AnalyticsError(f"Group by one or more of: {', '.join(DIMENSIONS)} (got '{', '.join(by)}').")
+        if len(set(dimensions)) != len(dimensions):
+            raise AnalyticsError("Each dimension can only be used once.")
+        return dimensions
+
+    def _encode(self, columns: SalesColumns, dimension: str,
+                rows_by_id: Dict[str, Dict[int, Dict]]) -> Tuple["np.ndarray", List[Dict]]:
+        """Integer code per line for one dimension, plus the output fields for each code."""
+        if dimension == "day":
+            return columns.day, [{"day": day} for day in columns.days]
+        if dimension == "city":
+            ids, per_line = np.unique(columns.cust_id, return_inverse=True)
+            customers = self._rows(rows_by_id, "customers", ids)
+            attribute = {cust_id: c.get("city") for cust_id, c in customers.items()}
+        else:
+            ids, per_line = np.unique(columns.prod_id, return_inverse=True)
+            products = self._rows(rows_by_id, "products", ids)
+            if dimension == "product":
+                return per_line, [{"prod_id": pid, "sku": products.get(pid, {}).get("sku"),
+                                   "product": products.get(pid, {}).get("name")} for pid in ids.tolist()]
+            attribute = {prod_id: p.get("category") for prod_id, p in products.items()}
+        # Distinct IDs -> distinct values, then broadcast back onto the lines
+        values: Dict[Optional[str], int] = {}
+        value_of_id = np.array([values.setdefault(attribute.get(i), len(values)) for i in ids.tolist()], dtype=np.int64)
+        return value_of_id[per_line], [{dimension: value} for value in values]
+
+    def _rows(self, rows_by_id: Dict[str, Dict[int, Dict]], table: str, ids: "np.ndarray") -> Dict[int, Dict]:
+        """Product or customer rows by ID, fetched once per aggregation in chunks of LOOKUP_CHUNK."""
+        if table not in rows_by_id:
+            lookup, key = ((self.product_dao.get_products_by_ids, "prod_id") if table == "products"
+                           else (self.customer_dao.get_customers_by_ids, "cust_id"))
+            rows_by_id[table] = {row[key]: row for chunk in chunked(ids.tolist(), LOOKUP_CHUNK) for row in lookup(chunk)}
+        return rows_by_id[table]
+
+
+def export_rows(rows: List[Dict], path: str) -> None:
+    """Writes rows to `path` as CSV, or as Parquet for a `.parquet` path (needs pyarrow)."""
+    if path.lower().endswith(".parquet"):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise AnalyticsError("Parquet export needs pyarrow (pip install pyarrow).")
+        pq.write_table(pa.Table.from_pylist(rows), path)
+        return
+    fields = list(dict.fromkeys(field for row in rows for field in row))
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise AnalyticsError("Sales breakdowns need numpy (pip install numpy).")
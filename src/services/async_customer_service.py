@@ -0,0 +1,49 @@
+# src/services/async_customer_service.py
+import asyncio
+from typing import Optional, List, Dict
+from src.dao.async_customer_dao import AsyncCustomerDAO
+from src.dao.async_order_dao import AsyncOrderDAO
+from src.services.customer_service import CustomerError
+
+class AsyncCustomerService:
+    """
+    Asyncio version of CustomerService.
+    """
+    def __init__(self, customer_dao: AsyncCustomerDAO, order_dao: AsyncOrderDAO):
+        self.customer_dao = customer_dao
+        self.order_dao = order_dao
+
+    async def add_customer(self, name: str, email: str, phone: str, city: Optional[str]) -> Dict:
+        if await self.customer_dao.get_customer_by_email(email):
+            raise CustomerError(f"A customer with email '{email}' already exists.")
+        return await self.customer_dao.create_customer(name, email, phone, city)
+
+    async def update_customer_details(self, cust_id: int, phone: Optional[str] = None, city: Optional[str] = None) -> Dict:
+        if not phone and not city:
+            raise CustomerError("No update information provided. Please supply a phone or city.")
+        if not await self.customer_dao.get_customer_by_id(cust_id):
+            raise CustomerError(f"Customer with ID {cust_id} not found.")
+        fields_to_update = {k: v for k, v in {"phone": phone, "city": city}.items() if v is not None}
+        return await self.customer_dao.update_customer(cust_id, fields_to_update)
+
+    async def delete_customer(self, cust_id: int) -> Dict:
+        customer, orders = await asyncio.gather(
+            self.customer_dao.get_customer_by_id(cust_id),
+            self.order_dao.list_orders_by_customer(cust_id),
+        )
+        if not customer:
+            raise CustomerError(f"Customer with ID {cust_id} not found.")
+        if orders:
+            raise CustomerError(f"Cannot delete customer {cust_id}. They have {len(orders)} existing order(s).")
+        return await self.customer_dao.delete_customer(cust_id)
+
+    async def list_all_customers(self) -> List[Dict]:
+        return await self.customer_dao.list_customers()
+
+    async def find_customer(self, email: Optional[str] = None, city: Optional[str] = None) -> List[Dict]:
+        if not email and not city:
+            raise CustomerError("Please provide an email or a city to search by.")
+        if email:
+            customer = await self.customer_dao.get_customer_by_email(email)
+            return [customer] if customer else []
+        return await self.customer_dao.search_customers_by_city(city)
@@ -0,0 +1,108 @@
+# src/services/async_order_service.py
+import asyncio
+from typing import List, Dict
+from src.dao.async_order_dao import AsyncOrderDAO
+from src.dao.async_product_dao import AsyncProductDAO
+from src.dao.async_customer_dao import AsyncCustomerDAO
+from src.dao.async_payment_dao import AsyncPaymentDAO
+from src.services.order_service import OrderError, OrderService
+
+class AsyncOrderService:
+    """
+    Asyncio version of OrderService. Lookups that do not depend on each other
+    are issued concurrently, so one event loop can keep many orders in flight.
+    """
+    def __init__(self, order_dao: AsyncOrderDAO, product_dao: AsyncProductDAO,
+                 customer_dao: AsyncCustomerDAO, payment_dao: AsyncPaymentDAO):
+        self.order_dao = order_dao
+        self.product_dao = product_dao
+        self.customer_dao = customer_dao
+        self.payment_dao = payment_dao
+
+    async def create_order(self, cust_id: int, items: List[Dict]) -> Dict:
+        requested: Dict[int, int] = {}
+        for item in items:
+            requested[item["prod_id"]] = requested.get(item["prod_id"], 0) + item["quantity"]
+
+        customer, product_rows = await asyncio.gather(
+            self.customer_dao.get_customer_by_id(cust_id),
+            self.product_dao.get_products_by_ids(list(requested)),
+        )
+        if not customer:
+            raise OrderError(f"Customer with ID {cust_id} not found.")
+        products = {p["prod_id"]: p for p in product_rows}
+        for prod_id in requested:
+            if prod_id not in products:
+                raise OrderError(f"Product with ID {prod_id} not found.")
+        total_amount = 0
+        for item in items:
+            item_price = products[item["prod_id"]].get("price", 0)
+            total_amount += item_price * item["quantity"]
+            item["price"] = item_price
+
+        reservation = [{"prod_id": prod_id, "quantity": quantity} for prod_id, quantity in requested.items()]
+        failed = await self.product_dao.reserve_stock(reservation)
+        if failed:
+            raise OrderError(OrderService._describe_failed_reservation(failed, products))
+
+        new_order = None
+        try:
+            new_order = await self.order_dao.create_order(cust_id, total_amount)
+            if not new_order:
+                raise OrderError("Failed to create order record.")
+            order_id = new_order["order_id"]
+            await asyncio.gather(
+                self.payment_dao.create_payment(order_id, total_amount),
+                self.order_dao.create_order_items(order_id, items),
+            )
+        except Exception:
+            if new_order:
+                await self._void_order(new_order["order_id"])
+            await self.product_dao.release_stock(reservation)
+            raise
+
+        return await self.get_order_details(order_id)
+
+    async def get_order_details(self, order_id: int) -> Dict:
+        order = await self.order_dao.get_order_with_details(order_id)
+        if not order:
+            raise OrderError(f"Order with ID {order_id} not found.")
+        return order
+
+    async def list_orders_for_customer(self, cust_id: int) -> List[Dict]:
+        customer, orders = await asyncio.gather(
+            self.customer_dao.get_customer_by_id(cust_id),
+            self.order_dao.list_orders_by_customer(cust_id),
+        )
+        if not customer:
+            raise OrderError(f"Customer with ID {cust_id} not found.")
+        return orders
+
+    async def _void_order(self, order_id: int) -> None:
+        """Same as OrderService._void_orders: cancels a half-written order, best effort."""
+        try:
+            await self.payment_dao.mark_payments_refunded([order_id])
+            await self.order_dao.update_order_status(order_id, "CANCELLED")
+        except Exception:
+            pass
+
+    async def cancel_order(self, order_id: int) -> Dict:
+        # Guarded on status = PLACED like OrderService.cancel_order: only the winner releases stock
+        cancelled, items = await asyncio.gather(
+            self.order_dao.update_order_status(order_id, "CANCELLED", from_status="PLACED"),
+            self.order_dao.get_order_items_by_order_id(order_id),
+        )
+        if not cancelled:
+            order = await self.order_dao.get_order_by_id(order_id)
+            if not order:
+                raise OrderError(f"Order with ID {order_id} not found.")
+            raise OrderError(f"Cannot cancel order. Status is '{order['status']}'.")
+
+        await asyncio.gather(
+            self.product_dao.release_stock(items),
+            self.payment_dao.mark_payments_refunded([order_id]),
+        )
+        return cancelled
+
+    async def complete_order(self, order_id: int) -> Dict:
+        return await self.order_dao.update_order_status(order_id, "COMPLETED")
@@ -0,0 +1,37 @@
+# src/services/async_payment_service.py
+from typing import Dict
+from src.dao.async_payment_dao import AsyncPaymentDAO
+from src.dao.async_order_dao import AsyncOrderDAO
+from src.services.payment_service import PaymentError
+
+class AsyncPaymentService:
+    """
+    Asyncio version of PaymentService.
+    """
+    def __init__(self, payment_dao: AsyncPaymentDAO, order_dao: AsyncOrderDAO):
+        self.payment_dao = payment_dao
+        self.order_dao = order_dao
+
+    async def process_payment(self, order_id: int, method: str) -> Dict:
+        """
+        Processes a payment for an order and updates the order status, with the same
+        guards as PaymentService: the payment is marked paid only while PENDING, and the
+        order completed only after that, and only while it is still PLACED.
+        """
+        payment = await self.payment_dao.get_payment_by_order_id(order_id)
+        if not payment:
+            raise PaymentError(f"No pending payment found for order ID {order_id}.")
+        if payment["status"] != "PENDING":
+            raise PaymentError(f"Payment for order ID {order_id} is not pending (status: {payment['status']}).")
+
+        updated = await self.payment_dao.mark_payments_paid([order_id], method)
+        if not updated:
+            raise PaymentError(f"Payment for order ID {order_id} is no longer pending.")
+
+        if not await self.order_dao.update_order_status(order_id, "COMPLETED", from_status="PLACED"):
+            order = await self.order_dao.get_order_by_id(order_id)
+            if order and order["status"] == "CANCELLED":
+                await self.payment_dao.mark_payments_refunded([order_id], from_status="PAID")
+                raise PaymentError(f"Order ID {order_id} was cancelled while it was being paid; "
+                                   f"the payment was refunded.")
+        return updated[0]
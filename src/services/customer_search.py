@@ -0,0 +1,264 @@
+# src/services/customer_search.py
+"""
+In-memory customer search index.
+
+Every customer is broken into tokens: name and city words, the whole email plus its
+words, and the phone digits forwards and reversed (for prefix and suffix matches).
+Only phones are searched by digits; digits inside names and emails are not indexed.
+Tokens live in a sorted list for prefix lookups with `bisect`. Plain words are also
+kept in a trigram index, which narrows fuzzy lookups to a few candidates before
+the edit distance is checked. Fuzzy matching is only tried for terms that match
+nothing by prefix.
+"""
+import bisect
+import heapq
+import re
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from src.dao.customer_dao import CustomerDAO
+
+# Query terms are runs of letters or of digits, so "sharma105" searches "sharma" and "105"
+_WORD = re.compile(r"[^\W\d_]+|\d+")
+_ALPHA = re.compile(r"[^\W\d_]+")
+# Namespaces inside the sorted token list
+_EMAIL, _PHONE, _PHONE_REVERSED = "@", "#", "~"
+
+
+def _trigrams(token: str) -> Set[str]:
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _within_distance(a: str, b: str, limit: int) -> Optional[int]:
+    """Levenshtein distance between a and b, or None if it exceeds `limit`."""
+    if abs(len(a) - len(b)) > limit:
+        return None
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return None
+        previous = current
+    return previous[-1] if previous[-1] <= limit else None
+
+
+def _customer_tokens(customer: Dict) -> Set[str]:
+    tokens: Set[str] = set()
+    for field in ("name", "city"):
+        tokens.update(w.lower() for w in _ALPHA.findall(customer.get(field) or ""))
+    email = (customer.get("email") or "").strip().lower()
+    if email:
+        tokens.add(_EMAIL + email)
+        tokens.update(_ALPHA.findall(email))
+    digits = re.sub(r"\D", "", customer.get("phone") or "")
+    if digits:
+        tokens.add(_PHONE + digits)
+        tokens.add(_PHONE_REVERSED + digits[::-1])
+    return tokens
+
+
+class CustomerSearchIndex:
+    """
+    Prefix and fuzzy search over name, email, phone and city, kept in memory.
+    The first search loads every customer. After that, new customers are picked up
+    incrementally (cust_id greater than the highest indexed) at most every
+    `refresh_interval` seconds, and the index is fully rebuilt every `rebuild_interval`
+    seconds so edits and deletes made by other processes are reflected.
+    """
+    def __init__(self, customer_dao: CustomerDAO, refresh_interval: float = 5.0,
+                 rebuild_interval: float = 300.0, page_size: int = 1000):
+        self.customer_dao = customer_dao
+        self.refresh_interval = refresh_interval
+        self.rebuild_interval = rebuild_interval
+        self.page_size = page_size
+        self._lock = threading.RLock()
+        self._reset()
+        self._built_at: Optional[float] = None
+        self._refreshed_at = 0.0
+
+    def _reset(self) -> None:
+        self._docs: Dict[int, Dict] = {}
+        self._doc_tokens: Dict[int, Set[str]] = {}
+        self._postings: Dict[str, Set[int]] = {}
+        self._sorted_tokens: List[str] = []
+        self._trigram_tokens: Dict[str, Set[str]] = {}
+        self._max_id = 0
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    # --- Maintenance ---
+    def rebuild(self) -> int:
+        """Reloads every customer and returns how many are indexed."""
+        customers = list(self.customer_dao.iter_customers(page_size=self.page_size))
+        with self._lock:
+            self._reset()
+            for customer in customers:
+                self._add(customer, keep_sorted=False)
+            self._sorted_tokens.sort()
+            self._built_at = self._refreshed_at = time.monotonic()
+            return len(self._docs)
+
+    def refresh(self) -> int:
+        """Indexes customers added since the last refresh and returns how many were new."""
+        with self._lock:
+            added = 0
+            for customer in self.customer_dao.iter_customers(page_size=self.page_size, after_id=self._max_id):
+                self._add(customer)
+                added += 1
+            self._refreshed_at = time.monotonic()
+            return added
+
+    def ensure_fresh(self) -> None:
+        now = time.monotonic()
+        if self._built_at is None or now - self._built_at >= self.rebuild_interval:
+            self.rebuild()
+        elif now - self._refreshed_at >= self.refresh_interval:
+            self.refresh()
+
+    def add(self, customer: Dict) -> None:
+        """Indexes a new or changed customer (called by CustomerService on writes)."""
+        with self._lock:
+            if self._built_at is not None:
+                self._add(customer)
+
+    def remove(self, cust_id: int) -> None:
+        with self._lock:
+            self._remove(cust_id)
+
+    def _add(self, customer: Dict, keep_sorted: bool = True) -> None:
+        cust_id = customer["cust_id"]
+        self._remove(cust_id)
+        tokens = _customer_tokens(customer)
+        self._docs[cust_id] = dict(customer)
+        self._doc_tokens[cust_id] = tokens
+        self._max_id = max(self._max_id, cust_id)
+        for token in tokens:
+            ids = self._postings.get(token)
+            if ids is None:
+                ids = self._postings[token] = set()
+                if keep_sorted:
+                    bisect.insort(self._sorted_tokens, token)
+                else:
+                    self._sorted_tokens.append(token)
+                if token[0] not in (_EMAIL, _PHONE, _PHONE_REVERSED):
+                    for gram in _trigrams(token):
+                        self._trigram_tokens.setdefault(gram, set()).add(token)
+            ids.add(cust_id)
+
+    def _remove(self, cust_id: int) -> None:
+        self._docs.pop(cust_id, None)
+        for token in self._doc_tokens.pop(cust_id, ()):
+            ids = self._postings[token]
+            ids.discard(cust_id)
+            if ids:
+                continue
+            del self._postings[token]
+            i = bisect.bisect_left(self._sorted_tokens, token)
+            if i < len(self._sorted_tokens) and self._sorted_tokens[i] == token:
+                del self._sorted_tokens[i]
+            for gram in _trigrams(token) if token[0] not in (_EMAIL, _PHONE, _PHONE_REVERSED) else ():
+                grams = self._trigram_tokens.get(gram)
+                if grams is not None:
+                    grams.discard(token)
+                    if not grams:
+                        del self._trigram_tokens[gram]
+
+    # --- Lookups ---
+    def _prefix_tokens(self, prefix: str) -> Iterable[str]:
+        i = bisect.bisect_left(self._sorted_tokens, prefix)
+        while i < len(self._sorted_tokens) and self._sorted_tokens[i].startswith(prefix):
+            yield self._sorted_tokens[i]
+            i += 1
+
+    def _fuzzy_tokens(self, term: str) -> Dict[str, int]:
+        """Tokens within edit distance 1 (2 for terms of 6+ characters), with their distance."""
+        limit = 1 if len(term) < 6 else 2
+        grams = _trigrams(term)
+        counts: Dict[str, int] = {}
+        for gram in grams:
+            for token in self._trigram_tokens.get(gram, ()):
+                counts[token] = counts.get(token, 0) + 1
+        # Each edit destroys at most 3 trigrams, so anything sharing fewer cannot match
+        needed = max(1, len(grams) - 3 * limit)
+        matches = {}
+        for token, shared in counts.items():
+            if shared >= needed:
+                distance = _within_distance(term, token, limit)
+                if distance is not None:
+                    matches[token] = distance
+        return matches
+
+    def _ids(self, tokens: Iterable[str]) -> Set[int]:
+        """Union of the postings of `tokens`. A single posting is returned as is; never mutate the result."""
+        postings = [self._postings[token] for token in tokens]
+        if len(postings) == 1:
+            return postings[0]
+        return set().union(*postings)
+
+    def _match_term(self, term: str, fuzzy: bool) -> Tuple[List[Tuple[float, Set[int]]], Set[int]]:
+        """
+        Returns the customers matching one term as (score, IDs) tiers, best first
+        (exact token 3, prefix 2, fuzzy 1 minus a tenth per edit), plus all matching IDs.
+        """
+        empty: Set[int] = set()
+        if "@" in term:
+            prefixed = self._ids(self._prefix_tokens(_EMAIL + term))
+            return [(3, self._postings.get(_EMAIL + term, empty)), (2, prefixed)], prefixed
+        if term.isdigit():
+            phones = self._ids(self._prefix_tokens(_PHONE + term)) | self._ids(self._prefix_tokens(_PHONE_REVERSED + term[::-1]))
+            return [(2, phones)], phones
+        # A token is its own prefix, so the prefix tier already holds every exact match
+        prefixed = self._ids(self._prefix_tokens(term))
+        if prefixed or not fuzzy or len(term) < 3:
+            return [(3, self._postings.get(term, empty)), (2, prefixed)], prefixed
+        by_distance: Dict[int, List[str]] = {}
+        for token, distance in self._fuzzy_tokens(term).items():
+            by_distance.setdefault(distance, []).append(token)
+        tiers = [(1 - distance / 10, self._ids(tokens)) for distance, tokens in sorted(by_distance.items())]
+        return tiers, set().union(*(ids for _, ids in tiers))
+
+    def search(self, query: str, limit: int = 20, fuzzy: bool = True) -> List[Dict]:
+        """
+        Returns up to `limit` customers matching every term of the query, best first.
+        Terms match by prefix (phone digits by prefix or suffix, and a term with '@'
+        against whole emails) and, when `fuzzy` is on, by small misspellings.
+        Each result carries its `score`.
+        """
+        self.ensure_fresh()
+        query = query.strip().lower()
+        # Digit groups are joined so "98 0000 1234" and "98-0000-1234" match one phone number
+        query = re.sub(r"(?<=\d)[\s\-().]+(?=\d)", "", query)
+        terms = [t for t in query.split() if "@" in t]
+        terms += _WORD.findall(" ".join(t for t in query.split() if "@" not in t))
+        # One or two stray digits (e.g. from "sharma1") would match a large share of phones
+        terms = [t for t in terms if not (t.isdigit() and len(t) < 3)] or terms
+        if not terms:
+            return []
+        with self._lock:
+            matches = [self._match_term(term, fuzzy) for term in terms]
+            if len(matches) == 1:
+                # One term: take whole tiers in score order, so broad prefixes never score every hit
+                ranked: List[Tuple[int, float]] = []
+                seen: Set[int] = set()
+                for score, ids in matches[0][0]:
+                    for cust_id in heapq.nsmallest(limit - len(ranked), ids - seen):
+                        ranked.append((cust_id, score))
+                    seen |= ids
+                    if len(ranked) >= limit:
+                        break
+            else:
+                candidates = set.intersection(*(all_ids for _, all_ids in matches))
+                scored = dict.fromkeys(candidates, 0.0)
+                for tiers, _ in matches:
+                    remaining = set(candidates)
+                    for score, ids in tiers:
+                        hits = remaining & ids
+                        for cust_id in hits:
+                            scored[cust_id] += score
+                        remaining -= hits
+                ranked = heapq.nsmallest(limit, scored.items(), key=lambda kv: (-kv[1], kv[0]))
+            return [{**self._docs[cust_id], "score": round(score, 2)} for cust_id, score in ranked]
@@ -1,21 +1,28 @@
 # src/services/customer_service.py
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Iterable, Iterator, Tuple
+from src.batching import chunked, insert_with_fallback
 from src.dao.customer_dao import CustomerDAO
 from src.dao.order_dao import OrderDAO
+from src.services.customer_search import CustomerSearchIndex
 
 class CustomerError(Exception):
     """Custom exception for customer-related business logic errors."""
     pass
 
 class CustomerService:
-    def __init__(self, customer_dao: CustomerDAO, order_dao: OrderDAO):
+    def __init__(self, customer_dao: CustomerDAO, order_dao: OrderDAO,
+                 search_index: Optional[CustomerSearchIndex] = None):
         self.customer_dao = customer_dao
         self.order_dao = order_dao
+        self.search_index = search_index
 
     def add_customer(self, name: str, email: str, phone: str, city: Optional[str]) -> Dict:
         if self.customer_dao.get_customer_by_email(email):
             raise CustomerError(f"A customer with email '{email}' already exists.")
-        return self.customer_dao.create_customer(name, email, phone, city)
+        customer = self.customer_dao.create_customer(name, email, phone, city)
+        if customer and self.search_index is not None:
+            self.search_index.add(customer)
+        return customer
 
     def update_customer_details(self, cust_id: int, phone: Optional[str] = None, city: Optional[str] = None) -> Dict:
         if not phone and not city:
@@ -23,7 +30,10 @@ class CustomerService:
         if not self.customer_dao.get_customer_by_id(cust_id):
             raise CustomerError(f"Customer with ID {cust_id} not found.")
         fields_to_update = {k: v for k, v in {"phone": phone, "city": city}.items() if v is not None}
-        return self.customer_dao.update_customer(cust_id, fields_to_update)
+        customer = self.customer_dao.update_customer(cust_id, fields_to_update)
+        if customer and self.search_index is not None:
+            self.search_index.add(customer)
+        return customer
 
     def delete_customer(self, cust_id: int) -> Dict:
         if not self.customer_dao.get_customer_by_id(cust_id):
@@ -31,11 +41,17 @@ class CustomerService:
         orders = self.order_dao.list_orders_by_customer(cust_id)
         if orders:
             raise CustomerError(f"Cannot delete customer {cust_id}. They have {len(orders)} existing order(s).")
-        return self.customer_dao.delete_customer(cust_id)
+        deleted = self.customer_dao.delete_customer(cust_id)
+        if self.search_index is not None:
+            self.search_index.remove(cust_id)
+        return deleted
 
     def list_all_customers(self) -> List[Dict]:
         return self.customer_dao.list_customers()
 
+    def iter_all_customers(self, page_size: int = 1000) -> Iterator[Dict]:
+        return self.customer_dao.iter_customers(page_size=page_size)
+
     def find_customer(self, email: Optional[str] = None, city: Optional[str] = None) -> List[Dict]:
         if not email and not city:
             raise CustomerError("Please provide an email or a city to search by.")
@@ -44,4 +60,63 @@ class CustomerService:
             return [customer] if customer else []
         if city:
             return self.customer_dao.search_customers_by_city(city)
-        return []
\ No newline at end of file
+        return []
+
+    def search_customers(self, query: str, limit: int = 20) -> List[Dict]:
+        """Prefix and fuzzy search over name, email, phone and city using the in-memory index."""
+        if not query or not query.strip():
+            raise CustomerError("Please provide a search query.")
+        if self.search_index is None:
+            self.search_index = CustomerSearchIndex(self.customer_dao)
+        return self.search_index.search(query, limit=limit)
+
+    def import_customers(self, records: Iterable[Tuple[int, Dict]], chunk_size: int = 500) -> Iterator[Dict]:
+        """
+        Validates and inserts customers from (line number, row) pairs one chunk at a time.
+        Each chunk costs one email lookup and one multi-row insert. Yields one result per row.
+        """
+        for chunk in chunked(records, chunk_size):
+            yield from self._import_customer_chunk(chunk)
+
+    @staticmethod
+    def _parse_customer_row(row: Dict) -> Dict:
+        if row.get("_error"):
+            raise CustomerError(row["_error"])
+        fields = {k: str(row.get(k) or "").strip() for k in ("name", "email", "phone", "city")}
+        if not fields["name"] or not fields["email"] or not fields["phone"]:
+            raise CustomerError("Name, email and phone are required.")
+        fields["city"] = fields["city"] or None
+        return fields
+
+    def _import_customer_chunk(self, chunk: List[Tuple[int, Dict]]) -> List[Dict]:
+        results: List[Optional[Dict]] = [None] * len(chunk)
+        pending: List[Tuple[int, Dict]] = []
+        seen = set()
+        for idx, (line_no, row) in enumerate(chunk):
+            try:
+                payload = self._parse_customer_row(row)
+                if payload["email"] in seen:
+                    raise CustomerError(f"Duplicate email '{payload['email']}' earlier in the file.")
+            except CustomerError as e:
+                results[idx] = {"line": line_no, "email": row.get("email"), "status": "rejected", "reason": str(e)}
+                continue
+            seen.add(payload["email"])
+            pending.append((idx, payload))
+
+        existing = {c["email"] for c in self.customer_dao.get_customers_by_emails([p["email"] for _, p in pending])}
+        to_insert = []
+        for idx, payload in pending:
+            if payload["email"] in existing:
+                results[idx] = {"line": chunk[idx][0], "email": payload["email"], "status": "rejected",
+                                "reason": f"A customer with email '{payload['email']}' already exists."}
+            else:
+                to_insert.append((idx, payload))
+
+        for idx, payload, row, error in insert_with_fallback(self.customer_dao.create_customers, to_insert, "email"):
+            result = {"line": chunk[idx][0], "email": payload["email"]}
+            if row:
+                result.update(status="accepted", cust_id=row["cust_id"])
+            else:
+                result.update(status="rejected", reason=error)
+            results[idx] = result
+        return results
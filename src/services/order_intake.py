@@ -0,0 +1,222 @@
+# src/services/order_intake.py
+"""
+Parallel order intake.
+
+Orders are submitted to a bounded queue and created by a pool of worker threads
+through `OrderService.create_order`. Before creating an order, a worker locks the
+shards of every product in it. Orders for the same products therefore run one at a
+time, instead of queueing on the same stock rows in the database, while orders for
+disjoint products run in parallel. Shards are always locked in ascending order, so two
+multi-product orders cannot deadlock. When the queue is full, `submit` blocks, or
+raises `OrderIntakeError` when called with `block=False`.
+"""
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from src.services.order_service import OrderError, OrderService
+
+_STOP = object()
+# Latency samples kept for the percentiles in `stats`
+LATENCY_WINDOW = 10000
+
+
+class OrderIntakeError(Exception):
+    pass
+
+
+class ShardedLockManager:
+    """Maps keys (here product IDs) onto a fixed set of locks."""
+    def __init__(self, shards: int = 64):
+        self.shards = shards
+        self._locks = [threading.Lock() for _ in range(shards)]
+        self._counter_lock = threading.Lock()
+        self.acquisitions = 0
+        self.contended = 0
+        self.wait_seconds = 0.0
+
+    def shards_for(self, keys: Iterable[int]) -> List[int]:
+        return sorted({hash(key) % self.shards for key in keys})
+
+    @contextmanager
+    def hold(self, keys: Iterable[int]):
+        """Holds the locks of every shard the keys map to, taken in ascending shard order."""
+        shards = self.shards_for(keys)
+        taken = []
+        waited, contended = 0.0, False
+        try:
+            for shard in shards:
+                lock = self._locks[shard]
+                if not lock.acquire(blocking=False):
+                    contended = True
+                    started = time.perf_counter()
+                    lock.acquire()
+                    waited += time.perf_counter() - started
+                taken.append(lock)
+            with self._counter_lock:
+                self.acquisitions += 1
+                self.contended += contended
+                self.wait_seconds += waited
+            yield shards
+        finally:
+            for lock in reversed(taken):
+                lock.release()
+
+    def stats(self) -> Dict:
+        return {"shards": self.shards, "acquisitions": self.acquisitions, "contended": self.contended,
+                "wait_seconds": round(self.wait_seconds, 4)}
+
+
+class OrderIntakeEngine:
+    """
+    Worker pool in front of `OrderService.create_order`. `submit` returns a Future that
+    resolves to the created order or raises the OrderError that rejected it. The service
+    and its DAOs are shared by all workers; the database client must be thread-safe
+    (httpx and both local backends are).
+    """
+    def __init__(self, order_service: OrderService, workers: int = 8, max_pending: int = 1000,
+                 shards: int = 64):
+        if workers < 1 or max_pending < 1 or shards < 1:
+            raise OrderIntakeError("workers, max_pending and shards must be at least 1.")
+        self.order_service = order_service
+        self.workers = workers
+        self.locks = ShardedLockManager(shards)
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_pending)
+        self._threads: List[threading.Thread] = []
+        self._stats_lock = threading.Lock()
+        self._latencies: deque = deque(maxlen=LATENCY_WINDOW)
+        self._closed = False
+        self.started_at: Optional[float] = None
+        self.submitted = 0
+        self.accepted = 0
+        self.rejected = 0
+        self.failed = 0
+        self.refused = 0
+        self.max_depth = 0
+
+    def start(self) -> "OrderIntakeEngine":
+        if not self._threads:
+            self.started_at = time.perf_counter()
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"order-intake-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        return self
+
+    def submit(self, cust_id: int, items: List[Dict], block: bool = True,
+               timeout: Optional[float] = None) -> Future:
+        """Queues an order. Blocks while the queue is full unless `block` is False."""
+        if self._closed:
+            raise OrderIntakeError("The intake engine is shut down.")
+        self.start()
+        future: Future = Future()
+        try:
+            self._queue.put((cust_id, items, future, time.perf_counter()), block=block, timeout=timeout)
+        except queue.Full:
+            with self._stats_lock:
+                self.refused += 1
+            raise OrderIntakeError(f"Intake queue is full ({self._queue.maxsize} orders pending); retry later.")
+        with self._stats_lock:
+            self.submitted += 1
+            self.max_depth = max(self.max_depth, self._queue.qsize())
+        return future
+
+    def process(self, records: Iterable[Tuple[int, Dict]]) -> Iterator[Dict]:
+        """
+        Feeds (line number, row) pairs through the pool and yields one result per row in
+        input order, shaped like `OrderService.create_orders_batch` results.
+        The bounded queue keeps reading the input no further ahead than the workers.
+        """
+        in_flight: deque = deque()
+        for line, row in records:
+            try:
+                order = self.order_service.parse_order_row(row)
+            except OrderError as e:
+                in_flight.append((line, row.get("cust_id"), str(e)))
+            else:
+                in_flight.append((line, order["cust_id"], self.submit(order["cust_id"], order["items"])))
+            while in_flight and (isinstance(in_flight[0][2], str) or in_flight[0][2].done()):
+                yield self._result(*in_flight.popleft())
+        while in_flight:
+            yield self._result(*in_flight.popleft())
+
+    @staticmethod
+    def _result(line: int, cust_id, outcome) -> Dict:
+        if isinstance(outcome, str):
+            return {"line": line, "cust_id": cust_id, "status": "rejected", "reason": outcome}
+        try:
+            order = outcome.result()
+        except Exception as e:
+            return {"line": line, "cust_id": cust_id, "status": "rejected", "reason": str(e)}
+        return {"line": line, "cust_id": cust_id, "status": "accepted",
+                "order_id": order["order_id"], "total_amount": order.get("total_amount")}
+
+    def _work(self) -> None:
+        while True:
+            task = self._queue.get()
+            if task is _STOP:
+                return
+            cust_id, items, future, queued_at = task
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                with self.locks.hold(item["prod_id"] for item in items):
+                    order = self.order_service.create_order(cust_id, items)
+            except OrderError as e:
+                self._record(queued_at, "rejected")
+                future.set_exception(e)
+            except Exception as e:
+                self._record(queued_at, "failed")
+                future.set_exception(e)
+            else:
+                self._record(queued_at, "accepted")
+                future.set_result(order)
+
+    def _record(self, queued_at: float, outcome: str) -> None:
+        with self._stats_lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+            self._latencies.append(time.perf_counter() - queued_at)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stops taking orders; the workers finish everything already queued, then exit."""
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def __enter__(self) -> "OrderIntakeEngine":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.shutdown()
+
+    def stats(self) -> Dict:
+        """Counters, throughput since start, queue depth and queue-to-done latency percentiles."""
+        with self._stats_lock:
+            done = self.accepted + self.rejected + self.failed
+            latencies = sorted(self._latencies)
+            elapsed = time.perf_counter() - self.started_at if self.started_at else 0.0
+            counts = {"submitted": self.submitted, "accepted": self.accepted, "rejected": self.rejected,
+                      "failed": self.failed, "refused": self.refused}
+
+        def percentile(p: float) -> Optional[float]:
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 2) if latencies else None
+
+        return {
+            **counts,
+            "workers": self.workers,
+            "elapsed_seconds": round(elapsed, 3),
+            "orders_per_second": round(done / elapsed, 1) if elapsed else 0.0,
+            "queue_depth": self._queue.qsize(),
+            "max_queue_depth": self.max_depth,
+            "queue_capacity": self._queue.maxsize,
+            "latency_ms": {"p50": percentile(0.50), "p99": percentile(0.99)},
+            "locks": self.locks.stats(),
+        }
@@ -0,0 +1,157 @@
+# src/services/order_queue_service.py
+import datetime
+import random
+import threading
+from typing import Callable, Dict, Iterator, List, Optional
+from src.dao.order_queue_dao import FLUSH_LEASE, OrderQueueDAO
+from src.services.order_service import OrderService
+
+
+class OrderQueueError(Exception):
+    pass
+
+
+class OrderQueueService:
+    """
+    Takes orders into the local queue without touching the database, and later
+    flushes them in queue order through `OrderService.create_orders_batch`.
+    Each flushed order ends ACCEPTED (with its real order_id) or REJECTED (with the
+    reason, e.g. not enough stock). A batch that fails outright stays queued.
+    Every entry is written with the idempotency key `queue:<queue uid>:<queue_id>`, so
+    an entry flushed again after a crash or a lost response finds the order it already
+    created instead of creating it twice.
+    """
+    def __init__(self, queue_dao: OrderQueueDAO, order_service: OrderService, batch_size: int = 200):
+        self.queue_dao = queue_dao
+        self.order_service = order_service
+        self.batch_size = batch_size
+        self._flush_lock = threading.Lock()
+
+    def submit(self, cust_id: int, items: List[Dict]) -> Dict:
+        """Checks the order's shape and queues it; returns the queued row with its provisional ID."""
+        if not items:
+            raise OrderQueueError("An order needs at least one item.")
+        lines = []
+        for item in items:
+            prod_id, quantity = item.get("prod_id"), item.get("quantity")
+            if not isinstance(prod_id, int) or not isinstance(quantity, int) or quantity <= 0:
+                raise OrderQueueError(f"Invalid item {item}: prod_id and a positive quantity are required.")
+            lines.append({"prod_id": prod_id, "quantity": quantity})
+        entry = self.queue_dao.enqueue(cust_id, lines)
+        entry["provisional_id"] = f"Q{entry['queue_id']}"
+        return entry
+
+    def flush(self, max_batches: Optional[int] = None) -> Iterator[Dict]:
+        """
+        Flushes pending orders oldest first, `batch_size` at a time, and yields
+        {queue_id, cust_id, status, order_id | reason} per order. Stops at the first
+        batch that cannot be written, leaving it and everything after it queued, so
+        orders are never created out of sequence; that raises OrderQueueError.
+        Only one process flushes a queue file at a time; a second one gets OrderQueueError.
+        """
+        with self._flush_lock, self.queue_dao.flush_lock() as locked:
+            if locked is False:
+                raise OrderQueueError("Another process is flushing this queue; try again later.")
+            # Holding the file lock proves no other flusher is alive, so every FLUSHING order
+            # is abandoned; without it only orders claimed longer than the lease ago are
+            self.queue_dao.recover(0 if locked else FLUSH_LEASE)
+            batches = 0
+            while max_batches is None or batches < max_batches:
+                batch = self.queue_dao.claim_batch(self.batch_size)
+                if not batch:
+                    return
+                batches += 1
+                records = [(entry["queue_id"], {"cust_id": entry["cust_id"], "items": entry["items"],
+                                                "idempotency_key": self.idempotency_key(entry["queue_id"])})
+                           for entry in batch]
+                try:
+                    results = list(self.order_service.create_orders_batch(records, chunk_size=len(records)))
+                except Exception as e:
+                    self.queue_dao.release([entry["queue_id"] for entry in batch], str(e))
+                    raise OrderQueueError(f"Flush failed, {len(batch)} order(s) stay queued: {e}") from e
+                outcomes = []
+                for result in results:
+                    outcome = {"queue_id": result["line"], "cust_id": result.get("cust_id")}
+                    if result["status"] == "accepted":
+                        outcome.update(status="ACCEPTED", order_id=result["order_id"],
+                                       total_amount=result.get("total_amount"))
+                    else:
+                        outcome.update(status="REJECTED", reason=result["reason"])
+                    outcomes.append(outcome)
+                self.queue_dao.complete(outcomes)
+                yield from outcomes
+
+    def idempotency_key(self, queue_id: int) -> str:
+        return f"queue:{self.queue_dao.queue_uid}:{queue_id}"
+
+    def status(self) -> Dict:
+        return self.queue_dao.stats()
+
+    def list_queued(self, status: Optional[str] = None, limit: int = 100) -> List[Dict]:
+        return self.queue_dao.list(status.upper() if status else None, limit)
+
+    def purge_accepted(self, older_than_days: float = 7) -> int:
+        """Deletes accepted orders older than the given age; pending and rejected ones are kept."""
+        cutoff = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=older_than_days)
+        return self.queue_dao.purge(cutoff.isoformat(timespec="seconds"))
+
+
+class QueueFlusher:
+    """
+    Flushes the queue every `interval` seconds, on a background thread (`start`) or
+    in the foreground (`run`). After a failed flush it waits with jittered exponential
+    backoff, up to `max_backoff` seconds, before trying again.
+    """
+    def __init__(self, service: OrderQueueService, interval: float = 2.0, max_backoff: float = 60.0,
+                 on_result: Optional[Callable[[Dict], None]] = None,
+                 on_error: Optional[Callable[[Exception], None]] = None):
+        self.service = service
+        self.interval = interval
+        self.max_backoff = max_backoff
+        self.on_result = on_result
+        self.on_error = on_error
+        self.failures = 0
+        self.flushed = 0
+        self.last_error: Optional[str] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> int:
+        """Flushes everything pending; returns how many orders were flushed."""
+        flushed = 0
+        for outcome in self.service.flush():
+            flushed += 1
+            if self.on_result:
+                self.on_result(outcome)
+        self.flushed += flushed
+        return flushed
+
+    def next_delay(self) -> float:
+        if not self.failures:
+            return self.interval
+        return random.uniform(self.interval, min(self.max_backoff, self.interval * 2 ** self.failures))
+
+    def run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+                self.failures, self.last_error = 0, None
+            except Exception as e:
+                # Includes sqlite3 errors such as "database is locked": back off, never die
+                self.failures += 1
+                self.last_error = str(e)
+                if self.on_error:
+                    self.on_error(e)
+            self._stop.wait(self.next_delay())
+
+    def start(self) -> "QueueFlusher":
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run, name="order-queue-flusher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
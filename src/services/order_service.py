@@ -1,68 +1,329 @@
 # src/services/order_service.py
-from typing import List, Dict
+import logging
+import uuid
+from typing import List, Dict, Iterable, Iterator, Optional, Tuple
+from src.batching import chunked
+from src.catalog import CatalogError, CatalogSnapshot
 from src.dao.order_dao import OrderDAO
 from src.dao.product_dao import ProductDAO
 from src.dao.customer_dao import CustomerDAO
 from src.dao.payment_dao import PaymentDAO # IMPORT PaymentDAO
+from src.idempotency import IdempotencyError, IdempotencyGuard
+
+logger = logging.getLogger(__name__)
 
 class OrderError(Exception):
     pass
 
 class OrderService:
     # UPDATE __init__ to accept payment_dao
-    def __init__(self, order_dao: OrderDAO, product_dao: ProductDAO, customer_dao: CustomerDAO, payment_dao: PaymentDAO):
+    def __init__(self, order_dao: OrderDAO, product_dao: ProductDAO, customer_dao: CustomerDAO, payment_dao: PaymentDAO,
+                 catalog: Optional[CatalogSnapshot] = None, idempotency: Optional[IdempotencyGuard] = None):
         self.order_dao = order_dao
         self.product_dao = product_dao
         self.customer_dao = customer_dao
         self.payment_dao = payment_dao # ADD this line
+        self.catalog = catalog
+        self.idempotency = idempotency or IdempotencyGuard()
+
+    def create_order(self, cust_id: int, items: List[Dict], idempotency_key: Optional[str] = None) -> Dict:
+        """
+        Creates an order with a pending payment. With an `idempotency_key`, a retry of the
+        same order returns the order created first instead of creating another one.
+        """
+        payload = {"cust_id": cust_id, "items": [(item["prod_id"], item["quantity"]) for item in items]}
+        try:
+            return self.idempotency.run("create_order", idempotency_key, payload,
+                                        lambda: self._create_order(cust_id, items, idempotency_key),
+                                        release_on=(OrderError,))
+        except IdempotencyError as e:
+            raise OrderError(str(e)) from e
 
-    def create_order(self, cust_id: int, items: List[Dict]) -> Dict:
+    def _create_order(self, cust_id: int, items: List[Dict], idempotency_key: Optional[str] = None) -> Dict:
+        if idempotency_key:
+            # An earlier attempt may have committed even though it failed for the client
+            existing = self.order_dao.get_order_by_idempotency_key(idempotency_key)
+            if existing:
+                if existing["cust_id"] != cust_id:
+                    raise OrderError(f"Idempotency key '{idempotency_key}' was already used for a different order.")
+                return self.get_order_details(existing["order_id"])
         # ... (validation logic is the same) ...
         if not self.customer_dao.get_customer_by_id(cust_id):
             raise OrderError(f"Customer with ID {cust_id} not found.")
-        total_amount = 0
-        products_to_update = []
+        # Sum quantities per product so repeated lines are reserved once
+        requested: Dict[int, int] = {}
         for item in items:
-            prod_id = item["prod_id"]
-            quantity = item["quantity"]
-            product = self.product_dao.get_product_by_id(prod_id)
-            if not product:
+            requested[item["prod_id"]] = requested.get(item["prod_id"], 0) + item["quantity"]
+        products = self._products_for_order(list(requested))
+        for prod_id in requested:
+            if prod_id not in products:
                 raise OrderError(f"Product with ID {prod_id} not found.")
-            if product.get("stock", 0) < quantity:
-                raise OrderError(f"Not enough stock for product '{product['name']}' (ID: {prod_id}). "
-                                 f"Requested: {quantity}, Available: {product['stock']}.")
-            item_price = product.get("price", 0)
-            total_amount += item_price * quantity
+        total_amount = 0
+        for item in items:
+            item_price = products[item["prod_id"]].get("price", 0)
+            total_amount += item_price * item["quantity"]
             item["price"] = item_price
-            products_to_update.append({"product": product, "quantity": quantity})
-        
-        new_order = self.order_dao.create_order(cust_id, total_amount)
-        if not new_order:
-            raise OrderError("Failed to create order record.")
-        order_id = new_order["order_id"]
 
-        # ADD THIS STEP: Create a pending payment record
-        self.payment_dao.create_payment(order_id, total_amount)
-        
-        self.order_dao.create_order_items(order_id, items)
-        for p_info in products_to_update:
-            product = p_info["product"]
-            new_stock = product["stock"] - p_info["quantity"]
-            self.product_dao.update_product(product["prod_id"], {"stock": new_stock})
-            
+        # Stock is checked and decremented atomically on the server; the order does not
+        # exist yet, so the reservation carries a reference that is linked to it below
+        reference = uuid.uuid4().hex
+        reservation = [{"prod_id": prod_id, "quantity": quantity, "reservation": reference}
+                       for prod_id, quantity in requested.items()]
+        failed = self.product_dao.reserve_stock(reservation)
+        if failed:
+            raise OrderError(self._describe_failed_reservation(failed, products))
+
+        new_order = None
+        try:
+            new_order = self.order_dao.create_order(cust_id, total_amount, idempotency_key=idempotency_key)
+            if not new_order:
+                raise OrderError("Failed to create order record.")
+            order_id = new_order["order_id"]
+
+            # ADD THIS STEP: Create a pending payment record
+            self.payment_dao.create_payment(order_id, total_amount)
+
+            self.order_dao.create_order_items(order_id, items)
+            self.product_dao.link_reservations({reference: order_id})
+        except Exception:
+            # Void a half-written order and hand the reserved units back
+            if not new_order and idempotency_key:
+                # The insert may have committed before its response was lost
+                try:
+                    new_order = self.order_dao.get_order_by_idempotency_key(idempotency_key)
+                except Exception:
+                    pass
+            if new_order:
+                self._void_orders([new_order["order_id"]])
+            self.product_dao.release_stock(reservation)
+            raise
+
         return self.get_order_details(order_id)
 
+    def create_orders_batch(self, records: Iterable[Tuple[int, Dict]], chunk_size: int = 500) -> Iterator[Dict]:
+        """
+        Creates orders from (line number, row) pairs one chunk at a time. Each chunk costs
+        one customer read, one product read, one stock reservation covering all of its
+        orders, and one multi-row insert each for orders, payments and items.
+        A row may carry an `idempotency_key`; a row whose key is already on an order is
+        accepted as that order instead of being created again (one more read per chunk).
+        Yields one result per row, in input order.
+        """
+        for chunk in chunked(records, chunk_size):
+            yield from self._create_order_chunk(chunk)
+
+    @staticmethod
+    def parse_order_row(row: Dict) -> Dict:
+        """Turns an import row into {cust_id, items}; raises OrderError if it is malformed."""
+        if row.get("_error"):
+            raise OrderError(row["_error"])
+        try:
+            cust_id = int(row.get("cust_id"))
+        except (TypeError, ValueError):
+            raise OrderError(f"Invalid cust_id '{row.get('cust_id')}'.")
+        raw_items = row.get("items")
+        if isinstance(raw_items, str):
+            # CSV rows carry items as "prod_id:qty" pairs separated by spaces or semicolons
+            raw_items = [dict(zip(("prod_id", "quantity"), part.split(":", 1)))
+                         for part in raw_items.replace(";", " ").split()]
+        if not raw_items:
+            raise OrderError("An order needs at least one item.")
+        items = []
+        for raw in raw_items:
+            try:
+                item = {"prod_id": int(raw["prod_id"]), "quantity": int(raw["quantity"])}
+            except (KeyError, TypeError, ValueError):
+                raise OrderError(f"Invalid item {raw!r}. Use prod_id and quantity.")
+            if item["quantity"] <= 0:
+                raise OrderError("Item quantities must be positive.")
+            items.append(item)
+        order = {"cust_id": cust_id, "items": items}
+        if row.get("idempotency_key"):
+            order["idempotency_key"] = str(row["idempotency_key"])
+        return order
+
+    @staticmethod
+    def _allocate_stock(candidates: List[Tuple[int, Dict]], available: Dict[int, int],
+                        products: Dict[int, Dict]) -> Tuple[List[Tuple[int, Dict]], Dict[int, str]]:
+        """Accepts orders in file order while the running stock snapshot covers them."""
+        remaining = dict(available)
+        accepted, rejected = [], {}
+        for idx, order in candidates:
+            needed: Dict[int, int] = {}
+            for item in order["items"]:
+                needed[item["prod_id"]] = needed.get(item["prod_id"], 0) + item["quantity"]
+            short = [prod_id for prod_id, quantity in needed.items() if quantity > remaining.get(prod_id, 0)]
+            if short:
+                prod_id = short[0]
+                rejected[idx] = (f"Not enough stock for product '{products[prod_id].get('name', prod_id)}' "
+                                 f"(ID: {prod_id}). Requested: {needed[prod_id]}, Available: {remaining.get(prod_id, 0)}.")
+                continue
+            for prod_id, quantity in needed.items():
+                remaining[prod_id] -= quantity
+            accepted.append((idx, order))
+        return accepted, rejected
+
+    def _create_order_chunk(self, chunk: List[Tuple[int, Dict]]) -> List[Dict]:
+        results: List[Optional[Dict]] = [None] * len(chunk)
+
+        def reject(idx: int, cust_id, reason: str) -> None:
+            results[idx] = {"line": chunk[idx][0], "cust_id": cust_id, "status": "rejected", "reason": reason}
+
+        parsed: List[Tuple[int, Dict]] = []
+        for idx, (_, row) in enumerate(chunk):
+            try:
+                parsed.append((idx, self.parse_order_row(row)))
+            except OrderError as e:
+                reject(idx, row.get("cust_id"), str(e))
+        parsed = self._skip_existing_orders(chunk, parsed, results)
+
+        customers = {c["cust_id"] for c in self.customer_dao.get_customers_by_ids([o["cust_id"] for _, o in parsed])}
+        products = {p["prod_id"]: p for p in self.product_dao.get_products_by_ids(
+            [item["prod_id"] for _, order in parsed for item in order["items"]])}
+        candidates = []
+        for idx, order in parsed:
+            missing = [item["prod_id"] for item in order["items"] if item["prod_id"] not in products]
+            if order["cust_id"] not in customers:
+                reject(idx, order["cust_id"], f"Customer with ID {order['cust_id']} not found.")
+            elif missing:
+                reject(idx, order["cust_id"], f"Product with ID {missing[0]} not found.")
+            else:
+                candidates.append((idx, order))
+
+        # One all-or-nothing reservation for the chunk. If stock moved since the read,
+        # lower the snapshot to what the server reported and plan again. Each order's lines
+        # carry their own reservation reference, linked to the order once it is inserted.
+        available = {prod_id: product.get("stock") or 0 for prod_id, product in products.items()}
+        reference = uuid.uuid4().hex
+        while True:
+            accepted, rejected = self._allocate_stock(candidates, available, products)
+            lines: Dict[Tuple[int, str], int] = {}
+            reserved: Dict[int, int] = {}
+            for idx, order in accepted:
+                for item in order["items"]:
+                    key = (item["prod_id"], f"{reference}:{idx}")
+                    lines[key] = lines.get(key, 0) + item["quantity"]
+                    reserved[item["prod_id"]] = reserved.get(item["prod_id"], 0) + item["quantity"]
+            reservation = [{"prod_id": prod_id, "quantity": quantity} for prod_id, quantity in reserved.items()]
+            failed = self.product_dao.reserve_stock(
+                [{"prod_id": prod_id, "quantity": quantity, "reservation": ref}
+                 for (prod_id, ref), quantity in lines.items()]) if lines else []
+            if not failed:
+                break
+            for line in failed:
+                available[line["prod_id"]] = line.get("available") or 0
+        for idx, reason in rejected.items():
+            reject(idx, chunk[idx][1].get("cust_id"), reason)
+        if not accepted:
+            return results
+
+        for _, order in accepted:
+            for item in order["items"]:
+                item["price"] = products[item["prod_id"]].get("price", 0)
+            order["total_amount"] = sum(item["price"] * item["quantity"] for item in order["items"])
+        created: List[Dict] = []
+        try:
+            created = self.order_dao.create_orders(
+                [{"cust_id": order["cust_id"], "total_amount": order["total_amount"],
+                  **({"idempotency_key": order["idempotency_key"]} if order.get("idempotency_key") else {})}
+                 for _, order in accepted])
+            if len(created) != len(accepted):
+                raise OrderError("Failed to create order records.")
+            self.payment_dao.create_payments(
+                [{"order_id": row["order_id"], "amount": order["total_amount"]} for row, (_, order) in zip(created, accepted)])
+            self.order_dao.create_order_items_bulk(
+                [{**item, "order_id": row["order_id"]} for row, (_, order) in zip(created, accepted) for item in order["items"]])
+            self.product_dao.link_reservations(
+                {f"{reference}:{idx}": row["order_id"] for row, (idx, _) in zip(created, accepted)})
+        except Exception as e:
+            # Void half-written orders and hand the reserved units back, so a retry of the
+            # chunk does not leave PLACED orders without payments or items behind
+            keys = [order["idempotency_key"] for _, order in accepted if order.get("idempotency_key")]
+            if not created and keys:
+                # The insert may have committed before its response was lost
+                try:
+                    created = self.order_dao.get_orders_by_idempotency_keys(keys)
+                except Exception:
+                    pass
+            self._void_orders([row["order_id"] for row in created if row.get("order_id") is not None])
+            self.product_dao.release_stock(reservation)
+            raise OrderError(f"Failed to record orders from lines {chunk[0][0]}-{chunk[-1][0]}: {e}") from e
+
+        for row, (idx, order) in zip(created, accepted):
+            results[idx] = {"line": chunk[idx][0], "cust_id": order["cust_id"], "status": "accepted",
+                            "order_id": row["order_id"], "total_amount": order["total_amount"]}
+        return results
+
+    def _skip_existing_orders(self, chunk: List[Tuple[int, Dict]], parsed: List[Tuple[int, Dict]],
+                              results: List[Optional[Dict]]) -> List[Tuple[int, Dict]]:
+        """
+        Fills in the results of rows whose idempotency key is already on an order (an
+        earlier attempt wrote it) and returns the rows still to be created.
+        """
+        keys = [order["idempotency_key"] for _, order in parsed if order.get("idempotency_key")]
+        if not keys:
+            return parsed
+        existing = {row["idempotency_key"]: row for row in self.order_dao.get_orders_by_idempotency_keys(keys)}
+        remaining = []
+        for idx, order in parsed:
+            found = existing.get(order.get("idempotency_key"))
+            if found is None:
+                remaining.append((idx, order))
+            elif found["cust_id"] != order["cust_id"]:
+                results[idx] = {"line": chunk[idx][0], "cust_id": order["cust_id"], "status": "rejected",
+                                "reason": f"Idempotency key '{order['idempotency_key']}' was already used for a different order."}
+            else:
+                results[idx] = {"line": chunk[idx][0], "cust_id": order["cust_id"], "status": "accepted",
+                                "order_id": found["order_id"], "total_amount": found["total_amount"]}
+        return remaining
+
+    def _void_orders(self, order_ids: List[int]) -> None:
+        """
+        Cancels orders whose payment or items could not be written, refunding any pending
+        payment already created, and frees their idempotency keys for the retry.
+        Best effort: the original failure is what gets raised.
+        """
+        if not order_ids:
+            return
+        try:
+            self.payment_dao.mark_payments_refunded(order_ids)
+            self.order_dao.void_orders(order_ids)
+        except Exception:
+            pass
+
+    def _products_for_order(self, prod_ids: List[int]) -> Dict[int, Dict]:
+        """
+        Products to price an order with. A fresh catalog snapshot answers locally; only
+        products it does not know are read from the database. Stock is still checked
+        by the reservation, never against the snapshot. A snapshot that cannot be read
+        is skipped, so every product is read from the database.
+        """
+        products: Dict[int, Dict] = {}
+        if self.catalog is not None:
+            try:
+                self.catalog.reload_if_changed()
+                if self.catalog.fresh():
+                    products = {p["prod_id"]: p for p in self.catalog.get_many(prod_ids)}
+            except CatalogError as e:
+                logger.warning("Catalog snapshot %s is unreadable, pricing from the database: %s",
+                               self.catalog.path, e)
+                products = {}
+        missing = [prod_id for prod_id in prod_ids if prod_id not in products]
+        if missing:
+            products.update({p["prod_id"]: p for p in self.product_dao.get_products_by_ids(missing)})
+        return products
+
     # ... (get_order_details and list_orders_for_customer are the same) ...
     def get_order_details(self, order_id: int) -> Dict:
-        order = self.order_dao.get_order_by_id(order_id)
+        order = self.order_dao.get_order_with_details(order_id)
         if not order:
             raise OrderError(f"Order with ID {order_id} not found.")
-        customer = self.customer_dao.get_customer_by_id(order["cust_id"])
-        items = self.order_dao.get_order_items_by_order_id(order_id)
-        order["customer"] = customer
-        order["items"] = items
         return order
 
+    def get_orders_details(self, order_ids: List[int]) -> List[Dict]:
+        """Fetches many orders with customer and items in one request; unknown IDs are skipped."""
+        return self.order_dao.get_orders_with_details(order_ids)
+
     def list_orders_for_customer(self, cust_id: int) -> List[Dict]:
         if not self.customer_dao.get_customer_by_id(cust_id):
             raise OrderError(f"Customer with ID {cust_id} not found.")
@@ -70,24 +331,37 @@ class OrderService:
 
 
     def cancel_order(self, order_id: int) -> Dict:
-        order = self.order_dao.get_order_by_id(order_id)
-        if not order:
-            raise OrderError(f"Order with ID {order_id} not found.")
-        if order["status"] != "PLACED":
+        # Guarded on status = PLACED, so of concurrent cancels (or a cancel racing a
+        # payment) exactly one moves the order, and only that one releases the stock
+        cancelled = self.order_dao.update_order_status(order_id, "CANCELLED", from_status="PLACED")
+        if not cancelled:
+            order = self.order_dao.get_order_by_id(order_id)
+            if not order:
+                raise OrderError(f"Order with ID {order_id} not found.")
             raise OrderError(f"Cannot cancel order. Status is '{order['status']}'.")
 
         # Restore stock logic is the same
         items = self.order_dao.get_order_items_by_order_id(order_id)
-        for item in items:
-            product = self.product_dao.get_product_by_id(item["prod_id"])
-            if product:
-                new_stock = product.get("stock", 0) + item["quantity"]
-                self.product_dao.update_product(product["prod_id"], {"stock": new_stock})
+        self.product_dao.release_stock(items)
         
-        # ADD THIS STEP: Mark the payment as REFUNDED
-        self.payment_dao.update_payment_by_order_id(order_id, {"status": "REFUNDED"})
+        # ADD THIS STEP: Mark the payment as REFUNDED. A payment marked PAID in the
+        # meantime is refunded by PaymentService, which then finds the order cancelled.
+        self.payment_dao.mark_payments_refunded([order_id])
+
+        return cancelled
 
-        return self.order_dao.update_order_status(order_id, "CANCELLED")
+    @staticmethod
+    def _describe_failed_reservation(failed: List[Dict], products: Dict[int, Dict]) -> str:
+        messages = []
+        for line in failed:
+            prod_id = line["prod_id"]
+            if line.get("available") is None:
+                messages.append(f"Product with ID {prod_id} not found.")
+            else:
+                name = products.get(prod_id, {}).get("name", prod_id)
+                messages.append(f"Not enough stock for product '{name}' (ID: {prod_id}). "
+                                f"Requested: {line['requested']}, Available: {line['available']}.")
+        return " ".join(messages)
 
     # The original complete_order is now handled by PaymentService
     # We can remove it or leave it as a manual override
@@ -1,7 +1,11 @@
 # src/services/payment_service.py
-from typing import Dict
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from src.batching import chunked
 from src.dao.payment_dao import PaymentDAO
 from src.dao.order_dao import OrderDAO
+from src.idempotency import IdempotencyError, IdempotencyGuard
+
+PAYMENT_METHODS = ("Cash", "Card", "UPI")
 
 class PaymentError(Exception):
     """Custom exception for payment-related errors."""
@@ -11,25 +15,147 @@ class PaymentService:
     """
     Service class containing business logic for processing payments.
     """
-    def __init__(self, payment_dao: PaymentDAO, order_dao: OrderDAO):
+    def __init__(self, payment_dao: PaymentDAO, order_dao: OrderDAO, idempotency: Optional[IdempotencyGuard] = None):
         self.payment_dao = payment_dao
         self.order_dao = order_dao
+        self.idempotency = idempotency or IdempotencyGuard()
 
-    def process_payment(self, order_id: int, method: str) -> Dict:
+    def process_payment(self, order_id: int, method: str, idempotency_key: Optional[str] = None) -> Dict:
         """
-        Processes a payment for an order and updates the order status.
+        Processes a payment for an order and updates the order status. With an
+        `idempotency_key`, a retry returns the first result instead of failing as not pending,
+        including when the first attempt timed out after the payment was marked paid.
         """
+        try:
+            return self.idempotency.run("process_payment", idempotency_key, {"order_id": order_id, "method": method},
+                                        lambda: self._process_payment(order_id, method, bool(idempotency_key)),
+                                        release_on=(PaymentError,))
+        except IdempotencyError as e:
+            raise PaymentError(str(e)) from e
+
+    def _process_payment(self, order_id: int, method: str, keyed: bool = False) -> Dict:
         payment = self.payment_dao.get_payment_by_order_id(order_id)
         if not payment:
             raise PaymentError(f"No pending payment found for order ID {order_id}.")
+        if keyed and payment["status"] == "PAID" and payment.get("method") == method:
+            # A keyed retry whose first attempt's outcome was lost: finish it, never charge again
+            self._complete_order(order_id)
+            return payment
         if payment["status"] != "PENDING":
             raise PaymentError(f"Payment for order ID {order_id} is not pending (status: {payment['status']}).")
 
-        # Update payment status
-        updates = {"status": "PAID", "method": method}
-        updated_payment = self.payment_dao.update_payment_by_order_id(order_id, updates)
+        # Guarded on status = PENDING, so two concurrent attempts cannot both mark it paid
+        updated = self.payment_dao.mark_payments_paid([order_id], method)
+        if not updated:
+            raise PaymentError(f"Payment for order ID {order_id} is no longer pending.")
+        updated_payment = updated[0]
 
         # Update order status to COMPLETED
-        self.order_dao.update_order_status(order_id, "COMPLETED")
+        self._complete_order(order_id)
+
+        return updated_payment
+
+    def _complete_order(self, order_id: int) -> None:
+        """
+        Moves a paid order from PLACED to COMPLETED. If it was cancelled concurrently, its
+        stock is already released, so the payment is refunded instead.
+        """
+        if self.order_dao.update_order_status(order_id, "COMPLETED", from_status="PLACED"):
+            return
+        order = self.order_dao.get_order_by_id(order_id)
+        if not order or order["status"] != "CANCELLED":
+            return
+        self.payment_dao.mark_payments_refunded([order_id], from_status="PAID")
+        raise PaymentError(f"Order ID {order_id} was cancelled while it was being paid; the payment was refunded.")
+
+    def settle_payments(self, records: Iterable[Tuple[int, Dict]], chunk_size: int = 500) -> Iterator[Dict]:
+        """
+        Settles gateway rows (order_id, method, optional amount) one chunk at a time. Each
+        chunk costs one payment read, one PAID update per method and one order update.
+        Yields one result per row, in input order; rejected rows carry a `code`
+        (invalid, duplicate, not_found, not_pending, amount_mismatch, conflict).
+        """
+        for chunk in chunked(records, chunk_size):
+            yield from self._settle_chunk(chunk)
+
+    @staticmethod
+    def _parse_settlement_row(row: Dict) -> Dict:
+        if row.get("_error"):
+            raise PaymentError(row["_error"])
+        try:
+            order_id = int(row.get("order_id"))
+        except (TypeError, ValueError):
+            raise PaymentError(f"Invalid order_id '{row.get('order_id')}'.")
+        methods = {m.lower(): m for m in PAYMENT_METHODS}
+        method = methods.get(str(row.get("method") or "").strip().lower())
+        if not method:
+            raise PaymentError(f"Invalid method '{row.get('method')}'. Use one of: {', '.join(PAYMENT_METHODS)}.")
+        raw_amount = row.get("amount")
+        try:
+            amount = float(raw_amount) if raw_amount not in (None, "") else None
+        except (TypeError, ValueError):
+            raise PaymentError(f"Invalid amount '{raw_amount}'.")
+        return {"order_id": order_id, "method": method, "amount": amount}
+
+    def _settle_chunk(self, chunk: List[Tuple[int, Dict]]) -> List[Dict]:
+        results: List[Optional[Dict]] = [None] * len(chunk)
+
+        def reject(idx: int, order_id, code: str, reason: str) -> None:
+            results[idx] = {"line": chunk[idx][0], "order_id": order_id, "status": "rejected",
+                            "code": code, "reason": reason}
+
+        parsed: List[Tuple[int, Dict]] = []
+        seen = set()
+        for idx, (_, row) in enumerate(chunk):
+            try:
+                settlement = self._parse_settlement_row(row)
+            except PaymentError as e:
+                reject(idx, row.get("order_id"), "invalid", str(e))
+                continue
+            if settlement["order_id"] in seen:
+                reject(idx, settlement["order_id"], "duplicate", "Duplicate order_id earlier in the file.")
+                continue
+            seen.add(settlement["order_id"])
+            parsed.append((idx, settlement))
+
+        payments = {p["order_id"]: p for p in self.payment_dao.get_payments_by_order_ids(
+            [settlement["order_id"] for _, settlement in parsed])}
+        by_method: Dict[str, List[Tuple[int, Dict]]] = {}
+        for idx, settlement in parsed:
+            order_id = settlement["order_id"]
+            payment = payments.get(order_id)
+            if not payment:
+                reject(idx, order_id, "not_found", f"No pending payment found for order ID {order_id}.")
+            elif payment["status"] != "PENDING":
+                reject(idx, order_id, "not_pending",
+                       f"Payment for order ID {order_id} is not pending (status: {payment['status']}).")
+            elif settlement["amount"] is not None and abs(settlement["amount"] - float(payment["amount"])) > 0.005:
+                reject(idx, order_id, "amount_mismatch",
+                       f"Settled amount {settlement['amount']:.2f} does not match payment amount {float(payment['amount']):.2f}.")
+            else:
+                by_method.setdefault(settlement["method"], []).append((idx, settlement))
 
-        return updated_payment
\ No newline at end of file
+        # The PENDING guard makes each update safe against concurrent settlement
+        settled: List[int] = []
+        for method, group in by_method.items():
+            paid = {p["order_id"] for p in self.payment_dao.mark_payments_paid([s["order_id"] for _, s in group], method)}
+            for idx, settlement in group:
+                order_id = settlement["order_id"]
+                if order_id in paid:
+                    settled.append(order_id)
+                    results[idx] = {"line": chunk[idx][0], "order_id": order_id, "status": "accepted",
+                                    "method": method, "amount": float(payments[order_id]["amount"])}
+                else:
+                    reject(idx, order_id, "conflict", f"Payment for order ID {order_id} was settled concurrently.")
+        # Orders cancelled while they were being settled get their payment refunded
+        completed = {o["order_id"] for o in self.order_dao.update_orders_status(settled, "COMPLETED", from_status="PLACED")}
+        # Rare, so the leftovers are read one by one
+        cancelled = [order_id for order_id in settled if order_id not in completed
+                     and (self.order_dao.get_order_by_id(order_id) or {}).get("status") == "CANCELLED"]
+        if cancelled:
+            self.payment_dao.mark_payments_refunded(cancelled, from_status="PAID")
+            for idx, result in enumerate(results):
+                if result and result["status"] == "accepted" and result["order_id"] in cancelled:
+                    reject(idx, result["order_id"], "conflict",
+                           f"Order ID {result['order_id']} was cancelled concurrently; the payment was refunded.")
+        return results
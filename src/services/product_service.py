@@ -90,7 +90,8 @@ class ProductService:
 '''
 
 # src/services/product_service.py
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterable, Iterator, Tuple
+from src.batching import chunked, insert_with_fallback
 from src.dao.product_dao import ProductDAO
 
 class ProductError(Exception):
@@ -112,4 +113,120 @@ class ProductService:
             raise ProductError("Price must be a positive number.")
         if self.product_dao.get_product_by_sku(sku):
             raise ProductError(f"Product with SKU '{sku}' already exists.")
-        return self.product_dao.create_product(name, sku, price, stock, category)
\ No newline at end of file
+        return self.product_dao.create_product(name, sku, price, stock, category)
+
+    def import_products(self, records: Iterable[Tuple[int, Dict]], chunk_size: int = 500) -> Iterator[Dict]:
+        """
+        Validates and inserts products from (line number, row) pairs one chunk at a time,
+        so memory stays flat however large the input is. Each chunk costs one SKU lookup
+        and one multi-row insert. Yields one result per row, in input order.
+        """
+        for chunk in chunked(records, chunk_size):
+            yield from self._import_product_chunk(chunk)
+
+    @staticmethod
+    def _parse_product_row(row: Dict) -> Dict:
+        if row.get("_error"):
+            raise ProductError(row["_error"])
+        name = str(row.get("name") or "").strip()
+        sku = str(row.get("sku") or "").strip()
+        if not name or not sku:
+            raise ProductError("Both name and sku are required.")
+        try:
+            price = float(row.get("price"))
+        except (TypeError, ValueError):
+            raise ProductError(f"Invalid price '{row.get('price')}'.")
+        if price <= 0:
+            raise ProductError("Price must be a positive number.")
+        raw_stock = row.get("stock")
+        try:
+            stock = int(raw_stock) if raw_stock not in (None, "") else 0
+        except (TypeError, ValueError):
+            raise ProductError(f"Invalid stock '{raw_stock}'.")
+        if stock < 0:
+            raise ProductError("Stock cannot be negative.")
+        category = str(row.get("category") or "").strip() or None
+        return {"name": name, "sku": sku, "price": price, "stock": stock, "category": category}
+
+    def _import_product_chunk(self, chunk: List[Tuple[int, Dict]]) -> List[Dict]:
+        results: List[Optional[Dict]] = [None] * len(chunk)
+        pending: List[Tuple[int, Dict]] = []
+        seen = set()
+        for idx, (line_no, row) in enumerate(chunk):
+            try:
+                payload = self._parse_product_row(row)
+                if payload["sku"] in seen:
+                    raise ProductError(f"Duplicate SKU '{payload['sku']}' earlier in the file.")
+            except ProductError as e:
+                results[idx] = {"line": line_no, "sku": row.get("sku"), "status": "rejected", "reason": str(e)}
+                continue
+            seen.add(payload["sku"])
+            pending.append((idx, payload))
+
+        existing = {p["sku"] for p in self.product_dao.get_products_by_skus([p["sku"] for _, p in pending])}
+        to_insert = []
+        for idx, payload in pending:
+            if payload["sku"] in existing:
+                results[idx] = {"line": chunk[idx][0], "sku": payload["sku"], "status": "rejected",
+                                "reason": f"Product with SKU '{payload['sku']}' already exists."}
+            else:
+                to_insert.append((idx, payload))
+
+        for idx, payload, row, error in insert_with_fallback(self.product_dao.create_products, to_insert, "sku"):
+            result = {"line": chunk[idx][0], "sku": payload["sku"]}
+            if row:
+                result.update(status="accepted", prod_id=row["prod_id"])
+            else:
+                result.update(status="rejected", reason=error)
+            results[idx] = result
+        return results
+
+    def get_low_stock(self, threshold: int = 5, category: Optional[str] = None,
+                      page_size: int = 1000) -> Iterator[Dict]:
+        """Yields every product with stock at or below the threshold, a page at a time."""
+        if threshold < 0:
+            raise ProductError("Threshold cannot be negative.")
+        return self.product_dao.iter_low_stock(threshold, page_size=page_size, category=category)
+
+    def restock_products(self, deltas: List[Tuple[int, int]]) -> List[Dict]:
+        """
+        Adds stock to many products at once: one read to validate, one atomic
+        server-side increment for every product, and one read of the new levels.
+        Repeated products are summed; nothing is written if any product is unknown.
+        """
+        totals: Dict[int, int] = {}
+        for prod_id, delta in deltas:
+            if delta <= 0:
+                raise ProductError(f"Restock quantity for product {prod_id} must be positive.")
+            totals[prod_id] = totals.get(prod_id, 0) + delta
+        if not totals:
+            raise ProductError("Nothing to restock.")
+        found = {p["prod_id"] for p in self.product_dao.get_products_by_ids(list(totals))}
+        missing = [prod_id for prod_id in totals if prod_id not in found]
+        if missing:
+            raise ProductError(f"Products not found: {', '.join(map(str, missing))}.")
+        # release_stock is the same atomic increment used to hand back reserved units
+        failed = self.product_dao.release_stock(
+            [{"prod_id": prod_id, "quantity": delta} for prod_id, delta in totals.items()], reason="restock")
+        if failed:
+            raise ProductError(f"Products not found: {', '.join(str(line['prod_id']) for line in failed)}.")
+        return self.product_dao.get_products_by_ids(list(totals))
+
+    def compact_stock(self) -> List[Dict]:
+        """Folds the pending stock movements into the stock snapshot (stock ledger only)."""
+        if not hasattr(self.product_dao, "compact_stock"):
+            raise ProductError("The stock ledger is disabled (set RETAIL_STOCK_LEDGER=1).")
+        return self.product_dao.compact_stock()
+
+    def get_stock_movements(self, prod_id: int, limit: int = 100) -> List[Dict]:
+        """Returns a product's most recent stock movements, newest first (stock ledger only)."""
+        if not hasattr(self.product_dao, "get_movements"):
+            raise ProductError("The stock ledger is disabled (set RETAIL_STOCK_LEDGER=1).")
+        if not self.product_dao.get_product_by_id(prod_id):
+            raise ProductError(f"Product with ID {prod_id} not found.")
+        return self.product_dao.get_movements(prod_id, limit)
+
+    def write_catalog_snapshot(self, path: str, page_size: int = 1000) -> int:
+        """Writes every product to a catalog snapshot file and returns how many were written."""
+        from src.catalog import CatalogSnapshot
+        return CatalogSnapshot.write(path, self.product_dao.iter_products(page_size=page_size))
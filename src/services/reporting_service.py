@@ -1,20 +1,35 @@
 # src/services/reporting_service.py
-from typing import Dict
+import datetime
+from typing import Dict, List, Optional, Tuple
 from src.dao.order_dao import OrderDAO
+from src.dao.sales_rollup_dao import SalesRollupDAO
 
 class ReportingService:
     """
     Service for generating business reports.
+    With a rollup store, settled days are aggregated once and kept locally. Orders
+    can still be paid or cancelled for a while after they are placed, so the last
+    `mutable_days` days (and today onwards) are always fetched, as are missing days.
     """
-    def __init__(self, order_dao: OrderDAO):
+    def __init__(self, order_dao: OrderDAO, rollup_dao: Optional[SalesRollupDAO] = None, mutable_days: int = 7):
         self.order_dao = order_dao
+        self.rollup_dao = rollup_dao
+        self.mutable_days = mutable_days
+
+    def _settled_before(self) -> datetime.date:
+        """First day that may still change; only days before it are stored."""
+        today = datetime.datetime.now(datetime.timezone.utc).date()
+        return today - datetime.timedelta(days=self.mutable_days)
 
     def generate_sales_summary(self, start_date: str, end_date: str) -> Dict:
         """
         Generates a sales summary report for a given date range.
         """
+        if self.rollup_dao is not None:
+            return self._summary_from_rollups(start_date, end_date)
+
         report_data = self.order_dao.get_sales_report_data(start_date, end_date)
-        
+
         # The DAO returns a list with one object, or an empty list
         if not report_data:
             summary = {"total_revenue": 0, "total_orders": 0}
@@ -26,4 +41,69 @@ class ReportingService:
             "end_date": end_date,
             "total_revenue": summary.get("total_revenue") or 0,
             "total_orders": summary.get("total_orders") or 0
-        }
\ No newline at end of file
+        }
+
+    def rebuild_rollups(self, start_date: Optional[str] = None, end_date: Optional[str] = None) -> Dict:
+        """
+        Drops and re-fetches the stored days in the range with one RPC call. Without
+        dates, everything already stored is rebuilt.
+        """
+        if self.rollup_dao is None:
+            raise RuntimeError("Sales rollups are disabled (set RETAIL_ROLLUP_PATH).")
+        if not (start_date and end_date):
+            stored = self.rollup_dao.get_stored_range()
+            if not stored:
+                return {"start_date": None, "end_date": None, "days_stored": 0}
+            start_date, end_date = start_date or stored["start_date"], end_date or stored["end_date"]
+        self.rollup_dao.delete_days(start_date, end_date)
+        settled_before = self._settled_before().isoformat()
+        days = self._fetch_days(start_date, end_date)
+        return {"start_date": start_date, "end_date": end_date,
+                "days_stored": sum(1 for day in days if day < settled_before)}
+
+    def _summary_from_rollups(self, start_date: str, end_date: str) -> Dict:
+        start, end = datetime.date.fromisoformat(start_date), datetime.date.fromisoformat(end_date)
+        stored = self.rollup_dao.get_days(start_date, end_date)
+        days: Dict[str, Dict] = dict(stored)
+        for gap_start, gap_end in self._ranges_to_fetch(start, end, stored, self._settled_before()):
+            days.update(self._fetch_days(gap_start.isoformat(), gap_end.isoformat()))
+        return {
+            "start_date": start_date,
+            "end_date": end_date,
+            "total_revenue": round(sum(float(d["total_revenue"]) for d in days.values()), 2),
+            "total_orders": sum(int(d["total_orders"]) for d in days.values())
+        }
+
+    @staticmethod
+    def _ranges_to_fetch(start: datetime.date, end: datetime.date, stored: Dict[str, Dict],
+                         settled_before: datetime.date) -> List[Tuple[datetime.date, datetime.date]]:
+        """Contiguous runs of days that are not stored, plus everything from `settled_before` on."""
+        ranges: List[Tuple[datetime.date, datetime.date]] = []
+        day = start
+        while day <= end:
+            if day < settled_before and day.isoformat() in stored:
+                day += datetime.timedelta(days=1)
+                continue
+            if ranges and ranges[-1][1] == day - datetime.timedelta(days=1):
+                ranges[-1] = (ranges[-1][0], day)
+            else:
+                ranges.append((day, day))
+            day += datetime.timedelta(days=1)
+        return ranges
+
+    def _fetch_days(self, start_date: str, end_date: str) -> Dict[str, Dict]:
+        """
+        Fetches one range through the RPC and stores its settled days. Days without
+        sales are stored as zeros so they are not fetched again.
+        """
+        settled_before = self._settled_before()
+        fetched = {str(row["day"])[:10]: row for row in self.order_dao.get_daily_sales(start_date, end_date)}
+        days: Dict[str, Dict] = {}
+        day, end = datetime.date.fromisoformat(start_date), datetime.date.fromisoformat(end_date)
+        while day <= end:
+            row = fetched.get(day.isoformat(), {})
+            days[day.isoformat()] = {"day": day.isoformat(), "total_revenue": float(row.get("total_revenue") or 0),
+                                     "total_orders": int(row.get("total_orders") or 0)}
+            day += datetime.timedelta(days=1)
+        self.rollup_dao.save_days([d for d in days.values() if datetime.date.fromisoformat(d["day"]) < settled_before])
+        return days
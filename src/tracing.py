@@ -0,0 +1,272 @@
+# src/tracing.py
+"""
+Round-trip and latency tracing for the DAO layer.
+
+Nothing here is installed unless profiling is switched on: `instrument()` swaps
+each DAO's client for a `TracedClient` and wraps its public methods, so the
+untraced path runs exactly the original code.
+"""
+import functools
+import inspect
+import json
+import math
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional
+
+# Cap on latency samples kept per key, so a long-running process stays bounded
+MAX_SAMPLES = 4096
+
+
+def percentile(samples: Iterable[float], pct: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def _payload_size(payload: Any) -> int:
+    if payload is None:
+        return 0
+    return len(json.dumps(payload, default=str))
+
+
+class _Stats:
+    __slots__ = ("calls", "round_trips", "rows", "bytes_sent", "total_ms", "samples")
+
+    def __init__(self):
+        self.calls = 0
+        self.round_trips = 0
+        self.rows = 0
+        self.bytes_sent = 0
+        self.total_ms = 0.0
+        self.samples = deque(maxlen=MAX_SAMPLES)
+
+    def to_dict(self) -> Dict:
+        return {
+            "calls": self.calls,
+            "round_trips": self.round_trips,
+            "rows": self.rows,
+            "bytes_sent": self.bytes_sent,
+            "total_ms": round(self.total_ms, 3),
+            "p50_ms": round(percentile(self.samples, 50), 3),
+            "p95_ms": round(percentile(self.samples, 95), 3),
+        }
+
+
+class Tracer:
+    """
+    Collects one record per database round trip and per DAO call, grouped by command.
+    Thread-safe; each thread tracks its own current command and DAO method.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.requests: Dict[str, Dict[str, _Stats]] = defaultdict(lambda: defaultdict(_Stats))
+        self.methods: Dict[str, Dict[str, _Stats]] = defaultdict(lambda: defaultdict(_Stats))
+        self.commands: Dict[str, _Stats] = defaultdict(_Stats)
+        self.extra_sources: List = []
+
+    @property
+    def current_command(self) -> str:
+        return getattr(self._local, "command", None) or "-"
+
+    @contextmanager
+    def command(self, name: str):
+        """Labels every round trip made inside the block with a command name (e.g. 'order create')."""
+        previous = getattr(self._local, "command", None)
+        self._local.command = name
+        self._local.trips = 0
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            with self._lock:
+                stats = self.commands[name]
+                stats.calls += 1
+                stats.round_trips += self._local.trips
+                stats.total_ms += elapsed
+                stats.samples.append(elapsed)
+            self._local.command = previous
+
+    def record_request(self, table: str, shape: str, payload_bytes: int, rows: int, elapsed_ms: float) -> None:
+        method = getattr(self._local, "method", None)
+        key = f"{table} {shape}"
+        with self._lock:
+            stats = self.requests[self.current_command][key]
+            stats.calls += 1
+            stats.round_trips += 1
+            stats.rows += rows
+            stats.bytes_sent += payload_bytes
+            stats.total_ms += elapsed_ms
+            stats.samples.append(elapsed_ms)
+        self._local.trips = getattr(self._local, "trips", 0) + 1
+        if method is not None:
+            self._local.method_trips = getattr(self._local, "method_trips", 0) + 1
+
+    def record_method(self, name: str, round_trips: int, elapsed_ms: float) -> None:
+        with self._lock:
+            stats = self.methods[self.current_command][name]
+            stats.calls += 1
+            stats.round_trips += round_trips
+            stats.total_ms += elapsed_ms
+            stats.samples.append(elapsed_ms)
+
+    def add_source(self, name: str, stats_fn) -> None:
+        """Registers an extra stats provider (e.g. cache hit rates) included in the report."""
+        self.extra_sources.append((name, stats_fn))
+
+    # --- Reporting ---
+    def to_dict(self) -> Dict:
+        with self._lock:
+            report = {
+                "commands": {
+                    name: {
+                        **stats.to_dict(),
+                        "methods": {m: s.to_dict() for m, s in self.methods.get(name, {}).items()},
+                        "requests": {r: s.to_dict() for r, s in self.requests.get(name, {}).items()},
+                    }
+                    for name, stats in self.commands.items()
+                }
+            }
+        for name, stats_fn in self.extra_sources:
+            report[name] = stats_fn()
+        return report
+
+    def format_table(self) -> str:
+        report = self.to_dict()
+        lines = []
+        for command, data in report["commands"].items():
+            lines.append(f"Command '{command}': {data['calls']} run(s), {data['round_trips']} round trip(s), "
+                         f"p50 {data['p50_ms']:.1f} ms, p95 {data['p95_ms']:.1f} ms")
+            lines.append(f"  {'DAO method':<56} {'calls':>6} {'trips':>6} {'p50 ms':>9} {'p95 ms':>9}")
+            for name, s in sorted(data["methods"].items(), key=lambda kv: -kv[1]["total_ms"]):
+                lines.append(f"  {name:<56} {s['calls']:>6} {s['round_trips']:>6} {s['p50_ms']:>9.2f} {s['p95_ms']:>9.2f}")
+            lines.append(f"  {'Request (table, shape)':<56} {'calls':>6} {'rows':>6} {'bytes':>9} {'p50 ms':>9} {'p95 ms':>9}")
+            for name, s in sorted(data["requests"].items(), key=lambda kv: -kv[1]["total_ms"]):
+                lines.append(f"  {name[:56]:<56} {s['calls']:>6} {s['rows']:>6} {s['bytes_sent']:>9} "
+                             f"{s['p50_ms']:>9.2f} {s['p95_ms']:>9.2f}")
+        for name in report:
+            if name != "commands":
+                lines.append(f"{name}: {json.dumps(report[name], default=str)}")
+        return "\n".join(lines)
+
+
+class TracedQuery:
+    """Wraps a query builder, remembering the shape of the chain until `execute()`."""
+    def __init__(self, tracer: Tracer, table: str, builder: Any):
+        self._tracer = tracer
+        self._table = table
+        self._builder = builder
+        self._shape: List[str] = []
+        self._payload_bytes = 0
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._builder, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            if name in ("insert", "upsert", "update"):
+                payload = args[0] if args else kwargs.get("json")
+                self._payload_bytes += _payload_size(payload)
+                self._shape.append(name)
+            elif name in ("select", "eq", "neq", "gt", "gte", "lt", "lte", "in_", "like", "ilike", "is_", "order") and args:
+                self._shape.append(f"{name}({args[0]})")
+            else:
+                self._shape.append(name)
+            self._builder = attr(*args, **kwargs)
+            return self
+        return call
+
+    def execute(self):
+        start = time.perf_counter()
+        resp = self._builder.execute()
+        elapsed = (time.perf_counter() - start) * 1000
+        data = getattr(resp, "data", None)
+        rows = len(data) if isinstance(data, list) else (1 if data else 0)
+        self._tracer.record_request(self._table, " ".join(self._shape), self._payload_bytes, rows, elapsed)
+        return resp
+
+
+class TracedClient:
+    """Client proxy that routes every `table()` and `rpc()` call through the tracer."""
+    def __init__(self, client: Any, tracer: Tracer):
+        self._client = client
+        self._tracer = tracer
+
+    def table(self, name: str) -> TracedQuery:
+        return TracedQuery(self._tracer, name, self._client.table(name))
+
+    from_ = table
+
+    def rpc(self, name: str, params: Optional[Dict] = None) -> TracedQuery:
+        query = TracedQuery(self._tracer, f"rpc:{name}", self._client.rpc(name, params or {}))
+        query._payload_bytes = _payload_size(params)
+        return query
+
+    def __getattr__(self, name: str):
+        return getattr(self._client, name)
+
+
+def _wrap_generator(tracer: Tracer, qualname: str, method):
+    """Generator DAO methods are traced across their whole iteration, not just creation."""
+    @functools.wraps(method)
+    def traced(*args, **kwargs):
+        local = tracer._local
+        trips = 0
+        start = time.perf_counter()
+        gen = method(*args, **kwargs)
+        try:
+            while True:
+                outer_method, outer_trips = getattr(local, "method", None), getattr(local, "method_trips", 0)
+                local.method, local.method_trips = qualname, 0
+                try:
+                    item = next(gen)
+                except StopIteration:
+                    return
+                finally:
+                    trips += local.method_trips
+                    local.method, local.method_trips = outer_method, outer_trips + local.method_trips
+                yield item
+        finally:
+            tracer.record_method(qualname, trips, (time.perf_counter() - start) * 1000)
+    return traced
+
+
+def _wrap_method(tracer: Tracer, qualname: str, method):
+    if inspect.isgeneratorfunction(method):
+        return _wrap_generator(tracer, qualname, method)
+
+    @functools.wraps(method)
+    def traced(*args, **kwargs):
+        local = tracer._local
+        outer_method, outer_trips = getattr(local, "method", None), getattr(local, "method_trips", 0)
+        local.method, local.method_trips = qualname, 0
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            trips = local.method_trips
+            tracer.record_method(qualname, trips, (time.perf_counter() - start) * 1000)
+            local.method, local.method_trips = outer_method, outer_trips + trips
+    return traced
+
+
+def instrument(daos: Iterable[Any], tracer: Tracer) -> None:
+    """Attaches the tracer to already-built DAOs (services keep their references)."""
+    for dao in daos:
+        if isinstance(dao.db, TracedClient):
+            continue
+        dao.db = TracedClient(dao.db, tracer)
+        cls_name = type(dao).__name__
+        for name in dir(type(dao)):
+            if name.startswith("_"):
+                continue
+            attr = getattr(dao, name)
+            if callable(attr):
+                setattr(dao, name, _wrap_method(tracer, f"{cls_name}.{name}", attr))
@@ -0,0 +1,118 @@
+# tests/test_order_concurrency.py
+"""
+Concurrent status changes on one order, against the memory backend with injected
+latency so that the read-check-write windows actually overlap.
+"""
+import asyncio
+import threading
+from bench.fake_client import LatencyClient
+from src.dao.customer_dao import CustomerDAO
+from src.dao.order_dao import OrderDAO
+from src.dao.payment_dao import PaymentDAO
+from src.dao.product_dao import ProductDAO
+from src.services.order_service import OrderError, OrderService
+from src.services.payment_service import PaymentError, PaymentService
+
+STOCK = 100
+
+
+def _services():
+    client = LatencyClient()
+    client.table("customers").insert([{"name": "C", "email": "c@test", "phone": "1"}]).execute()
+    client.table("products").insert([{"name": "P", "sku": "P1", "price": 2.0, "stock": STOCK}]).execute()
+    client.latency_ms = 2
+    orders = OrderService(OrderDAO(client), ProductDAO(client), CustomerDAO(client), PaymentDAO(client))
+    payments = PaymentService(PaymentDAO(client), OrderDAO(client))
+    return client, orders, payments
+
+
+def _race(*calls):
+    """Starts every call at the same moment; returns (results, errors)."""
+    barrier = threading.Barrier(len(calls))
+    results, errors = [], []
+
+    def run(call):
+        barrier.wait()
+        try:
+            results.append(call())
+        except (OrderError, PaymentError) as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(call,)) for call in calls]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+def _stock(client):
+    return client.table("products").select("stock").eq("prod_id", 1).execute().data[0]["stock"]
+
+
+def test_concurrent_cancels_release_stock_once():
+    client, orders, _ = _services()
+    order = orders.create_order(1, [{"prod_id": 1, "quantity": 10}])
+    assert _stock(client) == STOCK - 10
+
+    results, errors = _race(*[lambda: orders.cancel_order(order["order_id"])] * 8)
+
+    assert len(results) == 1 and len(errors) == 7
+    assert _stock(client) == STOCK
+    payment = client.table("payments").select("status").eq("order_id", order["order_id"]).execute().data[0]
+    assert payment["status"] == "REFUNDED"
+
+
+def test_cancel_racing_payment_leaves_a_consistent_order():
+    for _ in range(10):
+        client, orders, payments = _services()
+        order = orders.create_order(1, [{"prod_id": 1, "quantity": 10}])
+        order_id = order["order_id"]
+
+        results, errors = _race(lambda: orders.cancel_order(order_id),
+                                lambda: payments.process_payment(order_id, "Card"))
+
+        assert len(results) == 1 and len(errors) == 1
+        status = client.table("orders").select("status").eq("order_id", order_id).execute().data[0]["status"]
+        payment = client.table("payments").select("status").eq("order_id", order_id).execute().data[0]["status"]
+        if status == "CANCELLED":
+            assert payment == "REFUNDED" and _stock(client) == STOCK
+        else:
+            assert (status, payment) == ("COMPLETED", "PAID") and _stock(client) == STOCK - 10
+
+
+def _async_services():
+    from src.backends.async_adapter import AsyncClientAdapter
+    from src.dao.async_customer_dao import AsyncCustomerDAO
+    from src.dao.async_order_dao import AsyncOrderDAO
+    from src.dao.async_payment_dao import AsyncPaymentDAO
+    from src.dao.async_product_dao import AsyncProductDAO
+    from src.services.async_order_service import AsyncOrderService
+    from src.services.async_payment_service import AsyncPaymentService
+    client, _, _ = _services()
+    db = AsyncClientAdapter(client)
+    orders = AsyncOrderService(AsyncOrderDAO(db), AsyncProductDAO(db), AsyncCustomerDAO(db), AsyncPaymentDAO(db))
+    return client, orders, AsyncPaymentService(AsyncPaymentDAO(db), AsyncOrderDAO(db))
+
+
+async def _gather(*coros):
+    outcomes = await asyncio.gather(*coros, return_exceptions=True)
+    return ([o for o in outcomes if not isinstance(o, Exception)],
+            [o for o in outcomes if isinstance(o, (OrderError, PaymentError))])
+
+
+def test_async_concurrent_cancels_and_payments():
+    client, orders, payments = _async_services()
+
+    async def scenario():
+        order = await orders.create_order(1, [{"prod_id": 1, "quantity": 10}])
+        cancels = await _gather(*[orders.cancel_order(order["order_id"]) for _ in range(8)])
+        order = await orders.create_order(1, [{"prod_id": 1, "quantity": 10}])
+        paid = await _gather(*[payments.process_payment(order["order_id"], "Card") for _ in range(8)])
+        return cancels, paid
+
+    (cancelled, cancel_errors), (paid, pay_errors) = asyncio.run(scenario())
+
+    assert (len(cancelled), len(cancel_errors)) == (1, 7)
+    assert (len(paid), len(pay_errors)) == (1, 7)
+    assert _stock(client) == STOCK - 10